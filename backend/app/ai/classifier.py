@@ -2,12 +2,15 @@
 Complaint classification module
 """
 import json
-from app.ai.gemini_client import GeminiClient
+from app.ai.gemini_client import get_gemini_client
 from typing import Dict, List
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Output contract shared with the fused analyzer
+CATEGORIES = ("produto", "atendimento", "entrega", "preco", "outros")
+
 CLASSIFICATION_PROMPT = """Classifique a reclamaï¿½ï¿½o abaixo nas seguintes categorias:
 - produto: problema com produto (defeito, qualidade, etc)
 - atendimento: problema com atendimento (rude, ineficiente, etc)
@@ -29,7 +32,7 @@ class Classifier:
     """Classifies complaints into predefined categories using Gemini API"""
 
     def __init__(self):
-        self.client = GeminiClient()
+        self.client = get_gemini_client()
 
     async def classify(self, text: str) -> Dict[str, any]:
         """
@@ -45,16 +48,8 @@ class Classifier:
                 - confidence: float (0-1, nï¿½vel de confianï¿½a)
         """
         try:
-            response = await self.client.analyze_text(CLASSIFICATION_PROMPT, text)
-
-            # Parse JSON response
-            result = json.loads(response)
-
-            return {
-                'categories': result['categories'],
-                'primary_category': result['primary_category'],
-                'confidence': float(result.get('confidence', 0.0))
-            }
+            response = await self.client.analyze_text(CLASSIFICATION_PROMPT, text, validate=self._parse)
+            return self._parse(response)
         except json.JSONDecodeError as e:
             logger.error(f"Erro ao parsear JSON da resposta: {e}\nResposta: {response}")
             # Fallback para categoria "outros"
@@ -66,3 +61,13 @@ class Classifier:
         except Exception as e:
             logger.error(f"Erro na classificaï¿½ï¿½o: {e}")
             raise
+
+    def _parse(self, response: str) -> Dict[str, any]:
+        """Classificação a partir da resposta JSON do Gemini"""
+        result = json.loads(response)
+
+        return {
+            'categories': result['categories'],
+            'primary_category': result['primary_category'],
+            'confidence': float(result.get('confidence', 0.0))
+        }
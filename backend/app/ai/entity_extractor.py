@@ -2,7 +2,7 @@
 Entity extraction module for complaints
 """
 import json
-from app.ai.gemini_client import GeminiClient
+from app.ai.gemini_client import get_gemini_client
 from typing import Dict, List, Optional
 import logging
 
@@ -29,7 +29,7 @@ class EntityExtractor:
     """Extracts named entities from complaints using Gemini API"""
 
     def __init__(self):
-        self.client = GeminiClient()
+        self.client = get_gemini_client()
 
     async def extract(self, text: str) -> Dict[str, any]:
         """
@@ -46,17 +46,8 @@ class EntityExtractor:
                 - outros: List[str] (outras entidades)
         """
         try:
-            response = await self.client.analyze_text(ENTITY_PROMPT, text)
-
-            # Parse JSON response
-            result = json.loads(response)
-
-            return {
-                'produto': result.get('produto'),
-                'loja': result.get('loja'),
-                'funcionario': result.get('funcionario'),
-                'outros': result.get('outros', [])
-            }
+            response = await self.client.analyze_text(ENTITY_PROMPT, text, validate=self._parse)
+            return self._parse(response)
         except json.JSONDecodeError as e:
             logger.error(f"Erro ao parsear JSON da resposta: {e}\nResposta: {response}")
             # Fallback para estrutura vazia
@@ -69,3 +60,14 @@ class EntityExtractor:
         except Exception as e:
             logger.error(f"Erro na extraï¿½ï¿½o de entidades: {e}")
             raise
+
+    def _parse(self, response: str) -> Dict[str, any]:
+        """Entidades a partir da resposta JSON do Gemini"""
+        result = json.loads(response)
+
+        return {
+            'produto': result.get('produto'),
+            'loja': result.get('loja'),
+            'funcionario': result.get('funcionario'),
+            'outros': result.get('outros', [])
+        }
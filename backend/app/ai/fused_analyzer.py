@@ -0,0 +1,176 @@
+"""
+Fused analyzer - sentiment, classification, entities, store type and tags in one Gemini call
+"""
+import json
+from app.ai.gemini_client import get_gemini_client
+from app.ai.sentiment_analyzer import SENTIMENT_LABELS
+from app.ai.classifier import CATEGORIES
+from app.ai.store_type_classifier import STORE_TYPES
+from app.ai.smart_tagger import ALLOWED_TAGS, normalize_tag
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+FUSED_FIELDS = ("sentiment", "classification", "entities", "store_type", "tags")
+
+FUSED_ANALYSIS_PROMPT = f"""Analise a reclamação de cliente abaixo e retorne UM ÚNICO JSON com todos os campos.
+
+1. sentiment: sentimento da reclamação
+   - label: um de {", ".join(f'"{s}"' for s in SENTIMENT_LABELS)}
+   - score: número de 0 a 10 (0=muito negativo, 5=neutro, 10=muito positivo)
+   - reasoning: breve justificativa (1 frase)
+
+2. classification: categorias do problema (pode haver múltiplas)
+   - produto: problema com produto (defeito, qualidade, etc)
+   - atendimento: problema com atendimento (rude, ineficiente, etc)
+   - entrega: problema com entrega (atraso, extravio, etc)
+   - preco: problema com preço/cobrança
+   - outros: outros tipos de problemas
+
+3. entities: entidades mencionadas (use null se não encontrar)
+   - produto, loja, funcionario e outros (lista)
+
+4. store_type: "physical" (loja física: loja, filial, balcão, atendimento presencial),
+   "online" (site, app, entrega, WhatsApp, SAC) ou "unknown" se não houver indícios claros
+
+5. tags: de 1 a 3 tags, usando SOMENTE a lista abaixo, e a principal em primary_tag
+{chr(10).join(f'   - {tag}' for tag in ALLOWED_TAGS)}
+
+Retorne APENAS o JSON, sem texto adicional:
+{{
+  "sentiment": {{"label": "Negativo", "score": 2, "reasoning": "..."}},
+  "classification": {{"categories": ["entrega"], "primary_category": "entrega", "confidence": 0.9}},
+  "entities": {{"produto": null, "loja": null, "funcionario": null, "outros": []}},
+  "store_type": {{"store_type": "online", "confidence": 0.8, "indicators": ["site"]}},
+  "tags": {{"tags": ["atraso-entrega"], "primary_tag": "atraso-entrega"}}
+}}"""
+
+
+def _parse_json_object(response: str) -> Dict:
+    """The response as a JSON object (raises otherwise)"""
+    result = json.loads(response)
+    if not isinstance(result, dict):
+        raise ValueError("not a JSON object")
+    return result
+
+
+class FusedAnalyzer:
+    """Runs every Gemini-backed analysis in a single structured prompt"""
+
+    def __init__(self):
+        self.client = get_gemini_client()
+
+    async def analyze(self, text: str) -> Dict[str, Optional[Dict]]:
+        """
+        Analyze a complaint with one prompt
+
+        Every field is validated against the contract of its separate
+        analyzer. Fields that are missing or invalid come back as None so
+        the caller can fall back to that field's own analyzer.
+
+        Args:
+            text: Complaint text (title included)
+
+        Returns:
+            Dict keyed by FUSED_FIELDS, each value shaped like the separate
+            analyzer result or None
+        """
+        response = await self.client.analyze_text(FUSED_ANALYSIS_PROMPT, text, validate=_parse_json_object)
+
+        try:
+            result = json.loads(response)
+        except json.JSONDecodeError as e:
+            logger.error(f"Error parsing fused JSON: {e}\nResponse: {response}")
+            return {field: None for field in FUSED_FIELDS}
+
+        if not isinstance(result, dict):
+            logger.error(f"Fused response is not a JSON object: {response}")
+            return {field: None for field in FUSED_FIELDS}
+
+        validators = {
+            "sentiment": self._validate_sentiment,
+            "classification": self._validate_classification,
+            "entities": self._validate_entities,
+            "store_type": self._validate_store_type,
+            "tags": self._validate_tags,
+        }
+
+        fields = {}
+        for field, validate in validators.items():
+            try:
+                fields[field] = validate(result.get(field))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Fused field '{field}' failed validation: {e}")
+                fields[field] = None
+        return fields
+
+    def _validate_sentiment(self, value: Dict) -> Dict:
+        """Same shape as SentimentAnalyzer.analyze"""
+        if value['label'] not in SENTIMENT_LABELS:
+            raise ValueError(f"unknown sentiment {value['label']!r}")
+        score = float(value['score'])
+        if not 0.0 <= score <= 10.0:
+            raise ValueError(f"sentiment score out of range: {score}")
+        return {
+            'sentiment': value['label'],
+            'sentiment_score': score,
+            'reasoning': value.get('reasoning', '')
+        }
+
+    def _validate_classification(self, value: Dict) -> Dict:
+        """Same shape as Classifier.classify"""
+        categories = [c for c in value['categories'] if c in CATEGORIES]
+        if not categories:
+            raise ValueError(f"no known category in {value['categories']!r}")
+        primary = value.get('primary_category')
+        if primary not in categories:
+            primary = categories[0]
+        return {
+            'categories': categories,
+            'primary_category': primary,
+            'confidence': float(value.get('confidence', 0.0))
+        }
+
+    def _validate_entities(self, value: Dict) -> Dict:
+        """Same shape as EntityExtractor.extract"""
+        if not isinstance(value, dict):
+            raise TypeError("entities must be an object")
+        outros = value.get('outros') or []
+        if not isinstance(outros, list):
+            raise TypeError("entities.outros must be a list")
+        return {
+            'produto': value.get('produto'),
+            'loja': value.get('loja'),
+            'funcionario': value.get('funcionario'),
+            'outros': outros
+        }
+
+    def _validate_store_type(self, value: Dict) -> Dict:
+        """Same shape as StoreTypeClassifier.classify"""
+        if value['store_type'] not in STORE_TYPES:
+            raise ValueError(f"unknown store type {value['store_type']!r}")
+        return {
+            'store_type': value['store_type'],
+            'confidence': float(value.get('confidence', 0.0)),
+            'indicators': value.get('indicators', [])
+        }
+
+    def _validate_tags(self, value: Dict) -> Dict:
+        """Same shape and tag set as SmartTagger.generate_tags"""
+        tags = []
+        for tag in value['tags']:
+            norm_tag = normalize_tag(tag)
+            if norm_tag in ALLOWED_TAGS and norm_tag not in tags:
+                tags.append(norm_tag)
+        if not tags:
+            raise ValueError(f"no allowed tag in {value['tags']!r}")
+
+        primary = normalize_tag(value.get('primary_tag', ''))
+        if primary not in ALLOWED_TAGS:
+            primary = tags[0]
+
+        return {
+            'tags': tags[:3],
+            'primary_tag': primary
+        }
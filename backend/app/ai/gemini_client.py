@@ -2,26 +2,124 @@
 Google Gemini API client for sentiment analysis and text classification
 """
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from google.generativeai import client as genai_client
+from google.generativeai.types import generation_types
+from app.ai.llm_cache import LLMCache
+from app.ai.rate_limiter import GeminiRateLimiter
 from app.core.config import settings
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import inspect
+import random
+import threading
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Rough token estimate used for the tokens-per-minute budget
+CHARS_PER_TOKEN = 4
+ESTIMATED_OUTPUT_TOKENS = 256
+
+# google-generativeai >= 0.4 takes per-call options (timeout) on generate_content
+_SDK_REQUEST_OPTIONS = "request_options" in inspect.signature(genai.GenerativeModel.generate_content).parameters
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """True for 429 / resource-exhausted responses from the Gemini API"""
+    if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)):
+        return True
+    message = str(error).lower()
+    return '429' in message or 'resource exhausted' in message or 'resource_exhausted' in message
+
+
+def _accepts(validate: Optional[Callable[[str], Any]], response: str) -> bool:
+    """True when there is no validator or it parses the response"""
+    if validate is None:
+        return True
+    try:
+        validate(response)
+        return True
+    except Exception:
+        return False
+
 
 class GeminiClient:
-    """Google Gemini client for text analysis"""
+    """
+    Google Gemini client for text analysis
+
+    The SDK call is blocking, so it runs on a bounded thread pool instead of
+    the event loop. The pool size caps the number of in-flight requests for
+    every caller in the process (API, scheduler threads and scripts alike),
+    independently of which event loop they run on. Use get_gemini_client()
+    to share a single instance.
+
+    Successful responses are kept in an LLMCache, so the same prompt and
+    text for the same model never hit the API twice. A response is only
+    cached once the caller's validate() accepts it: a truncated or
+    malformed answer is retried on the next analysis instead of replaying
+    its fallback result for the whole TTL.
+
+    Before each call a worker thread goes through the GeminiRateLimiter
+    (requests and tokens per minute, AIMD concurrency). Throttling errors
+    shrink the concurrency limit and are retried with backoff.
 
-    def __init__(self):
+    Every call carries its own deadline (GEMINI_REQUEST_TIMEOUT_SECONDS):
+    a caller's asyncio timeout only stops the await, the deadline is what
+    frees the worker thread of a hung request.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[LLMCache] = None,
+        rate_limiter: Optional[GeminiRateLimiter] = None
+    ):
         genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.model_name = model_name or settings.GEMINI_MODEL
+        self.model = genai.GenerativeModel(self.model_name)
+        self.max_concurrency = max_concurrency or settings.GEMINI_MAX_CONCURRENCY
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="gemini"
+        )
+        self.cache = cache
+        self.rate_limiter = rate_limiter or GeminiRateLimiter(
+            rpm=settings.GEMINI_RPM_LIMIT,
+            tpm=settings.GEMINI_TPM_LIMIT,
+            max_concurrency=self.max_concurrency
+        )
+        self.max_retries = settings.GEMINI_MAX_RETRIES
+        self.request_timeout = settings.GEMINI_REQUEST_TIMEOUT_SECONDS
+
+        # Metrics
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._in_flight = 0
+        self._total_requests = 0
+        self._errors = 0
+        self._latencies = deque(maxlen=1000)
+        self._queue_waits = deque(maxlen=1000)
 
-    async def analyze_text(self, prompt: str, text: str) -> str:
+    async def analyze_text(
+        self,
+        prompt: str,
+        text: str,
+        use_cache: bool = True,
+        validate: Optional[Callable[[str], Any]] = None
+    ) -> str:
         """
         AnÃ¡lise de texto genÃ©rica usando Gemini API
 
         Args:
             prompt: Prompt de instruÃ§Ã£o para o modelo
             text: Texto a ser analisado
+            use_cache: Reaproveitar/gravar a resposta no cache de LLM
+            validate: Parser da resposta; só respostas que ele aceita são gravadas/reaproveitadas do cache
 
         Returns:
             Resposta do modelo Gemini em formato string (geralmente JSON)
@@ -29,12 +127,72 @@ class GeminiClient:
         Raises:
             Exception: Se houver erro na chamada da API
         """
+        cache_key = None
+        if use_cache and self.cache:
+            cache_key = LLMCache.make_key(self.model_name, prompt, text)
+            # SQLite I/O off the event loop, so a commit does not stall concurrent analyses
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                if _accepts(validate, cached):
+                    return cached
+                logger.warning("Cached Gemini response no longer parses, calling the API again")
+                await asyncio.to_thread(self.cache.delete, cache_key)
+
+        # Combine prompt and text
+        full_prompt = f"{prompt}\n\nTexto:\n{text}"
+
+        with self._lock:
+            self._queued += 1
+        future = self._executor.submit(self._generate, full_prompt, time.monotonic())
+
         try:
-            # Combine prompt and text
-            full_prompt = f"{prompt}\n\nTexto:\n{text}"
+            result_text = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Request never reached a worker thread: drop it from the queue
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            raise
+        except Exception as e:
+            logger.error(f"Erro na API Gemini: {e}")
+            raise
+
+        if cache_key and _accepts(validate, result_text):
+            await asyncio.to_thread(self.cache.set, cache_key, self.model_name, result_text)
+        return result_text
+
+    def _generate(self, full_prompt: str, enqueued_at: float) -> str:
+        """Blocking Gemini call, executed on the client thread pool"""
+        estimated_tokens = len(full_prompt) // CHARS_PER_TOKEN + ESTIMATED_OUTPUT_TOKENS
+        self.rate_limiter.acquire(estimated_tokens)
+
+        started_at = time.monotonic()
+        with self._lock:
+            self._queued -= 1
+            self._in_flight += 1
+            self._total_requests += 1
+            self._queue_waits.append(started_at - enqueued_at)
 
-            # Generate content
-            response = self.model.generate_content(full_prompt)
+        try:
+            attempt = 0
+            while True:
+                throttled = False
+                try:
+                    # Generate content
+                    response = self._generate_content(full_prompt)
+                    break
+                except Exception as e:
+                    throttled = is_throttling_error(e)
+                    if not throttled or attempt >= self.max_retries:
+                        raise
+                finally:
+                    self.rate_limiter.release(throttled=throttled)
+
+                attempt += 1
+                backoff = min(2 ** attempt, 30) + random.uniform(0, 1)
+                logger.warning(f"Gemini throttled (attempt {attempt}/{self.max_retries}), retrying in {backoff:.1f}s")
+                time.sleep(backoff)
+                self.rate_limiter.acquire(estimated_tokens)
 
             # Extract text from response
             result_text = response.text
@@ -47,6 +205,65 @@ class GeminiClient:
 
             return result_text
 
-        except Exception as e:
-            logger.error(f"Erro na API Gemini: {e}")
+        except Exception:
+            with self._lock:
+                self._errors += 1
             raise
+
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._latencies.append(time.monotonic() - started_at)
+
+    def _generate_content(self, full_prompt: str) -> generation_types.GenerateContentResponse:
+        """generate_content with the per-request deadline"""
+        if _SDK_REQUEST_OPTIONS:
+            return self.model.generate_content(full_prompt, request_options={"timeout": self.request_timeout})
+        # Older SDKs (google-generativeai < 0.4) only take the timeout on the underlying API client
+        request = self.model._prepare_request(contents=full_prompt)
+        if self.model._client is None:
+            self.model._client = genai_client.get_default_generative_client()
+        response = self.model._client.generate_content(request, timeout=self.request_timeout)
+        return generation_types.GenerateContentResponse.from_response(response)
+
+    def get_metrics(self) -> Dict:
+        """Queue depth, concurrency and latency of Gemini requests"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            waits = list(self._queue_waits)
+            metrics = {
+                "model": self.model_name,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "queue_depth": self._queued,
+                "total_requests": self._total_requests,
+                "errors": self._errors,
+            }
+
+        metrics["avg_latency_ms"] = round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0
+        metrics["p95_latency_ms"] = round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1) if latencies else 0
+        metrics["avg_queue_wait_ms"] = round(sum(waits) / len(waits) * 1000, 1) if waits else 0
+        metrics["rate_limiter"] = self.rate_limiter.get_stats()
+        metrics["cache"] = self.cache.get_stats() if self.cache else None
+        return metrics
+
+
+_client: Optional[GeminiClient] = None
+_client_lock = threading.Lock()
+
+
+def get_gemini_client() -> GeminiClient:
+    """Return the process-wide GeminiClient"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                cache = None
+                if settings.LLM_CACHE_ENABLED:
+                    cache = LLMCache(
+                        settings.LLM_CACHE_PATH,
+                        ttl_seconds=settings.LLM_CACHE_TTL_HOURS * 3600,
+                        max_entries=settings.LLM_CACHE_MAX_ENTRIES
+                    )
+                _client = GeminiClient(cache=cache)
+    return _client
@@ -0,0 +1,132 @@
+"""
+Rate limiting and adaptive concurrency for Gemini requests
+
+Everything here blocks with threading primitives because it is used from the
+GeminiClient worker threads, which are shared by every event loop in the
+process.
+"""
+from typing import Dict
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take `amount` tokens and return how long the caller must wait
+
+        The balance may go negative; later callers then wait for the debt to
+        be refilled, which keeps the order of reservations fair.
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit
+
+    The limit grows by one after `limit` consecutive successes (about one
+    step per round of requests) and is multiplied by `decrease_factor` when
+    the API signals throttling.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, decrease_factor: float = 0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.limit = max(minimum, min(initial, maximum))
+        self._active = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+
+    def release(self, throttled: bool = False):
+        with self._condition:
+            self._active -= 1
+            if throttled:
+                new_limit = max(self.minimum, int(self.limit * self.decrease_factor))
+                if new_limit != self.limit:
+                    logger.warning(f"Gemini throttled, concurrency limit {self.limit} -> {new_limit}")
+                self.limit = new_limit
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._successes = 0
+                    logger.debug(f"Gemini concurrency limit raised to {self.limit}")
+            self._condition.notify_all()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+
+class GeminiRateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets plus AIMD concurrency"""
+
+    def __init__(self, rpm: int, tpm: int, max_concurrency: int, initial_concurrency: int = None):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial=initial_concurrency or max(1, max_concurrency // 2),
+            minimum=1,
+            maximum=max_concurrency
+        )
+        self._throttled = 0
+
+    def acquire(self, estimated_tokens: int):
+        """Block until a request of `estimated_tokens` fits every budget"""
+        self.concurrency.acquire()
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        if wait > 0:
+            logger.debug(f"Gemini rate limit reached, waiting {wait:.2f}s")
+            time.sleep(wait)
+
+    def release(self, throttled: bool = False):
+        if throttled:
+            self._throttled += 1
+        self.concurrency.release(throttled=throttled)
+
+    def get_stats(self) -> Dict:
+        return {
+            "concurrency_limit": self.concurrency.limit,
+            "active": self.concurrency.active,
+            "requests_available": round(self.requests.available(), 1),
+            "tokens_available": round(self.tokens.available()),
+            "throttled": self._throttled,
+        }
@@ -2,7 +2,7 @@
 Response generator using Gemini API for personalized customer responses.
 Uses competitor best practices as examples for better response quality.
 """
-from app.ai.gemini_client import GeminiClient
+from app.ai.gemini_client import get_gemini_client
 from app.ai.prompts.response_templates import RESPONSE_TEMPLATES
 from app.core.database import SessionLocal
 from app.db.models import CompetitorComplaint, Competitor
@@ -79,7 +79,7 @@ Retorne APENAS a resposta personalizada."""
 
 class ResponseGenerator:
     def __init__(self):
-        self.client = GeminiClient()
+        self.client = get_gemini_client()
 
     def _get_best_competitor_responses(self, limit: int = 3) -> list:
         """Busca as melhores respostas de concorrentes do banco de dados."""
@@ -172,7 +172,7 @@ class ResponseGenerator:
             )
 
         # Chamar LLM para personalizar
-        personalized = await self.client.analyze_text(prompt, complaint_text)
+        personalized = await self.client.analyze_text(prompt, complaint_text, use_cache=False)
 
         return {
             'response_text': personalized,
@@ -2,12 +2,15 @@
 Sentiment analysis module for complaint classification
 """
 import json
-from app.ai.gemini_client import GeminiClient
+from app.ai.gemini_client import get_gemini_client
 from typing import Dict
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Output contract shared with the fused analyzer
+SENTIMENT_LABELS = ("Negativo", "Neutro", "Positivo")
+
 SENTIMENT_PROMPT = """Analise o sentimento da seguinte reclamaï¿½ï¿½o de cliente.
 
 Retorne um JSON com:
@@ -22,7 +25,7 @@ class SentimentAnalyzer:
     """Analyzes sentiment of customer complaints using Gemini API"""
 
     def __init__(self):
-        self.client = GeminiClient()
+        self.client = get_gemini_client()
 
     async def analyze(self, text: str) -> Dict[str, any]:
         """
@@ -38,16 +41,8 @@ class SentimentAnalyzer:
                 - reasoning: string (justificativa)
         """
         try:
-            response = await self.client.analyze_text(SENTIMENT_PROMPT, text)
-
-            # Parse JSON response
-            result = json.loads(response)
-
-            return {
-                'sentiment': result['sentiment'],
-                'sentiment_score': float(result['score']),
-                'reasoning': result.get('reasoning', '')
-            }
+            response = await self.client.analyze_text(SENTIMENT_PROMPT, text, validate=self._parse)
+            return self._parse(response)
         except json.JSONDecodeError as e:
             logger.error(f"Erro ao parsear JSON da resposta: {e}\nResposta: {response}")
             # Fallback para sentimento neutro
@@ -59,3 +54,13 @@ class SentimentAnalyzer:
         except Exception as e:
             logger.error(f"Erro na anï¿½lise de sentimento: {e}")
             raise
+
+    def _parse(self, response: str) -> Dict[str, any]:
+        """Resultado a partir da resposta JSON do Gemini"""
+        result = json.loads(response)
+
+        return {
+            'sentiment': result['sentiment'],
+            'sentiment_score': float(result['score']),
+            'reasoning': result.get('reasoning', '')
+        }
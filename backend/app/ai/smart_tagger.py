@@ -3,7 +3,8 @@ Smart tagger - generates specific tags for complaints
 Focuses on middle distribution (not too common, not too rare)
 """
 import json
-from app.ai.gemini_client import GeminiClient
+import unicodedata
+from app.ai.gemini_client import get_gemini_client
 from typing import Dict, List
 import logging
 
@@ -57,11 +58,34 @@ Retorne em formato JSON:
 }}"""
 
 
+def normalize_tag(tag: str) -> str:
+    """Normalize tag to lowercase, no accents, hyphenated"""
+    if not tag:
+        return ''
+
+    # Remove accents
+    tag = unicodedata.normalize('NFKD', tag)
+    tag = ''.join(c for c in tag if not unicodedata.combining(c))
+
+    # Lowercase and replace spaces with hyphens
+    tag = tag.lower().strip()
+    tag = tag.replace(' ', '-').replace('_', '-')
+
+    # Remove special characters except hyphens
+    tag = ''.join(c for c in tag if c.isalnum() or c == '-')
+
+    # Remove multiple consecutive hyphens
+    while '--' in tag:
+        tag = tag.replace('--', '-')
+
+    return tag.strip('-')
+
+
 class SmartTagger:
     """Generates intelligent tags for complaints focusing on middle distribution"""
 
     def __init__(self):
-        self.client = GeminiClient()
+        self.client = get_gemini_client()
 
     async def generate_tags(self, text: str, title: str = "") -> Dict[str, any]:
         """
@@ -80,30 +104,8 @@ class SmartTagger:
             # Combine title and text for better context
             full_text = f"Título: {title}\n\n{text}" if title else text
 
-            response = await self.client.analyze_text(SMART_TAG_PROMPT, full_text)
-            result = json.loads(response)
-
-            tags = result.get('tags', [])
-            # Normalize and validate tags against allowed list
-            normalized_tags = []
-            for tag in tags:
-                norm_tag = self._normalize_tag(tag)
-                if norm_tag in ALLOWED_TAGS:
-                    normalized_tags.append(norm_tag)
-
-            # Get primary tag
-            primary = self._normalize_tag(result.get('primary_tag', ''))
-            if primary not in ALLOWED_TAGS:
-                primary = normalized_tags[0] if normalized_tags else 'atendimento-ruim'
-
-            # Ensure we have at least one tag
-            if not normalized_tags:
-                normalized_tags = [primary]
-
-            return {
-                'tags': normalized_tags[:3],  # Max 3 tags
-                'primary_tag': primary
-            }
+            response = await self.client.analyze_text(SMART_TAG_PROMPT, full_text, validate=self._parse)
+            return self._parse(response)
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing JSON: {e}\nResponse: {response}")
             return {
@@ -114,25 +116,32 @@ class SmartTagger:
             logger.error(f"Error generating tags: {e}")
             raise
 
-    def _normalize_tag(self, tag: str) -> str:
-        """Normalize tag to lowercase, no accents, hyphenated"""
-        if not tag:
-            return ''
+    def _parse(self, response: str) -> Dict[str, any]:
+        """Normalized tags from the Gemini JSON response"""
+        result = json.loads(response)
 
-        # Remove accents
-        import unicodedata
-        tag = unicodedata.normalize('NFKD', tag)
-        tag = ''.join(c for c in tag if not unicodedata.combining(c))
+        tags = result.get('tags', [])
+        # Normalize and validate tags against allowed list
+        normalized_tags = []
+        for tag in tags:
+            norm_tag = self._normalize_tag(tag)
+            if norm_tag in ALLOWED_TAGS:
+                normalized_tags.append(norm_tag)
 
-        # Lowercase and replace spaces with hyphens
-        tag = tag.lower().strip()
-        tag = tag.replace(' ', '-').replace('_', '-')
+        # Get primary tag
+        primary = self._normalize_tag(result.get('primary_tag', ''))
+        if primary not in ALLOWED_TAGS:
+            primary = normalized_tags[0] if normalized_tags else 'atendimento-ruim'
 
-        # Remove special characters except hyphens
-        tag = ''.join(c for c in tag if c.isalnum() or c == '-')
+        # Ensure we have at least one tag
+        if not normalized_tags:
+            normalized_tags = [primary]
 
-        # Remove multiple consecutive hyphens
-        while '--' in tag:
-            tag = tag.replace('--', '-')
+        return {
+            'tags': normalized_tags[:3],  # Max 3 tags
+            'primary_tag': primary
+        }
 
-        return tag.strip('-')
+    def _normalize_tag(self, tag: str) -> str:
+        """Normalize tag to lowercase, no accents, hyphenated"""
+        return normalize_tag(tag)
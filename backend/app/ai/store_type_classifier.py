@@ -2,12 +2,15 @@
 Store type classifier - distinguishes between physical store and online complaints
 """
 import json
-from app.ai.gemini_client import GeminiClient
+from app.ai.gemini_client import get_gemini_client
 from typing import Dict
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Output contract shared with the fused analyzer
+STORE_TYPES = ("physical", "online", "unknown")
+
 STORE_TYPE_PROMPT = """Analise a reclamação abaixo e determine se ela é sobre uma LOJA FÍSICA ou compra ONLINE.
 
 Indicadores de LOJA FÍSICA:
@@ -36,7 +39,7 @@ class StoreTypeClassifier:
     """Classifies complaints as physical store or online purchase"""
 
     def __init__(self):
-        self.client = GeminiClient()
+        self.client = get_gemini_client()
 
     async def classify(self, text: str) -> Dict[str, any]:
         """
@@ -52,14 +55,8 @@ class StoreTypeClassifier:
                 - indicators: list of indicators found
         """
         try:
-            response = await self.client.analyze_text(STORE_TYPE_PROMPT, text)
-            result = json.loads(response)
-
-            return {
-                'store_type': result.get('store_type', 'unknown'),
-                'confidence': float(result.get('confidence', 0.0)),
-                'indicators': result.get('indicators', [])
-            }
+            response = await self.client.analyze_text(STORE_TYPE_PROMPT, text, validate=self._parse)
+            return self._parse(response)
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing JSON: {e}\nResponse: {response}")
             return {
@@ -70,3 +67,13 @@ class StoreTypeClassifier:
         except Exception as e:
             logger.error(f"Error classifying store type: {e}")
             raise
+
+    def _parse(self, response: str) -> Dict[str, any]:
+        """Store type result from the Gemini JSON response"""
+        result = json.loads(response)
+
+        return {
+            'store_type': result.get('store_type', 'unknown'),
+            'confidence': float(result.get('confidence', 0.0)),
+            'indicators': result.get('indicators', [])
+        }
@@ -1,12 +1,19 @@
 """
 Analytics endpoints for complaint analysis
 Route order: batch routes must come before parameterized routes
+
+The /stats endpoints read the pre-aggregated analytics_rollups table
+(app.db.rollups) instead of scanning complaints.
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func, extract
 from app.core.database import get_db
 from app.services.analysis_service import AnalysisService
+from app.services.job_queue import enqueue_job, job_to_dict
+from app.db.crud import get_complaint
+from app.db import rollups
+from app.ai.gemini_client import get_gemini_client
 from app.db.models import Complaint
 from typing import Optional
 from datetime import datetime, timedelta
@@ -26,12 +33,13 @@ async def analyze_batch(
     """
     Analisar todas as reclamações não analisadas (ou até o limite especificado)
 
-    Retorna estatísticas sobre o processo de análise em lote.
+    A análise roda em segundo plano na fila de jobs. Retorna o job criado;
+    acompanhe o progresso em GET /jobs/{job_id} e o resultado de cada
+    reclamação em GET /jobs/{job_id}/items.
     """
     try:
-        service = AnalysisService()
-        result = await service.analyze_batch(db, limit=limit)
-        return result
+        job = enqueue_job(db, "analyze_batch", params={"limit": limit})
+        return job_to_dict(job)
     except Exception as e:
         logger.error(f"Error in batch analysis: {e}")
         raise HTTPException(status_code=500, detail=f"Batch analysis error: {str(e)}")
@@ -40,6 +48,7 @@ async def analyze_batch(
 @router.post("/analyze/{complaint_id}")
 async def analyze_complaint(
     complaint_id: int,
+    background: bool = Query(False, description="Enfileirar como job em vez de esperar o resultado"),
     db: Session = Depends(get_db)
 ):
     """
@@ -50,7 +59,14 @@ async def analyze_complaint(
     - Classificação por categoria
     - Extração de entidades
     - Cálculo de score de urgência
+
+    Com background=true retorna o job criado (GET /jobs/{job_id}).
     """
+    if background:
+        if not get_complaint(db, complaint_id):
+            raise HTTPException(status_code=404, detail=f"Complaint {complaint_id} not found")
+        return job_to_dict(enqueue_job(db, "analyze_complaint", params={"complaint_id": complaint_id}))
+
     try:
         service = AnalysisService()
         result = await service.analyze_complaint(db, complaint_id)
@@ -70,30 +86,34 @@ async def sentiment_stats(db: Session = Depends(get_db)):
     Retorna contagem e score mÃ©dio por sentimento (Negativo, Neutro, Positivo)
     """
     try:
-        stats = db.query(
-            Complaint.sentiment,
-            func.count(Complaint.id).label('count'),
-            func.avg(Complaint.sentiment_score).label('avg_score'),
-            func.min(Complaint.sentiment_score).label('min_score'),
-            func.max(Complaint.sentiment_score).label('max_score')
-        ).filter(
-            Complaint.sentiment.isnot(None)
-        ).group_by(Complaint.sentiment).all()
-
-        total_analyzed = sum(s.count for s in stats)
+        rows = rollups.totals_by_value(db, "sentiment")
+
+        # min/max are not additive: grouped aggregate over the analyzed rows
+        score_ranges = {
+            r.sentiment: (r.min_score, r.max_score)
+            for r in db.query(
+                Complaint.sentiment,
+                func.min(Complaint.sentiment_score).label('min_score'),
+                func.max(Complaint.sentiment_score).label('max_score')
+            ).filter(
+                Complaint.sentiment.isnot(None)
+            ).group_by(Complaint.sentiment).all()
+        }
+
+        total_analyzed = sum(r.count for r in rows)
 
         return {
             "total_analyzed": total_analyzed,
             "by_sentiment": [
                 {
-                    "sentiment": s.sentiment,
-                    "count": s.count,
-                    "percentage": round((s.count / total_analyzed * 100) if total_analyzed > 0 else 0, 2),
-                    "avg_score": round(float(s.avg_score), 2) if s.avg_score else 0,
-                    "min_score": round(float(s.min_score), 2) if s.min_score else 0,
-                    "max_score": round(float(s.max_score), 2) if s.max_score else 0
+                    "sentiment": r.value,
+                    "count": r.count,
+                    "percentage": round((r.count / total_analyzed * 100) if total_analyzed > 0 else 0, 2),
+                    "avg_score": round(rollups.average(r, "sentiment_score"), 2),
+                    "min_score": round(float(score_ranges.get(r.value, (0, 0))[0] or 0), 2),
+                    "max_score": round(float(score_ranges.get(r.value, (0, 0))[1] or 0), 2)
                 }
-                for s in stats
+                for r in rows
             ]
         }
     except Exception as e:
@@ -110,26 +130,8 @@ async def category_stats(db: Session = Depends(get_db)):
     (incluindo categorias mÃºltiplas)
     """
     try:
-        # Get all complaints with classification
-        complaints = db.query(Complaint).filter(
-            Complaint.classification.isnot(None)
-        ).all()
-
-        # Count categories
-        category_counts = {}
-        for complaint in complaints:
-            if complaint.classification:
-                for category in complaint.classification:
-                    category_counts[category] = category_counts.get(category, 0) + 1
-
-        # Sort by count descending
-        sorted_categories = sorted(
-            category_counts.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-
-        total = len(complaints)
+        sorted_categories = [(r.value, r.count) for r in rollups.totals_by_value(db, "category")]
+        total = rollups.total(db, "flag", "classified").count or 0
 
         return {
             "total_classified": total,
@@ -172,18 +174,14 @@ async def urgency_stats(
         ).order_by(Complaint.urgency_score.desc()).limit(limit).all()
 
         # Overall urgency stats
-        avg_urgency = db.query(func.avg(Complaint.urgency_score)).filter(
-            Complaint.urgency_score.isnot(None)
-        ).scalar() or 0
+        overall = rollups.total(db)
+        avg_urgency = rollups.average(overall, "urgency_score")
+        total_analyzed = overall.urgency_score_count or 0
 
         total_urgent = db.query(func.count(Complaint.id)).filter(
             Complaint.urgency_score >= min_score
         ).scalar() or 0
 
-        total_analyzed = db.query(func.count(Complaint.id)).filter(
-            Complaint.urgency_score.isnot(None)
-        ).scalar() or 0
-
         return {
             "avg_urgency_score": round(float(avg_urgency), 2),
             "total_urgent": total_urgent,
@@ -218,28 +216,17 @@ async def stats_overview(db: Session = Depends(get_db)):
     Combina mÃ©tricas de sentimento, categorias, urgÃªncia e anÃ¡lise geral
     """
     try:
-        total = db.query(func.count(Complaint.id)).scalar() or 0
-        analyzed = db.query(func.count(Complaint.id)).filter(
-            Complaint.sentiment.isnot(None)
-        ).scalar() or 0
-        not_analyzed = total - analyzed
+        overall = rollups.total(db)
+        total = overall.count or 0
 
         # Sentiment distribution
-        sentiment_dist = db.query(
-            Complaint.sentiment,
-            func.count(Complaint.id)
-        ).filter(
-            Complaint.sentiment.isnot(None)
-        ).group_by(Complaint.sentiment).all()
+        sentiment_dist = [(r.value, r.count) for r in rollups.totals_by_value(db, "sentiment")]
+        analyzed = sum(count for _, count in sentiment_dist)
+        not_analyzed = total - analyzed
 
         # Average scores
-        avg_sentiment = db.query(func.avg(Complaint.sentiment_score)).filter(
-            Complaint.sentiment_score.isnot(None)
-        ).scalar() or 0
-
-        avg_urgency = db.query(func.avg(Complaint.urgency_score)).filter(
-            Complaint.urgency_score.isnot(None)
-        ).scalar() or 0
+        avg_sentiment = rollups.average(overall, "sentiment_score")
+        avg_urgency = rollups.average(overall, "urgency_score")
 
         return {
             "totals": {
@@ -276,23 +263,12 @@ async def timeline_stats(
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
 
-        # Query all complaints in date range
-        complaints = db.query(Complaint).filter(
-            Complaint.complaint_date >= start_date,
-            Complaint.complaint_date <= end_date
-        ).all()
-
-        # Group by date
-        date_counts = {}
-        for complaint in complaints:
-            if complaint.complaint_date:
-                date_str = complaint.complaint_date.date().isoformat()
-                date_counts[date_str] = date_counts.get(date_str, 0) + 1
-
-        # Format data
+        # Daily counts from the rollups
         timeline_data = [
-            {"date": date, "count": count}
-            for date, count in sorted(date_counts.items())
+            {"date": r.day, "count": r.count}
+            for r in rollups.totals_by_day(
+                db, start_day=start_date.date().isoformat(), end_day=end_date.date().isoformat()
+            )
         ]
 
         total_period = sum(item['count'] for item in timeline_data)
@@ -320,21 +296,11 @@ async def location_stats(
     Retorna distribuição geográfica das reclamações
     """
     try:
-        # Query location distribution
-        locations = db.query(
-            Complaint.location,
-            func.count(Complaint.id).label('count')
-        ).filter(
-            Complaint.location.isnot(None),
-            Complaint.location != ''
-        ).group_by(
-            Complaint.location
-        ).order_by(
-            func.count(Complaint.id).desc()
-        ).limit(limit).all()
+        # Location distribution
+        locations = rollups.totals_by_value(db, "location", limit=limit)
 
         total_with_location = sum(loc.count for loc in locations)
-        total_complaints = db.query(func.count(Complaint.id)).scalar() or 0
+        total_complaints = rollups.total(db).count or 0
         no_location = total_complaints - total_with_location
 
         return {
@@ -342,12 +308,12 @@ async def location_stats(
             "with_location": total_with_location,
             "without_location": no_location,
             "locations": {
-                loc.location: loc.count
+                loc.value: loc.count
                 for loc in locations
             },
             "top_10": [
                 {
-                    "location": loc.location,
+                    "location": loc.value,
                     "count": loc.count,
                     "percentage": round((loc.count / total_with_location * 100) if total_with_location > 0 else 0, 2)
                 }
@@ -367,12 +333,7 @@ async def store_type_stats(db: Session = Depends(get_db)):
     Retorna distribuição de reclamações entre lojas físicas e compras online
     """
     try:
-        stats = db.query(
-            Complaint.store_type,
-            func.count(Complaint.id).label('count')
-        ).filter(
-            Complaint.store_type.isnot(None)
-        ).group_by(Complaint.store_type).all()
+        stats = rollups.totals_by_value(db, "store_type")
 
         total = sum(s.count for s in stats)
 
@@ -380,7 +341,7 @@ async def store_type_stats(db: Session = Depends(get_db)):
             "total_classified": total,
             "by_store_type": [
                 {
-                    "store_type": s.store_type,
+                    "store_type": s.value,
                     "count": s.count,
                     "percentage": round((s.count / total * 100) if total > 0 else 0, 2)
                 }
@@ -403,20 +364,8 @@ async def tag_stats(
     Retorna distribuição de tags, focando na faixa média (nem muito comuns, nem raras)
     """
     try:
-        # Get all complaints with tags
-        complaints = db.query(Complaint).filter(
-            Complaint.tags.isnot(None)
-        ).all()
-
-        # Count all tags
-        tag_counts = {}
-        for complaint in complaints:
-            if complaint.tags:
-                for tag in complaint.tags:
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
-
-        # Sort by count
-        sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)
+        # Tag counts, largest first
+        sorted_tags = [(r.value, r.count) for r in rollups.totals_by_value(db, "tag")]
         total_tags = len(sorted_tags)
 
         # Calculate distribution ranges
@@ -428,7 +377,7 @@ async def tag_stats(
         else:
             middle_tags = []
 
-        total_complaints = len(complaints)
+        total_complaints = rollups.total(db, "flag", "tagged").count or 0
 
         return {
             "total_tagged": total_complaints,
@@ -463,24 +412,19 @@ async def weekly_trends(db: Session = Depends(get_db)):
     Retorna análise de tendências comparando última semana com semana anterior
     """
     try:
-        now = datetime.now()
-        one_week_ago = now - timedelta(days=7)
-        two_weeks_ago = now - timedelta(days=14)
-
-        # This week's complaints
-        this_week = db.query(Complaint).filter(
-            Complaint.complaint_date >= one_week_ago,
-            Complaint.complaint_date <= now
-        ).all()
+        # Calendar days: this week is today and the 6 days before it
+        today = datetime.now().date()
+        week_start = today - timedelta(days=6)
+        last_week_start = week_start - timedelta(days=7)
+        last_week_end = week_start - timedelta(days=1)
 
-        # Last week's complaints
-        last_week = db.query(Complaint).filter(
-            Complaint.complaint_date >= two_weeks_ago,
-            Complaint.complaint_date < one_week_ago
-        ).all()
+        this_week_range = {"start_day": week_start.isoformat(), "end_day": today.isoformat()}
 
-        this_week_count = len(this_week)
-        last_week_count = len(last_week)
+        daily = rollups.totals_by_day(db, **this_week_range)
+        this_week_count = sum(r.count for r in daily)
+        last_week_count = rollups.total(
+            db, start_day=last_week_start.isoformat(), end_day=last_week_end.isoformat()
+        ).count or 0
 
         # Calculate trend
         if last_week_count > 0:
@@ -490,38 +434,23 @@ async def weekly_trends(db: Session = Depends(get_db)):
 
         trend_direction = "up" if trend_percentage > 0 else "down" if trend_percentage < 0 else "stable"
 
-        # Daily breakdown for this week
-        daily_counts = {}
-        for complaint in this_week:
-            if complaint.complaint_date:
-                date_str = complaint.complaint_date.date().isoformat()
-                daily_counts[date_str] = daily_counts.get(date_str, 0) + 1
-
         # Sentiment trend this week
         sentiment_counts = {"Negativo": 0, "Neutro": 0, "Positivo": 0}
-        for complaint in this_week:
-            if complaint.sentiment:
-                sentiment_counts[complaint.sentiment] = sentiment_counts.get(complaint.sentiment, 0) + 1
+        for r in rollups.totals_by_value(db, "sentiment", **this_week_range):
+            sentiment_counts[r.value] = r.count
 
         # Store type trend this week
         store_type_counts = {"physical": 0, "online": 0, "unknown": 0}
-        for complaint in this_week:
-            if complaint.store_type:
-                store_type_counts[complaint.store_type] = store_type_counts.get(complaint.store_type, 0) + 1
+        for r in rollups.totals_by_value(db, "store_type", **this_week_range):
+            store_type_counts[r.value] = r.count
 
         # Top tags this week
-        tag_counts = {}
-        for complaint in this_week:
-            if complaint.tags:
-                for tag in complaint.tags:
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
-
-        top_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        top_tags = [(r.value, r.count) for r in rollups.totals_by_value(db, "tag", limit=10, **this_week_range)]
 
         return {
             "period": {
-                "start": one_week_ago.date().isoformat(),
-                "end": now.date().isoformat()
+                "start": week_start.isoformat(),
+                "end": today.isoformat()
             },
             "summary": {
                 "this_week": this_week_count,
@@ -530,8 +459,8 @@ async def weekly_trends(db: Session = Depends(get_db)):
                 "trend_direction": trend_direction
             },
             "daily_breakdown": [
-                {"date": date, "count": count}
-                for date, count in sorted(daily_counts.items())
+                {"date": r.day, "count": r.count}
+                for r in daily
             ],
             "sentiment_this_week": sentiment_counts,
             "store_type_this_week": store_type_counts,
@@ -553,39 +482,24 @@ async def response_metrics(db: Session = Depends(get_db)):
     Retorna estatísticas sobre datas de criação e tempo médio de resposta
     """
     try:
+        overall = rollups.total(db)
+
         # Total complaints
-        total = db.query(func.count(Complaint.id)).scalar() or 0
+        total = overall.count or 0
 
         # Complaints with response
-        with_response = db.query(func.count(Complaint.id)).filter(
-            Complaint.company_response_date.isnot(None)
-        ).scalar() or 0
+        with_response = rollups.total(db, "flag", "responded").count or 0
 
-        # Calculate average response time (in hours)
-        complaints_with_response = db.query(Complaint).filter(
-            Complaint.complaint_date.isnot(None),
-            Complaint.company_response_date.isnot(None)
-        ).all()
-
-        total_hours = 0
-        valid_count = 0
-        for c in complaints_with_response:
-            if c.complaint_date and c.company_response_date:
-                diff = c.company_response_date - c.complaint_date
-                hours = diff.total_seconds() / 3600
-                if hours >= 0:  # Only positive response times
-                    total_hours += hours
-                    valid_count += 1
-
-        avg_response_hours = round(total_hours / valid_count, 2) if valid_count > 0 else 0
+        # Average response time (in hours), only positive response times
+        avg_response_hours = round(rollups.average(overall, "response_hours"), 2)
 
         # Response rate
         response_rate = round((with_response / total * 100) if total > 0 else 0, 2)
 
         # Resolved complaints (status contains "Resolvida" or "Resolvido")
-        resolved_count = db.query(func.count(Complaint.id)).filter(
-            Complaint.status.in_(['Resolvida', 'Resolvido'])
-        ).scalar() or 0
+        resolved_count = sum(
+            r.count for r in rollups.totals_by_value(db, "status") if r.value in ('Resolvida', 'Resolvido')
+        )
         resolution_rate = round((resolved_count / total * 100) if total > 0 else 0, 2)
 
         # Oldest and newest complaint
@@ -609,3 +523,12 @@ async def response_metrics(db: Session = Depends(get_db)):
         logger.error(f"Error getting response metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.get("/ai/metrics")
+async def ai_metrics():
+    """
+    Métricas do cliente Gemini
+
+    Retorna requisições em andamento, profundidade da fila e latência
+    """
+    return get_gemini_client().get_metrics()
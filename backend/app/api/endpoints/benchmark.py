@@ -7,11 +7,16 @@ from sqlalchemy import func, desc
 from typing import List, Optional
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.db.models import Competitor, CompetitorComplaint, Complaint
+from app.db.pagination import ApproximateCounter, keyset_page
 
 router = APIRouter(prefix="/benchmark", tags=["benchmark"])
 
+# Complaint totals per competitor for the paginated listing
+_complaint_counts = ApproximateCounter(settings.PAGINATION_COUNT_TTL_SECONDS)
+
 
 @router.get("/competitors")
 async def get_competitors(db: Session = Depends(get_db)):
@@ -235,20 +240,43 @@ async def get_response_patterns(db: Session = Depends(get_db)):
 async def get_competitor_complaints(
     competitor_id: int,
     page: int = Query(1, ge=1),
-    page_size: int = Query(10, le=50),
+    page_size: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces page)"),
     db: Session = Depends(get_db)
 ):
-    """Get complaints for a specific competitor."""
+    """
+    Get complaints for a specific competitor, newest first.
+
+    Pages after the first should pass the returned next_cursor (keyset on
+    complaint_date, id); page > 1 without a cursor still works with an
+    offset. total is approximate, cached for a few seconds.
+    """
     competitor = db.query(Competitor).filter(Competitor.id == competitor_id).first()
     if not competitor:
         raise HTTPException(status_code=404, detail="Competitor not found")
 
     query = db.query(CompetitorComplaint).filter(
         CompetitorComplaint.competitor_id == competitor_id
-    ).order_by(desc(CompetitorComplaint.complaint_date))
+    )
 
-    total = query.count()
-    complaints = query.offset((page - 1) * page_size).limit(page_size).all()
+    total = _complaint_counts.get(competitor_id, query.count)
+
+    next_cursor = None
+    if cursor or page == 1:
+        try:
+            complaints, next_cursor = keyset_page(
+                query, CompetitorComplaint.complaint_date, CompetitorComplaint.id,
+                page_size, cursor, nullable=True
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        # Same order as the keyset pages: dated complaints first, then undated by id
+        complaints = query.order_by(
+            CompetitorComplaint.complaint_date.is_(None),
+            desc(CompetitorComplaint.complaint_date),
+            desc(CompetitorComplaint.id)
+        ).offset((page - 1) * page_size).limit(page_size).all()
 
     return {
         'competitor': {
@@ -259,6 +287,7 @@ async def get_competitor_complaints(
         'total': total,
         'page': page,
         'page_size': page_size,
+        'next_cursor': next_cursor,
         'complaints': [
             {
                 'id': c.id,
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db import crud
-from app.schemas.complaint import Complaint, ComplaintCreate, ComplaintStats
+from app.schemas.complaint import Complaint, ComplaintCreate, ComplaintPage, ComplaintStats
 from app.core.database import get_db
 
 router = APIRouter(prefix="/complaints", tags=["complaints"])
@@ -14,22 +14,75 @@ def list_complaints(
     limit: int = Query(100, ge=1, le=1000),
     sentiment: Optional[str] = None,
     status: Optional[str] = None,
+    tag: Optional[str] = None,
+    category: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
     List complaints with optional filters
 
-    - **skip**: Number of records to skip (pagination)
+    - **skip**: Number of records to skip (pagination; use /complaints/page for deep pages)
     - **limit**: Maximum number of records to return
     - **sentiment**: Filter by sentiment (Negativo, Neutro, Positivo)
     - **status**: Filter by status (Respondida, NÃ£o respondida, Resolvida)
+    - **tag**: Filter by smart tag (e.g. atraso-entrega)
+    - **category**: Filter by AI category (produto, atendimento, entrega, preco, outros)
     """
     complaints = crud.get_complaints(
-        db, skip=skip, limit=limit, sentiment=sentiment, status=status
+        db, skip=skip, limit=limit, sentiment=sentiment, status=status,
+        tag=tag, category=category
     )
     return complaints
 
 
+@router.get("/page", response_model=ComplaintPage)
+def list_complaints_page(
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
+    limit: int = Query(50, ge=1, le=1000),
+    sentiment: Optional[str] = None,
+    status: Optional[str] = None,
+    tag: Optional[str] = None,
+    category: Optional[str] = None,
+    include_total: bool = Query(False, description="Include an approximate total (cached)"),
+    db: Session = Depends(get_db)
+):
+    """
+    List complaints with cursor pagination, newest first
+
+    Each page costs the same at any depth and rows inserted while paging
+    don't shift the following pages.
+
+    - **cursor**: next_cursor returned by the previous page (omit for the first page)
+    - **limit**: Maximum number of records to return
+    - **sentiment**, **status**, **tag**, **category**: Same filters as GET /complaints
+    - **include_total**: Add the approximate number of matching complaints
+    """
+    filters = dict(sentiment=sentiment, status=status, tag=tag, category=category)
+    try:
+        page = crud.get_complaints_page(db, limit=limit, cursor=cursor, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if include_total:
+        page["total"] = crud.count_complaints(db, **filters)
+    return page
+
+
+@router.get("/tags")
+def get_tag_counts(
+    kind: str = Query("tag", pattern="^(tag|category)$"),
+    limit: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db)
+):
+    """
+    Count complaints per tag (or per category with kind=category)
+
+    - **kind**: tag or category
+    - **limit**: Maximum number of tags to return
+    """
+    return crud.get_tag_counts(db, kind=kind, limit=limit)
+
+
 @router.get("/stats", response_model=ComplaintStats)
 def get_stats(db: Session = Depends(get_db)):
     """
@@ -0,0 +1,106 @@
+"""
+API endpoints for background jobs (enqueue, progress, cancel, retry)
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.db.crud import get_job
+from app.services import job_queue
+from pydantic import BaseModel
+from typing import Dict, Optional
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+class EnqueueJobRequest(BaseModel):
+    job_type: str  # analyze_batch, analyze_complaint, generate_response
+    params: Dict = {}
+    max_attempts: Optional[int] = None
+
+
+def _get_job_or_404(db: Session, job_id: int):
+    job = get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("")
+def enqueue_job(request: EnqueueJobRequest, db: Session = Depends(get_db)):
+    """
+    Enfileirar um job
+
+    - **analyze_batch**: params `{"limit": 100}` (opcional)
+    - **analyze_complaint** / **generate_response**: params `{"complaint_id": 1}`
+    """
+    if request.job_type != "analyze_batch" and "complaint_id" not in request.params:
+        raise HTTPException(status_code=400, detail=f"{request.job_type} requires params.complaint_id")
+
+    try:
+        job = job_queue.enqueue_job(db, request.job_type, request.params, request.max_attempts)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job_queue.job_to_dict(job)
+
+
+@router.get("")
+def list_jobs(
+    status: Optional[str] = None,
+    job_type: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Listar jobs (mais recentes primeiro)"""
+    jobs = job_queue.list_jobs(db, status=status, job_type=job_type, skip=skip, limit=limit)
+    return [job_queue.job_to_dict(job) for job in jobs]
+
+
+@router.get("/{job_id}")
+def get_job_status(job_id: int, db: Session = Depends(get_db)):
+    """Status e progresso de um job"""
+    return job_queue.job_to_dict(_get_job_or_404(db, job_id))
+
+
+@router.get("/{job_id}/items")
+def get_job_items(
+    job_id: int,
+    status: Optional[str] = Query(None, description="completed, partial ou failed"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Resultado por reclamação de um job em lote"""
+    _get_job_or_404(db, job_id)
+    items = job_queue.get_job_items(db, job_id, status=status, skip=skip, limit=limit)
+    return [
+        {
+            "complaint_id": item.complaint_id,
+            "status": item.status,
+            "error": item.error,
+            "created_at": item.created_at
+        }
+        for item in items
+    ]
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    """Cancelar um job (jobs em execução param no próximo checkpoint)"""
+    job = _get_job_or_404(db, job_id)
+    try:
+        job = job_queue.cancel_job(db, job)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return job_queue.job_to_dict(job)
+
+
+@router.post("/{job_id}/retry")
+def retry_job(job_id: int, db: Session = Depends(get_db)):
+    """Reenfileirar um job que falhou ou foi cancelado"""
+    job = _get_job_or_404(db, job_id)
+    try:
+        job = job_queue.retry_job(db, job)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return job_queue.job_to_dict(job)
@@ -1,9 +1,10 @@
 """
 API endpoints for complaint responses
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.services.response_service import ResponseService
+from app.services.job_queue import enqueue_job, job_to_dict
 from app.core.database import get_db
 from app.db.models import Complaint
 from datetime import datetime
@@ -19,9 +20,15 @@ class EditResponseRequest(BaseModel):
 @router.post("/generate/{complaint_id}")
 async def generate_response(
     complaint_id: int,
+    background: bool = Query(False, description="Enfileirar como job em vez de esperar o resultado"),
     db: Session = Depends(get_db)
 ):
-    """Gerar resposta para reclamaÃ§Ã£o"""
+    """Gerar resposta para reclamaÃ§Ã£o (background=true retorna o job criado)"""
+    if background:
+        if not db.query(Complaint).filter(Complaint.id == complaint_id).first():
+            raise HTTPException(status_code=404, detail="Complaint not found")
+        return job_to_dict(enqueue_job(db, "generate_response", params={"complaint_id": complaint_id}))
+
     service = ResponseService()
 
     try:
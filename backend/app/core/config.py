@@ -15,10 +15,25 @@ class Settings(BaseSettings):
 
     # Scraper
     RECLAME_AQUI_COMPANY_URL: str = "https://www.reclameaqui.com.br/empresa/drogaria-venancio-site-e-televendas"
-    SCRAPER_DELAY_MIN: int = 2
-    SCRAPER_DELAY_MAX: int = 5
+    SCRAPER_BASE_URL: str = "https://www.reclameaqui.com.br"  # site of the competitor pages (replay_server.py URL for local runs)
+    SCRAPER_DELAY_MIN: int = 2  # initial delay between page loads (adapted to how the site responds)
+    SCRAPER_DELAY_MAX: int = 5  # delays are jittered up to DELAY_MAX / DELAY_MIN times the current delay
+    SCRAPER_DELAY_FLOOR: float = 0.5  # shortest delay reached while the site is healthy
+    SCRAPER_BACKOFF_MAX_SECONDS: float = 300  # longest delay reached backing off challenges and errors
     SCRAPER_MAX_PAGES: int = 300
     SCRAPER_POLLING_INTERVAL_HOURS: int = 6
+    SCRAPER_BACKEND: str = "selenium"  # selenium or http (browser only clears the challenge; opt in)
+    SCRAPER_HTTP_WORKERS: int = 4  # pooled connections / parallel detail requests of the http backend
+    SCRAPER_FETCH_DETAILS: bool = False  # also read each complaint page (response, evaluation, city)
+    SCRAPER_BROWSER_POOL_SIZE: int = 3  # warmed-up browsers fetching complaint pages (selenium backend)
+    SCRAPER_BROWSER_RECYCLE_PAGES: int = 50  # pages per pooled browser before it is replaced
+    SCRAPER_REQUESTS_PER_MINUTE: float = 30  # ceiling of page loads/requests per minute across all workers
+    SCRAPER_PIPELINE_QUEUE_PAGES: int = 4  # scraped pages buffered ahead of the DB writer
+    SCRAPER_INCREMENTAL_KNOWN_PAGES: int = 1  # fully known pages in a row that end an incremental crawl
+    SCRAPER_CRAWL_COMPETITORS: bool = True  # scheduled job also crawls every Competitor.slug
+    SCRAPER_COMPETITOR_MAX_PAGES: int = 20  # listing pages per competitor crawl
+    SCRAPER_COMPANY_WORKERS: int = 3  # companies crawled at the same time
+    SCRAPER_DOMAIN_REQUESTS_PER_MINUTE: float = 60  # page loads per minute per site, shared by all companies
 
     # API
     API_TITLE: str = "Venâncio RPA API"
@@ -28,6 +43,45 @@ class Settings(BaseSettings):
 
     # Google Gemini AI
     GEMINI_API_KEY: str = ""
+    GEMINI_MODEL: str = "gemini-2.5-flash"
+    GEMINI_MAX_CONCURRENCY: int = 8  # Max in-flight Gemini requests per process
+    GEMINI_RPM_LIMIT: int = 300  # Requests per minute budget
+    GEMINI_TPM_LIMIT: int = 1000000  # Tokens per minute budget
+    GEMINI_MAX_RETRIES: int = 3  # Retries on 429 / resource exhausted
+    GEMINI_REQUEST_TIMEOUT_SECONDS: float = 55.0  # Deadline of one API call (frees its worker thread)
+
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "./llm_cache.db"
+    LLM_CACHE_TTL_HOURS: float = 720.0
+    LLM_CACHE_MAX_ENTRIES: int = 50000
+
+    # Analysis pipeline
+    ANALYSIS_MODE: str = "concurrent"  # sequential, concurrent, fused
+    ANALYSIS_STAGE_TIMEOUT_SECONDS: float = 60.0
+    ANALYSIS_BATCH_CONCURRENCY: int = 8  # complaints analyzed at the same time
+    ANALYSIS_BATCH_CHUNK_SIZE: int = 50  # complaints loaded and committed per chunk
+
+    # Job queue
+    JOB_WORKER_ENABLED: bool = True  # run a worker thread inside the API process
+    JOB_WORKER_POLL_SECONDS: float = 5.0
+    JOB_LEASE_SECONDS: float = 300.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 30.0  # delay before a failed job is retried, doubled per attempt
+
+    # Event-driven analysis of new complaints
+    EVENT_CONSUMER_ENABLED: bool = True  # consume the complaint event outbox inside the API process
+    EVENT_BATCH_SIZE: int = 50
+    EVENT_BATCH_WINDOW_SECONDS: float = 2.0  # wait after a wake-up so a burst is analyzed together
+    EVENT_POLL_SECONDS: float = 30.0  # fallback poll for events written by other processes
+
+    # Scraper ingestion
+    INGEST_CHUNK_SIZE: int = 500  # complaints per upsert transaction
+    # Scraped columns refreshed when a known complaint is scraped again (empty = insert only)
+    INGEST_UPDATE_FIELDS: str = "status,company_response_text,company_response_date,customer_evaluation,evaluation_date"
+
+    # Listings
+    PAGINATION_COUNT_TTL_SECONDS: float = 60.0  # how long approximate listing totals are cached
 
     class Config:
         env_file = Path(__file__).parent.parent.parent / ".env"
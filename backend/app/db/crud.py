@@ -1,15 +1,26 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.db.models import Complaint
+from sqlalchemy import func, case, insert, update, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from app.db.models import Competitor, CompetitorComplaint, Complaint, ComplaintChange, ComplaintTag, Job, JobItem
+from app.db.json_agg import positive_hours_between
+from app.db.outbox import add_complaint_events
+from app.db import rollups
+from app.db.pagination import ApproximateCounter, keyset_page
+from app.core.config import settings
 from app.schemas.complaint import ComplaintCreate
-from typing import List, Optional, Dict
+from typing import Iterable, List, Optional, Dict, Tuple
+from types import SimpleNamespace
 from datetime import datetime
+import hashlib
 
 
 def create_complaint(db: Session, complaint: ComplaintCreate) -> Complaint:
     """Create a new complaint"""
     db_complaint = Complaint(**complaint.model_dump())
     db.add(db_complaint)
+    db.flush()
+    add_complaint_events(db, [db_complaint.id])
+    rollups.record_insert(db, [db_complaint])
     db.commit()
     db.refresh(db_complaint)
     return db_complaint
@@ -20,22 +31,92 @@ def get_complaint(db: Session, complaint_id: int) -> Optional[Complaint]:
     return db.query(Complaint).filter(Complaint.id == complaint_id).first()
 
 
-def get_complaints(
+_complaint_counts = ApproximateCounter(settings.PAGINATION_COUNT_TTL_SECONDS)
+
+
+def _filtered_complaints(
     db: Session,
-    skip: int = 0,
-    limit: int = 100,
     sentiment: Optional[str] = None,
-    status: Optional[str] = None
-) -> List[Complaint]:
-    """Get complaints with optional filters"""
+    status: Optional[str] = None,
+    tag: Optional[str] = None,
+    category: Optional[str] = None
+):
+    """Complaints matching the listing filters (tag/category use complaint_tags)"""
     query = db.query(Complaint)
 
     if sentiment:
         query = query.filter(Complaint.sentiment == sentiment)
     if status:
         query = query.filter(Complaint.status == status)
+    if tag:
+        query = query.filter(Complaint.id.in_(_tagged_ids(db, tag, "tag")))
+    if category:
+        query = query.filter(Complaint.id.in_(_tagged_ids(db, category, "category")))
+
+    return query
 
-    return query.order_by(Complaint.created_at.desc()).offset(skip).limit(limit).all()
+
+def get_complaints(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    sentiment: Optional[str] = None,
+    status: Optional[str] = None,
+    tag: Optional[str] = None,
+    category: Optional[str] = None
+) -> List[Complaint]:
+    """Get complaints with optional filters, by offset (prefer get_complaints_page for deep pages)"""
+    query = _filtered_complaints(db, sentiment=sentiment, status=status, tag=tag, category=category)
+    return query.order_by(Complaint.created_at.desc(), Complaint.id.desc()).offset(skip).limit(limit).all()
+
+
+def get_complaints_page(
+    db: Session,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    status: Optional[str] = None,
+    tag: Optional[str] = None,
+    category: Optional[str] = None
+) -> Dict:
+    """
+    One page of complaints, newest first, by keyset on (created_at, id)
+
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    query = _filtered_complaints(db, sentiment=sentiment, status=status, tag=tag, category=category)
+    items, next_cursor = keyset_page(query, Complaint.created_at, Complaint.id, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def count_complaints(
+    db: Session,
+    sentiment: Optional[str] = None,
+    status: Optional[str] = None,
+    tag: Optional[str] = None,
+    category: Optional[str] = None
+) -> int:
+    """
+    Approximate number of complaints matching the listing filters
+
+    Cached for PAGINATION_COUNT_TTL_SECONDS. No filter or a single filter
+    is read from the analytics rollups; combined filters run one COUNT per
+    TTL.
+    """
+    filters = {
+        name: value
+        for name, value in (("sentiment", sentiment), ("status", status), ("tag", tag), ("category", category))
+        if value
+    }
+
+    def count():
+        if len(filters) <= 1:
+            dimension, value = next(iter(filters.items()), ("all", ""))
+            return rollups.total(db, dimension, value).count
+        return _filtered_complaints(db, **filters).with_entities(func.count(Complaint.id)).scalar()
+
+    return _complaint_counts.get(("complaints",) + tuple(sorted(filters.items())), count)
 
 
 def get_complaints_by_sentiment(db: Session, sentiment: str) -> List[Complaint]:
@@ -48,16 +129,99 @@ def get_complaint_by_external_id(db: Session, external_id: str) -> Optional[Comp
     return db.query(Complaint).filter(Complaint.external_id == external_id).first()
 
 
-def update_complaint_analysis(db: Session, complaint_id: int, **kwargs) -> Optional[Complaint]:
-    """Update complaint with analysis data (used by Chat B)"""
+def _unanalyzed(db: Session, complaint_ids: Optional[List[int]] = None):
+    """Complaints without analysis (served by the ix_complaints_unanalyzed partial index)"""
+    query = db.query(Complaint).filter(Complaint.sentiment == None)
+    if complaint_ids is not None:
+        query = query.filter(Complaint.id.in_(complaint_ids))
+    return query
+
+
+def count_unanalyzed(db: Session, complaint_ids: Optional[List[int]] = None) -> int:
+    """Number of complaints waiting for analysis"""
+    return _unanalyzed(db, complaint_ids).with_entities(func.count(Complaint.id)).scalar() or 0
+
+
+def get_unanalyzed_batch(
+    db: Session,
+    after_id: int = 0,
+    limit: int = 50,
+    complaint_ids: Optional[List[int]] = None
+) -> List:
+    """Next (id, title, text) rows of the work queue after after_id, in id order"""
+    return (
+        _unanalyzed(db, complaint_ids)
+        .with_entities(Complaint.id, Complaint.title, Complaint.text)
+        .filter(Complaint.id > after_id)
+        .order_by(Complaint.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def _tagged_ids(db: Session, tag: str, kind: str):
+    """Subquery of complaint ids carrying a tag, answered from the tag index"""
+    return db.query(ComplaintTag.complaint_id).filter(
+        ComplaintTag.tag == tag,
+        ComplaintTag.kind == kind
+    )
+
+
+def sync_complaint_tags(db: Session, complaint: Complaint):
+    """Rewrite the complaint_tags rows of a complaint from its JSON columns (no commit)"""
+    db.query(ComplaintTag).filter(ComplaintTag.complaint_id == complaint.id).delete(synchronize_session=False)
+
+    rows = {}
+    for kind, values in (("tag", complaint.tags), ("category", complaint.classification)):
+        for value in values or []:
+            rows[(kind, value)] = {
+                "complaint_id": complaint.id,
+                "tag": value,
+                "kind": kind,
+                "is_primary": kind == "tag" and value == complaint.primary_tag
+            }
+    if rows:
+        db.bulk_insert_mappings(ComplaintTag, list(rows.values()))
+
+
+def get_tag_counts(db: Session, kind: str = "tag", limit: Optional[int] = None) -> List[Dict]:
+    """Complaints per tag (or category), most used first"""
+    query = db.query(
+        ComplaintTag.tag,
+        func.count(ComplaintTag.complaint_id).label('count'),
+        func.sum(case((ComplaintTag.is_primary == True, 1), else_=0)).label('primary_count')
+    ).filter(
+        ComplaintTag.kind == kind
+    ).group_by(ComplaintTag.tag).order_by(func.count(ComplaintTag.complaint_id).desc())
+
+    if limit:
+        query = query.limit(limit)
+
+    return [
+        {"tag": row.tag, "count": row.count, "primary_count": int(row.primary_count or 0)}
+        for row in query.all()
+    ]
+
+
+def update_complaint_analysis(db: Session, complaint_id: int, commit: bool = True, **kwargs) -> Optional[Complaint]:
+    """Update complaint with analysis data (used by Chat B)
+
+    With commit=False the change is only added to the session, so batch
+    callers can commit many complaints at once.
+    """
     complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
     if complaint:
+        before = rollups.contributions(complaint)
         for key, value in kwargs.items():
             if hasattr(complaint, key):
                 setattr(complaint, key, value)
         complaint.analyzed_at = datetime.now()
-        db.commit()
-        db.refresh(complaint)
+        rollups.record_update(db, before, complaint)
+        if {'tags', 'classification', 'primary_tag'} & kwargs.keys():
+            sync_complaint_tags(db, complaint)
+        if commit:
+            db.commit()
+            db.refresh(complaint)
     return complaint
 
 
@@ -74,64 +238,453 @@ def update_complaint_response(db: Session, complaint_id: int, **kwargs) -> Optio
 
 
 def bulk_create_complaints(db: Session, complaints: List[Dict]) -> int:
-    """Bulk create complaints (for scraper)"""
-    count = 0
+    """Bulk create complaints (for scraper), skipping known external_ids"""
+    return bulk_upsert_complaints(db, complaints, update_fields=())["created"]
+
+
+# Scraped columns that may be refreshed when a complaint is scraped again
+INGEST_UPDATABLE_FIELDS = (
+    "title", "text", "user_name", "complaint_date", "status", "category", "location", "url_slug",
+    "company_response_text", "company_response_date", "customer_evaluation", "evaluation_date",
+)
+
+
+# Scraped fields that move after a complaint is published; their hash tells
+# a re-scraped complaint apart from an unchanged one
+CONTENT_HASH_FIELDS = (
+    "status", "company_response_text", "company_response_date", "customer_evaluation", "evaluation_date",
+)
+
+
+# Listing pages put dealAgain (a bool) in the customer_evaluation Text
+# column, which SQLite stores as '1'/'0' and Postgres as 'true'/'false'
+BOOL_TEXT_FIELDS = ("customer_evaluation",)
+_STORED_BOOLS = {"1": "1", "0": "0", "true": "1", "false": "0"}
+
+
+def _text_value(field: str, value) -> Optional[str]:
+    """A scraped or stored value in the one text form it is hashed, compared and logged in"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    value = str(value)
+    return _STORED_BOOLS.get(value, value) if field in BOOL_TEXT_FIELDS else value
+
+
+def complaint_content_hash(values: Dict) -> str:
+    """sha256 of CONTENT_HASH_FIELDS (None and "" hash the same, scraped and stored values alike)"""
+    parts = [_text_value(field, values.get(field)) or "" for field in CONTENT_HASH_FIELDS]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _scraped_values(row: Dict, fields: Iterable[str]) -> Dict:
+    """The fields a scraped row actually carries (listing pages leave some out)"""
+    return {field: row[field] for field in fields if row.get(field) not in (None, "")}
+
+
+def _ingest_update_fields(update_fields: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    if update_fields is None:
+        update_fields = [f.strip() for f in settings.INGEST_UPDATE_FIELDS.split(",") if f.strip()]
+    unknown = set(update_fields) - set(INGEST_UPDATABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Fields cannot be updated on ingest: {', '.join(sorted(unknown))}")
+    return tuple(update_fields)
+
+
+def bulk_upsert_complaints(
+    db: Session,
+    complaints: List[Dict],
+    update_fields: Optional[Iterable[str]] = None,
+    chunk_size: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Ingest scraped complaints keyed by external_id
+
+    New complaints are inserted with INSERT ... ON CONFLICT DO NOTHING and
+    get a "created" event. Known complaints are compared by content_hash
+    first, over the fields the scraped dict carries (listing pages leave
+    the response and evaluation out); only those whose hash moved are
+    loaded, and they only have
+    update_fields refreshed (INSERT ... ON CONFLICT DO UPDATE) where the
+    scraped value is non-empty and differs from the stored one. Every
+    refreshed field is written to complaint_changes and the complaint gets
+    an "updated" event. Each chunk costs a handful of statements instead of
+    a lookup per complaint.
+
+    Args:
+        db: Database session
+        complaints: Complaint column dicts (unknown keys are ignored)
+        update_fields: Columns refreshed on known complaints
+            (default INGEST_UPDATE_FIELDS, () = insert only)
+        chunk_size: Complaints per transaction (default INGEST_CHUNK_SIZE)
+
+    Returns:
+        Dict with created, updated, unchanged and changes (field changes logged) counts
+
+    Raises:
+        ValueError: Se update_fields tiver colunas que não vêm do scraping
+    """
+    fields = _ingest_update_fields(update_fields)
+    chunk_size = chunk_size or settings.INGEST_CHUNK_SIZE
+    columns = set(Complaint.__table__.columns.keys()) - {"id"}
+
+    # The last occurrence of an external_id wins
+    keyed, keyless = {}, []
     for complaint_data in complaints:
-        # Check if already exists by external_id
-        external_id = complaint_data.get('external_id')
-        if external_id:
-            existing = get_complaint_by_external_id(db, external_id)
-            if existing:
-                continue
+        row = {key: value for key, value in complaint_data.items() if key in columns}
+        if row.get("external_id"):
+            keyed[row["external_id"]] = row
+        else:
+            keyless.append(row)
+    rows = list(keyed.values()) + keyless
+
+    totals = {"created": 0, "updated": 0, "unchanged": 0, "changes": 0}
+    for start in range(0, len(rows), chunk_size):
+        counts = _upsert_complaint_chunk(db, rows[start:start + chunk_size], fields)
+        db.commit()
+        for key in totals:
+            totals[key] += counts[key]
+    return totals
+
+
+def _upsert_complaint_chunk(db: Session, rows: List[Dict], fields: Tuple[str, ...]) -> Dict[str, int]:
+    """Insert/refresh one chunk and record its rollups, changes and events (no commit)"""
+    table = Complaint.__table__
+    tracked = ("id", "external_id") + tuple(dict.fromkeys(rollups.TRACKED_COLUMNS + fields + CONTENT_HASH_FIELDS))
+    for row in rows:
+        row["content_hash"] = complaint_content_hash(row)  # what a new complaint is stored with
+
+    # Narrow lookup: which complaints are known, and is their content the same.
+    # A row that leaves hashed fields out (listing-only scrape) is compared
+    # with the stored values of those fields, so it does not look changed.
+    stored = {}
+    external_ids = [row["external_id"] for row in rows if row.get("external_id")]
+    if external_ids:
+        partial = any(len(_scraped_values(row, CONTENT_HASH_FIELDS)) < len(CONTENT_HASH_FIELDS) for row in rows)
+        lookup = [table.c.external_id, table.c.content_hash]
+        if partial:
+            lookup += [table.c[field] for field in CONTENT_HASH_FIELDS]
+        stored = {
+            current["external_id"]: dict(current)
+            for current in db.execute(
+                table.select().with_only_columns(*lookup).where(table.c.external_id.in_(external_ids))
+            ).mappings()
+        }
+
+    new_rows = [row for row in rows if row.get("external_id") not in stored]
+    moved = {}
+    for row in rows:
+        current = stored.get(row.get("external_id"))
+        if current is None:
+            continue
+        seen = {**current, **_scraped_values(row, CONTENT_HASH_FIELDS)}
+        if complaint_content_hash(seen) != current["content_hash"]:
+            moved[row["external_id"]] = row
+
+    # Full rows only for the complaints whose hash moved
+    changed, rehashed = [], []
+    if moved:
+        for current in db.execute(
+            table.select().with_only_columns(*[table.c[name] for name in tracked], table.c.content_hash)
+            .where(table.c.external_id.in_(list(moved)))
+        ).mappings():
+            current = dict(current)
+            row = moved[current["external_id"]]
+            # Fields the row does not carry keep their stored value
+            changes = {
+                field: value for field, value in _scraped_values(row, fields).items()
+                if _text_value(field, value) != _text_value(field, current[field])
+            }
+            after = {**current, **changes}
+            after["content_hash"] = complaint_content_hash(after)
+            if changes:
+                changed.append((current, changes, after))
+            elif after["content_hash"] != current["content_hash"]:
+                # Nothing to refresh, but the stored hash is missing or stale
+                rehashed.append({"b_id": current["id"], "b_content_hash": after["content_hash"]})
+
+    delta = rollups.RollupDelta()
+    created = _insert_complaints(db, new_rows, tracked)
+    for complaint in created:
+        delta.add(complaint)
+    add_complaint_events(db, [c.id for c in created])
+
+    change_log = []
+    if changed:
+        _update_complaints(db, [
+            {field: after[field] for field in ("external_id",) + fields + ("content_hash",)}
+            for _, _, after in changed
+        ])
+        for current, changes, after in changed:
+            delta.add(SimpleNamespace(**current), sign=-1)
+            delta.add(SimpleNamespace(**after))
+            change_log += [
+                {
+                    "complaint_id": current["id"],
+                    "field": field,
+                    "old_value": _text_value(field, current[field]),
+                    "new_value": _text_value(field, value),
+                    "detected_at": datetime.now(),
+                }
+                for field, value in changes.items()
+            ]
+        db.bulk_insert_mappings(ComplaintChange, change_log)
+        add_complaint_events(db, [current["id"] for current, _, _ in changed], event_type="updated")
+
+    if rehashed:
+        db.execute(
+            update(table).where(table.c.id == bindparam("b_id")).values(content_hash=bindparam("b_content_hash")),
+            rehashed
+        )
+
+    delta.apply(db)
+    return {
+        "created": len(created),
+        "updated": len(changed),
+        "unchanged": len(rows) - len(new_rows) - len(changed),
+        "changes": len(change_log),
+    }
+
+
+def _insert_complaints(db: Session, rows: List[Dict], returning: Tuple[str, ...]) -> List:
+    """INSERT ... ON CONFLICT (external_id) DO NOTHING, returning the inserted rows"""
+    table = Complaint.__table__
+    dialect = db.get_bind().dialect.name
+
+    # executemany needs the same keys in every row; leaving absent columns
+    # out keeps their server defaults (created_at, scraped_at)
+    groups: Dict[Tuple[str, ...], List[Dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    inserted = []
+    for group in groups.values():
+        if dialect in ("sqlite", "postgresql"):
+            stmt = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(table)
+            stmt = stmt.on_conflict_do_nothing(index_elements=["external_id"])
+        else:
+            stmt = insert(table)
+        result = db.execute(stmt.returning(*[table.c[name] for name in returning]), group)
+        inserted += [SimpleNamespace(**row) for row in result.mappings()]
+    return inserted
+
+
+def _update_complaints(db: Session, rows: List[Dict]):
+    """Write the new values of known complaints (external_id + the refreshed fields)"""
+    table = Complaint.__table__
+    dialect = db.get_bind().dialect.name
+    fields = [key for key in rows[0] if key != "external_id"]
+
+    if dialect in ("sqlite", "postgresql"):
+        # Every row conflicts (it was just read), so only the DO UPDATE part runs
+        stmt = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["external_id"],
+            set_={**{field: stmt.excluded[field] for field in fields}, "updated_at": func.now()}
+        )
+        # text is NOT NULL and checked before the conflict
+        db.execute(stmt, [{"text": "", **row} for row in rows])
+        return
+
+    stmt = (
+        update(table)
+        .where(table.c.external_id == bindparam("b_external_id"))
+        .values({field: bindparam(f"b_{field}") for field in fields} | {"updated_at": func.now()})
+    )
+    db.execute(stmt, [{f"b_{key}": value for key, value in row.items()} for row in rows])
+
+
+# Scraped columns of competitor complaints refreshed when scraped again
+# (the AI analysis columns are never touched by ingestion)
+COMPETITOR_UPDATABLE_FIELDS = (
+    "title", "text", "complaint_date", "status", "url_slug", "company_response", "response_date",
+    "customer_evaluation", "would_buy_again", "was_resolved",
+)
+
+
+def competitor_complaint_row(competitor_id: int, complaint_data: Dict) -> Dict:
+    """competitor_complaints columns of a scraped complaint (same dicts as for our own complaints)"""
+    status = complaint_data.get("status")
+    # Listing pages carry dealAgain (bool) where detail pages carry the evaluation text
+    evaluation = complaint_data.get("customer_evaluation")
+    return {
+        "competitor_id": competitor_id,
+        "external_id": complaint_data.get("external_id") or None,
+        "url_slug": complaint_data.get("url_slug") or complaint_data.get("url"),
+        "title": complaint_data.get("title"),
+        "text": complaint_data.get("text"),
+        "complaint_date": complaint_data.get("complaint_date"),
+        "status": status,
+        "company_response": complaint_data.get("company_response_text"),
+        "response_date": complaint_data.get("company_response_date"),
+        "customer_evaluation": evaluation if isinstance(evaluation, str) else None,
+        "would_buy_again": evaluation if isinstance(evaluation, bool) else None,
+        "was_resolved": {"Resolvido": True, "Não resolvido": False}.get(status),
+    }
+
+
+def bulk_upsert_competitor_complaints(
+    db: Session,
+    competitor_id: int,
+    complaints: List[Dict],
+    chunk_size: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Ingest scraped complaints of a competitor keyed by external_id
+
+    New complaints are inserted (INSERT ... ON CONFLICT DO NOTHING), known
+    ones have COMPETITOR_UPDATABLE_FIELDS refreshed where the scraped value
+    is non-empty and differs from the stored one, in one executemany per
+    chunk.
 
-        db_complaint = Complaint(**complaint_data)
-        db.add(db_complaint)
-        count += 1
+    Args:
+        db: Database session
+        competitor_id: Competitor the complaints belong to
+        complaints: Scraped complaint dicts (as for bulk_upsert_complaints)
+        chunk_size: Complaints per transaction (default INGEST_CHUNK_SIZE)
 
+    Returns:
+        Dict with created, updated and unchanged counts
+    """
+    chunk_size = chunk_size or settings.INGEST_CHUNK_SIZE
+    keyed = {}
+    for complaint_data in complaints:
+        row = competitor_complaint_row(competitor_id, complaint_data)
+        if row["external_id"]:
+            keyed[row["external_id"]] = row  # the last occurrence wins
+    rows = list(keyed.values())
+
+    totals = {"created": 0, "updated": 0, "unchanged": 0}
+    for start in range(0, len(rows), chunk_size):
+        counts = _upsert_competitor_chunk(db, rows[start:start + chunk_size])
+        db.commit()
+        for key in totals:
+            totals[key] += counts[key]
+    return totals
+
+
+def _upsert_competitor_chunk(db: Session, rows: List[Dict]) -> Dict[str, int]:
+    """Insert/refresh one chunk of competitor complaints (no commit)"""
+    table = CompetitorComplaint.__table__
+    stored = {
+        current["external_id"]: dict(current)
+        for current in db.execute(
+            table.select().with_only_columns(
+                table.c.id, table.c.external_id, *[table.c[field] for field in COMPETITOR_UPDATABLE_FIELDS]
+            ).where(table.c.external_id.in_([row["external_id"] for row in rows]))
+        ).mappings()
+    }
+
+    new_rows = [row for row in rows if row["external_id"] not in stored]
+    if new_rows:
+        dialect = db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            stmt = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(table)
+            stmt = stmt.on_conflict_do_nothing(index_elements=["external_id"])
+        else:
+            stmt = insert(table)
+        db.execute(stmt, new_rows)
+
+    updates = []
+    for row in rows:
+        current = stored.get(row["external_id"])
+        if current is None:
+            continue
+        changes = {
+            field: row[field] for field in COMPETITOR_UPDATABLE_FIELDS
+            if row[field] not in (None, "") and row[field] != current[field]
+        }
+        if changes:
+            # executemany needs every key in every row: unchanged fields keep their value
+            updates.append({"b_id": current["id"], **{
+                f"b_{field}": changes.get(field, current[field]) for field in COMPETITOR_UPDATABLE_FIELDS
+            }})
+    if updates:
+        db.execute(
+            update(table).where(table.c.id == bindparam("b_id"))
+            .values({field: bindparam(f"b_{field}") for field in COMPETITOR_UPDATABLE_FIELDS}),
+            updates
+        )
+
+    return {"created": len(new_rows), "updated": len(updates), "unchanged": len(rows) - len(new_rows) - len(updates)}
+
+
+def refresh_competitor_metrics(db: Session, competitor_ids: Optional[List[int]] = None) -> int:
+    """
+    Recompute the Competitor metrics from their scraped complaints (commits)
+
+    response_rate, solution_rate and would_buy_again (%) and
+    avg_response_time_hours come from one grouped query. Competitors
+    without scraped complaints keep their values.
+
+    Returns:
+        Number of competitors refreshed
+    """
+    cc = CompetitorComplaint
+    response_hours = positive_hours_between(db, cc.complaint_date, cc.response_date)
+    query = db.query(
+        cc.competitor_id,
+        func.count(cc.id).label("total"),
+        func.count(cc.company_response).label("responded"),
+        func.count(cc.was_resolved).label("evaluated"),
+        func.sum(case((cc.was_resolved == True, 1), else_=0)).label("resolved"),
+        func.count(cc.would_buy_again).label("buy_answers"),
+        func.sum(case((cc.would_buy_again == True, 1), else_=0)).label("would_buy_again"),
+        func.avg(response_hours).label("avg_response_hours"),
+    ).group_by(cc.competitor_id)
+    if competitor_ids is not None:
+        query = query.filter(cc.competitor_id.in_(competitor_ids))
+
+    rows = query.all()
+    now = datetime.now()
+    for row in rows:
+        values = {
+            "response_rate": round(row.responded / row.total * 100, 1),
+            "last_updated": now,
+        }
+        if row.evaluated:
+            values["solution_rate"] = round(row.resolved / row.evaluated * 100, 1)
+        if row.buy_answers:
+            values["would_buy_again"] = round(row.would_buy_again / row.buy_answers * 100, 1)
+        if row.avg_response_hours is not None:
+            values["avg_response_time_hours"] = round(float(row.avg_response_hours), 1)
+        db.query(Competitor).filter(Competitor.id == row.competitor_id).update(values, synchronize_session=False)
     db.commit()
-    return count
+    return len(rows)
 
 
 def get_stats(db: Session) -> Dict:
-    """Get statistics about complaints"""
-    total = db.query(Complaint).count()
+    """Get statistics about complaints (from the analytics rollups)"""
+    overall = rollups.total(db)
+    total = overall.count or 0
 
     # By sentiment
-    sentiments = db.query(
-        Complaint.sentiment,
-        func.count(Complaint.id)
-    ).group_by(Complaint.sentiment).all()
-    by_sentiment = {s[0] if s[0] else 'Unknown': s[1] for s in sentiments}
+    by_sentiment = {
+        r.value or 'Unknown': r.count
+        for r in rollups.totals_by_value(db, "sentiment", include_empty=True)
+    }
 
     # By status
-    statuses = db.query(
-        Complaint.status,
-        func.count(Complaint.id)
-    ).group_by(Complaint.status).all()
-    by_status = {s[0] if s[0] else 'Unknown': s[1] for s in statuses}
+    by_status = {
+        r.value or 'Unknown': r.count
+        for r in rollups.totals_by_value(db, "status", include_empty=True)
+    }
 
     # By category (using tags from AI analysis)
-    complaints_with_tags = db.query(Complaint).filter(
-        Complaint.tags.isnot(None)
-    ).all()
-
-    category_counts = {}
-    for complaint in complaints_with_tags:
-        if complaint.tags:
-            for tag in complaint.tags:
-                category_counts[tag] = category_counts.get(tag, 0) + 1
-
-    by_category = category_counts if category_counts else {'Sem categoria': db.query(Complaint).count()}
+    category_counts = {r.value: r.count for r in rollups.totals_by_value(db, "tag")}
+    by_category = category_counts if category_counts else {'Sem categoria': total}
 
     # By Reclame Aqui category (original category field from RA)
-    ra_categories = db.query(
-        Complaint.category,
-        func.count(Complaint.id)
-    ).group_by(Complaint.category).all()
-    by_ra_category = {c[0] if c[0] else 'Sem categoria': c[1] for c in ra_categories}
+    by_ra_category = {
+        r.value or 'Sem categoria': r.count
+        for r in rollups.totals_by_value(db, "ra_category", include_empty=True)
+    }
 
     # Average urgency
-    avg_urgency = db.query(func.avg(Complaint.urgency_score)).scalar() or 0.0
+    avg_urgency = rollups.average(overall, "urgency_score")
 
     return {
         'total': total,
@@ -141,3 +694,51 @@ def get_stats(db: Session) -> Dict:
         'by_ra_category': by_ra_category,
         'avg_urgency': float(avg_urgency)
     }
+
+
+def create_job(db: Session, job_type: str, params: Optional[Dict] = None, total: int = 0) -> Job:
+    """Create a running job record"""
+    job = Job(
+        job_type=job_type,
+        status="running",
+        params=params,
+        total=total,
+        started_at=datetime.now()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_job(db: Session, job_id: int) -> Optional[Job]:
+    """Get job by ID"""
+    return db.query(Job).filter(Job.id == job_id).first()
+
+
+def add_job_items(db: Session, job: Job, items: List[Dict]):
+    """Record per-item outcomes and bump the job counters (no commit)"""
+    db.bulk_insert_mappings(JobItem, [{**item, "job_id": job.id} for item in items])
+    job.processed = (job.processed or 0) + len(items)
+    job.succeeded = (job.succeeded or 0) + sum(1 for item in items if item["status"] != "failed")
+    job.failed = (job.failed or 0) + sum(1 for item in items if item["status"] == "failed")
+
+
+def reset_job_progress(db: Session, job: Job, total: int = 0):
+    """Clear counters and items before a job (re)starts"""
+    db.query(JobItem).filter(JobItem.job_id == job.id).delete(synchronize_session=False)
+    job.total = total
+    job.processed = 0
+    job.succeeded = 0
+    job.failed = 0
+    db.commit()
+
+
+def finish_job(db: Session, job: Job, status: str = "completed", error: Optional[str] = None) -> Job:
+    """Mark a job as finished"""
+    job.status = status
+    job.error = error
+    job.finished_at = datetime.now()
+    db.commit()
+    db.refresh(job)
+    return job
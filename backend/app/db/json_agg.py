@@ -0,0 +1,77 @@
+"""
+Dialect-aware SQL helpers for JSON arrays and dates
+
+SQLite uses json_each/json_type/julianday, Postgres uses
+jsonb_array_elements_text/jsonb_typeof/extract(epoch). Both produce the
+same values, so aggregations over the tags/classification arrays run in
+the database and only (element, count) tuples come back.
+"""
+from sqlalchemy import func, cast, literal, case, true
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+from typing import List, Tuple
+
+
+def _dialect(db: Session) -> str:
+    name = db.get_bind().dialect.name
+    if name not in ("sqlite", "postgresql"):
+        raise NotImplementedError(f"JSON aggregation is not implemented for {name}")
+    return name
+
+
+def json_array_elements(db: Session, column):
+    """Table-valued function yielding one `value` row per array element"""
+    if _dialect(db) == "sqlite":
+        return func.json_each(column).table_valued("value")
+    return func.jsonb_array_elements_text(cast(column, JSONB)).table_valued("value")
+
+
+def json_is_array(db: Session, column):
+    """True when the column holds a JSON array (false for SQL NULL and JSON null)"""
+    if _dialect(db) == "sqlite":
+        return func.coalesce(func.json_type(column) == "array", False)
+    return func.coalesce(func.jsonb_typeof(cast(column, JSONB)) == "array", False)
+
+
+def day_of(db: Session, column):
+    """YYYY-MM-DD of a datetime column, '' when NULL"""
+    if _dialect(db) == "sqlite":
+        return func.coalesce(func.date(column), literal(""))
+    return func.coalesce(func.to_char(column, "YYYY-MM-DD"), literal(""))
+
+
+def hours_between(db: Session, start, end):
+    """Hours from start to end (NULL if either is NULL)"""
+    if _dialect(db) == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 24.0
+    return func.extract("epoch", end - start) / 3600.0
+
+
+def positive_hours_between(db: Session, start, end):
+    """hours_between, or NULL when negative"""
+    hours = hours_between(db, start, end)
+    return case((hours >= 0, hours), else_=None)
+
+
+def count_json_elements(db: Session, column, *filters) -> List[Tuple[str, int]]:
+    """
+    Count elements of a JSON array column across rows, in SQL
+
+    Args:
+        db: Database session
+        column: JSON array column (e.g. Complaint.tags)
+        filters: Extra WHERE clauses on the column's table
+
+    Returns:
+        (element, count) tuples, most frequent first
+    """
+    elements = json_array_elements(db, column)
+    query = (
+        db.query(elements.c.value, func.count().label("count"))
+        .select_from(column.class_)
+        .join(elements, true())
+        .filter(json_is_array(db, column), *filters)
+        .group_by(elements.c.value)
+        .order_by(func.count().desc())
+    )
+    return [(value, count) for value, count in query.all()]
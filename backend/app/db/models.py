@@ -1,15 +1,30 @@
 """
 Database models for the VenÃ¢ncio complaint system
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, JSON, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.db.base import Base
 
 
 class Complaint(Base):
     """Model for storing Reclame Aqui complaints"""
     __tablename__ = "complaints"
+    __table_args__ = (
+        # Batch work queue: WHERE sentiment IS NULL AND id > ? ORDER BY id
+        Index("ix_complaints_unanalyzed", "sentiment", "id",
+              sqlite_where=text("sentiment IS NULL"), postgresql_where=text("sentiment IS NULL")),
+        # crud.get_complaints: optional filter + ORDER BY created_at DESC
+        Index("ix_complaints_created_at", "created_at"),
+        Index("ix_complaints_status_created_at", "status", "created_at"),
+        Index("ix_complaints_sentiment_created_at", "sentiment", "created_at"),
+        # min/max of sentiment_score per sentiment, answered from the index
+        Index("ix_complaints_sentiment_score", "sentiment", "sentiment_score"),
+        # complaint_date ranges and min/max
+        Index("ix_complaints_complaint_date", "complaint_date"),
+        # urgency_score >= ? ORDER BY urgency_score DESC
+        Index("ix_complaints_urgency_score", "urgency_score"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -23,12 +38,14 @@ class Complaint(Base):
     location = Column(String(200), nullable=True)
     external_id = Column(String(100), unique=True, nullable=True, index=True)  # ID do Reclame Aqui
     url_slug = Column(String(300), nullable=True)  # URL slug do Reclame Aqui (ex: "minha-reclamacao-xyz123")
+    content_hash = Column(String(64), nullable=True)  # sha256 de status/resposta/avaliação (detecta mudanças no re-scraping)
 
     # Classificação loja física vs online (preenchido por IA)
     store_type = Column(String(50), nullable=True)  # physical, online, unknown
 
     # Tags inteligentes (preenchido por IA - distribuição média)
     tags = Column(JSON, nullable=True)  # Array de tags específicas
+    primary_tag = Column(String(100), nullable=True)  # Tag principal (SmartTagger)
 
     # Resposta da empresa no Reclame Aqui (scraped)
     company_response_text = Column(Text, nullable=True)  # Texto da resposta da empresa
@@ -61,6 +78,44 @@ class Complaint(Base):
         return f"<Complaint {self.id}: {self.title[:50] if self.title else 'N/A'}...>"
 
 
+class ComplaintChange(Base):
+    """Field-level change detected when a complaint is scraped again"""
+    __tablename__ = "complaint_changes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    complaint_id = Column(Integer, ForeignKey('complaints.id'), nullable=False, index=True)
+    field = Column(String(50), nullable=False)
+    old_value = Column(Text, nullable=True)
+    new_value = Column(Text, nullable=True)
+    detected_at = Column(DateTime, server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<ComplaintChange complaint={self.complaint_id} {self.field}: {self.old_value!r} -> {self.new_value!r}>"
+
+
+class ComplaintTag(Base):
+    """
+    Normalized tags and categories of a complaint
+
+    Mirrors Complaint.tags (kind="tag") and Complaint.classification
+    (kind="category"); kept in sync by crud.update_complaint_analysis.
+    """
+    __tablename__ = "complaint_tags"
+    __table_args__ = (
+        UniqueConstraint("complaint_id", "kind", "tag", name="uq_complaint_tags_complaint_kind_tag"),
+        Index("ix_complaint_tags_tag_kind_complaint", "tag", "kind", "complaint_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    complaint_id = Column(Integer, ForeignKey('complaints.id'), nullable=False)
+    tag = Column(String(100), nullable=False)
+    kind = Column(String(20), nullable=False, default="tag")  # tag, category
+    is_primary = Column(Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f"<ComplaintTag {self.complaint_id}: {self.kind}={self.tag}{' *' if self.is_primary else ''}>"
+
+
 class Competitor(Base):
     """Model for competitor pharmacies"""
     __tablename__ = "competitors"
@@ -92,6 +147,10 @@ class Competitor(Base):
 class CompetitorComplaint(Base):
     """Model for competitor complaints with responses"""
     __tablename__ = "competitor_complaints"
+    __table_args__ = (
+        # Per-competitor listing, newest first (keyset on complaint_date, id)
+        Index("ix_competitor_complaints_competitor_date", "competitor_id", "complaint_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     competitor_id = Column(Integer, ForeignKey('competitors.id'), nullable=False)
@@ -158,3 +217,134 @@ class Coupon(Base):
 
     def __repr__(self):
         return f"<Coupon {self.code}: {self.discount_percent}% - {'Used' if self.is_used else 'Valid'}>"
+
+
+class Job(Base):
+    """Model for long-running jobs (batch analysis, response generation)"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False)  # analyze_batch, analyze_complaint, generate_response
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, completed, failed, cancelled
+    params = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+
+    # Queue / lease
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    worker_id = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    available_at = Column(DateTime, nullable=True)  # a requeued job is not claimed before this (retry backoff)
+    cancel_requested = Column(Boolean, default=False)
+
+    # Progress counters
+    total = Column(Integer, default=0)
+    processed = Column(Integer, default=0)
+    succeeded = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+
+    # Metadata
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    items = relationship("JobItem", back_populates="job", lazy="dynamic")
+
+    def __repr__(self):
+        return f"<Job {self.id}: {self.job_type} ({self.status}) {self.processed}/{self.total}>"
+
+
+class JobItem(Base):
+    """Per-complaint outcome of a job"""
+    __tablename__ = "job_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False, index=True)
+    complaint_id = Column(Integer, nullable=True)
+    status = Column(String(20), nullable=False)  # completed, partial, failed
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+    # Relationships
+    job = relationship("Job", back_populates="items")
+
+    def __repr__(self):
+        return f"<JobItem job={self.job_id} complaint={self.complaint_id}: {self.status}>"
+
+
+class ComplaintEvent(Base):
+    """Outbox of complaint events, written in the same transaction as the complaint"""
+    __tablename__ = "complaint_events"
+    __table_args__ = (
+        # Pending events only: WHERE processed_at IS NULL ORDER BY id
+        Index("ix_complaint_events_pending", "processed_at", "id",
+              sqlite_where=text("processed_at IS NULL"), postgresql_where=text("processed_at IS NULL")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    complaint_id = Column(Integer, ForeignKey('complaints.id'), nullable=False)
+    event_type = Column(String(30), nullable=False, default="created")
+    created_at = Column(DateTime, server_default=func.now())
+    processed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ComplaintEvent {self.id}: {self.event_type} complaint={self.complaint_id}>"
+
+
+class AnalyticsRollup(Base):
+    """
+    Pre-aggregated complaint counters per day and dimension value
+
+    dimension is one of all, sentiment, store_type, status, ra_category,
+    location, tag, category or flag; an empty value means "not set" and an
+    empty day means the complaint has no date. Maintained incrementally by
+    app.db.rollups.
+    """
+    __tablename__ = "analytics_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "dimension", "value", name="uq_analytics_rollups_key"),
+        # dimension = ? [AND value = ?] [AND day range], grouped by value or day
+        Index("ix_analytics_rollups_dimension_value_day", "dimension", "value", "day"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    day = Column(String(10), nullable=False)  # YYYY-MM-DD of complaint_date
+    dimension = Column(String(20), nullable=False)
+    value = Column(String(200), nullable=False)
+
+    count = Column(Integer, nullable=False, default=0)
+    sentiment_score_sum = Column(Float, nullable=False, default=0.0)
+    sentiment_score_count = Column(Integer, nullable=False, default=0)
+    urgency_score_sum = Column(Float, nullable=False, default=0.0)
+    urgency_score_count = Column(Integer, nullable=False, default=0)
+    response_hours_sum = Column(Float, nullable=False, default=0.0)
+    response_hours_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AnalyticsRollup {self.day} {self.dimension}={self.value!r}: {self.count}>"
+
+
+class CrawlFrontier(Base):
+    """Scrape progress per company, so a crawl resumes after a crash or restart"""
+    __tablename__ = "crawl_frontier"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_slug = Column(String(200), unique=True, nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="idle")  # idle, running, completed
+    mode = Column(String(20), nullable=True)  # incremental, full
+
+    # Current (or last) run
+    pages_pending = Column(JSON, nullable=True)  # listing pages still to scrape, in order
+    pages_done = Column(JSON, nullable=True)  # listing pages written to the database
+    run_newest_external_id = Column(String(100), nullable=True)  # first complaint of page 1 in this run
+    started_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    # Last successful run
+    last_seen_external_id = Column(String(100), nullable=True)  # newest complaint already stored
+    last_success_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<CrawlFrontier {self.company_slug} ({self.status}) {len(self.pages_done or [])} done, {len(self.pages_pending or [])} pending>"
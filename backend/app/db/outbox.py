@@ -0,0 +1,74 @@
+"""
+Complaint event outbox
+
+Ingestion code adds events in the same transaction as the complaints, so
+an event exists if and only if the complaint was committed. After the
+commit a process-local signal wakes the analysis consumer; consumers in
+other processes find the events on their next poll.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.db.models import ComplaintEvent
+from datetime import datetime
+from typing import Iterable, List
+import threading
+
+_published = threading.Event()
+
+
+def add_complaint_events(db: Session, complaint_ids: Iterable[int], event_type: str = "created"):
+    """Add events to the current transaction (no commit)"""
+    now = datetime.now()
+    rows = [
+        {"complaint_id": complaint_id, "event_type": event_type, "created_at": now}
+        for complaint_id in complaint_ids
+    ]
+    if rows:
+        db.bulk_insert_mappings(ComplaintEvent, rows)
+        db.info["complaint_events_pending"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session: Session):
+    if session.info.pop("complaint_events_pending", False):
+        notify_events()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop("complaint_events_pending", None)
+
+
+def notify_events():
+    """Wake up waiting consumers (also used on shutdown)"""
+    _published.set()
+
+
+def wait_for_events(timeout: float) -> bool:
+    """Block until events are committed in this process or the timeout expires"""
+    woken = _published.wait(timeout)
+    _published.clear()
+    return woken
+
+
+def fetch_pending_events(db: Session, limit: int) -> List[ComplaintEvent]:
+    """Oldest unprocessed events"""
+    return (
+        db.query(ComplaintEvent)
+        .filter(ComplaintEvent.processed_at == None)
+        .order_by(ComplaintEvent.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def count_pending_events(db: Session) -> int:
+    return db.query(ComplaintEvent).filter(ComplaintEvent.processed_at == None).count()
+
+
+def mark_events_processed(db: Session, event_ids: List[int]):
+    """Mark events as consumed and commit"""
+    db.query(ComplaintEvent).filter(ComplaintEvent.id.in_(event_ids)).update(
+        {ComplaintEvent.processed_at: datetime.now()}, synchronize_session=False
+    )
+    db.commit()
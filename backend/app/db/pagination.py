@@ -0,0 +1,124 @@
+"""
+Keyset (cursor) pagination
+
+Pages are ordered by (sort column DESC, id DESC) and the next page starts
+strictly after the last row returned, so every page is an index range
+scan no matter how deep it is, and rows inserted while a client is paging
+never shift or duplicate the rows it has not seen yet.
+
+The cursor is an opaque, URL-safe token carrying the last (sort value, id).
+The sort value is kept as the database renders it (SQLite stores
+server-default timestamps without microseconds and Python-written ones
+with them), so comparisons follow the index order exactly.
+"""
+from sqlalchemy import String, cast, tuple_, type_coerce
+from sqlalchemy.orm import Query
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import base64
+import json
+import threading
+import time
+
+
+def encode_cursor(value: Optional[str], row_id: int) -> str:
+    """Opaque cursor for the row (value, id)"""
+    payload = json.dumps([value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], int]:
+    """
+    Parse a cursor from encode_cursor
+
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if value is not None and not isinstance(value, str):
+            raise ValueError
+        return value, int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_page(
+    query: Query,
+    sort_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    nullable: bool = False
+) -> Tuple[List, Optional[str]]:
+    """
+    One page of query, newest first
+
+    Args:
+        query: Filtered query (without ORDER BY / LIMIT)
+        sort_column: Column the pages are ordered by, descending
+        id_column: Primary key, breaks ties in sort_column
+        limit: Page size
+        cursor: next_cursor of the previous page (None for the first page)
+        nullable: sort_column may be NULL; those rows come last, by id
+
+    Returns:
+        (rows, next_cursor), next_cursor is None on the last page
+
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    value, last_id = decode_cursor(cursor) if cursor else (None, None)
+    wanted = limit + 1  # one extra row tells whether there is a next page
+    query = query.add_columns(cast(sort_column, String).label("cursor_value"))
+
+    rows = []
+    if last_id is None or value is not None:
+        # Rows with a sort value: a row-value range on (sort_column, id)
+        valued = query.filter(sort_column.isnot(None)) if nullable else query
+        if last_id is not None:
+            # Bound as the stored text, not re-rendered as a datetime
+            valued = valued.filter(tuple_(sort_column, id_column) < tuple_(type_coerce(value, String), last_id))
+        rows = valued.order_by(sort_column.desc(), id_column.desc()).limit(wanted).all()
+
+    if nullable and len(rows) < wanted:
+        # Then the rows without a sort value, by id
+        missing = query.filter(sort_column.is_(None))
+        if value is None and last_id is not None:
+            missing = missing.filter(id_column < last_id)
+        rows += missing.order_by(id_column.desc()).limit(wanted - len(rows)).all()
+
+    items = [row[0] for row in rows[:limit]]
+    if len(rows) <= limit:
+        return items, None
+    last_value = rows[limit - 1].cursor_value
+    return items, encode_cursor(last_value, getattr(items[-1], id_column.key))
+
+
+class ApproximateCounter:
+    """
+    Row counts cached for a few seconds
+
+    Paginated listings show a total without running COUNT(*) on every
+    page; the total may lag behind inserts by up to ttl seconds.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._counts: Dict[Hashable, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, count: Callable[[], Any]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached and now - cached[0] < self.ttl:
+                return cached[1]
+
+        value = int(count() or 0)
+        with self._lock:
+            self._counts[key] = (now, value)
+            if len(self._counts) > 1000:
+                # Drop expired entries so distinct filter combinations don't pile up
+                self._counts = {k: v for k, v in self._counts.items() if now - v[0] < self.ttl}
+        return value
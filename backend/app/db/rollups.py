@@ -0,0 +1,333 @@
+"""
+Incrementally maintained analytics rollups
+
+Every complaint contributes one unit to a set of (day, dimension, value)
+counters in analytics_rollups, together with its sentiment/urgency scores
+and response time. Writers record the difference between a complaint's
+contributions before and after a change, in the same transaction as the
+change, so the analytics endpoints can read small pre-aggregated rows
+instead of scanning complaints.
+"""
+from sqlalchemy import func, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.db.models import AnalyticsRollup, Complaint
+from app.db.json_agg import json_array_elements, json_is_array, day_of, positive_hours_between
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+RollupKey = Tuple[str, str, str]  # (day, dimension, value)
+
+# Metric columns, in the order of the delta vectors
+METRICS = (
+    "count",
+    "sentiment_score_sum", "sentiment_score_count",
+    "urgency_score_sum", "urgency_score_count",
+    "response_hours_sum", "response_hours_count",
+)
+
+# Complaint columns a contribution depends on
+TRACKED_COLUMNS = (
+    "complaint_date", "sentiment", "sentiment_score", "urgency_score", "store_type",
+    "status", "category", "location", "tags", "classification", "company_response_date",
+)
+
+# JSON array columns whose elements are their own dimension
+ARRAY_DIMENSIONS = (
+    ("tag", Complaint.tags),
+    ("category", Complaint.classification),
+)
+
+UPSERT_CHUNK_SIZE = 50
+
+
+def contributions(complaint) -> Dict[RollupKey, List[float]]:
+    """
+    Rollup rows a complaint counts towards, with its metric vector
+
+    Works on Complaint objects and on rows carrying TRACKED_COLUMNS.
+    """
+    day = complaint.complaint_date.date().isoformat() if complaint.complaint_date else ""
+
+    vector = [1, 0.0, 0, 0.0, 0, 0.0, 0]
+    if complaint.sentiment_score is not None:
+        vector[1], vector[2] = complaint.sentiment_score, 1
+    if complaint.urgency_score is not None:
+        vector[3], vector[4] = complaint.urgency_score, 1
+    if complaint.complaint_date and complaint.company_response_date:
+        hours = (complaint.company_response_date - complaint.complaint_date).total_seconds() / 3600
+        if hours >= 0:
+            vector[5], vector[6] = hours, 1
+
+    keys = [
+        ("all", ""),
+        ("sentiment", complaint.sentiment or ""),
+        ("store_type", complaint.store_type or ""),
+        ("status", complaint.status or ""),
+        ("ra_category", complaint.category or ""),
+        ("location", complaint.location or ""),
+    ]
+    keys += [("tag", tag) for tag in complaint.tags or []]
+    keys += [("category", category) for category in complaint.classification or []]
+    if complaint.classification is not None:
+        keys.append(("flag", "classified"))
+    if complaint.tags is not None:
+        keys.append(("flag", "tagged"))
+    if complaint.company_response_date is not None:
+        keys.append(("flag", "responded"))
+
+    result: Dict[RollupKey, List[float]] = {}
+    for dimension, value in keys:
+        key = (day, dimension, str(value)[:200])
+        if key in result:
+            result[key] = [a + b for a, b in zip(result[key], vector)]
+        else:
+            result[key] = list(vector)
+    return result
+
+
+class RollupDelta:
+    """Accumulates contribution changes and applies them in one upsert batch"""
+
+    def __init__(self):
+        self._deltas: Dict[RollupKey, List[float]] = defaultdict(lambda: [0] * len(METRICS))
+
+    def add(self, complaint, sign: int = 1):
+        for key, vector in contributions(complaint).items():
+            delta = self._deltas[key]
+            for i, value in enumerate(vector):
+                delta[i] += sign * value
+
+    def add_contributions(self, contribs: Dict[RollupKey, List[float]], sign: int = 1):
+        for key, vector in contribs.items():
+            delta = self._deltas[key]
+            for i, value in enumerate(vector):
+                delta[i] += sign * value
+
+    def apply(self, db: Session):
+        """Upsert the accumulated deltas in the session's transaction (no commit)"""
+        rows = [
+            {"day": day, "dimension": dimension, "value": value, **dict(zip(METRICS, delta))}
+            for (day, dimension, value), delta in self._deltas.items()
+            if any(delta)
+        ]
+        self._deltas.clear()
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            _upsert(db, rows[start:start + UPSERT_CHUNK_SIZE])
+
+
+def _upsert(db: Session, rows: List[Dict]):
+    """INSERT ... ON CONFLICT DO UPDATE adding the deltas to the counters"""
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    table = AnalyticsRollup.__table__
+
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["day", "dimension", "value"],
+            set_={metric: table.c[metric] + stmt.excluded[metric] for metric in METRICS}
+        )
+        db.execute(stmt)
+        return
+
+    # Generic fallback: update, insert when missing
+    for row in rows:
+        key = (table.c.day == row["day"]) & (table.c.dimension == row["dimension"]) & (table.c.value == row["value"])
+        updated = db.execute(
+            table.update().where(key).values({metric: table.c[metric] + row[metric] for metric in METRICS})
+        ).rowcount
+        if not updated:
+            db.execute(table.insert().values(row))
+
+
+def record_insert(db: Session, complaints: Iterable[Complaint]):
+    """Count newly inserted complaints (no commit)"""
+    delta = RollupDelta()
+    for complaint in complaints:
+        delta.add(complaint)
+    delta.apply(db)
+
+
+def record_update(db: Session, before: Dict[RollupKey, List[float]], complaint: Complaint):
+    """Replace a complaint's old contributions (from contributions()) with its current ones (no commit)"""
+    delta = RollupDelta()
+    delta.add_contributions(before, sign=-1)
+    delta.add(complaint)
+    delta.apply(db)
+
+
+def rebuild_rollups(db: Session, chunk_size: int = 1000) -> int:
+    """
+    Recompute every rollup row from the complaints table
+
+    Scalar dimensions are counted from the tracked columns, read in
+    chunks; the tag and category dimensions are aggregated in SQL over the
+    JSON arrays (app.db.json_agg), so only grouped tuples leave the
+    database. Memory grows with the number of distinct
+    (day, dimension, value) keys, not with the corpus.
+
+    Returns:
+        Number of complaints counted
+    """
+    db.query(AnalyticsRollup).delete(synchronize_session=False)
+
+    delta = RollupDelta()
+    counted = _rebuild_scalar_dimensions(db, delta, chunk_size)
+    for dimension, column in ARRAY_DIMENSIONS:
+        _rebuild_array_dimension(db, delta, dimension, column)
+
+    delta.apply(db)
+    db.commit()
+    logger.info(f"Rebuilt analytics rollups from {counted} complaints")
+    return counted
+
+
+def _rebuild_scalar_dimensions(db: Session, delta: RollupDelta, chunk_size: int) -> int:
+    """Count every dimension except the array elements, chunk by chunk"""
+    columns = [getattr(Complaint, name) for name in TRACKED_COLUMNS if name not in ("tags", "classification")]
+    counted = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(
+                Complaint.id,
+                *columns,
+                json_is_array(db, Complaint.tags).label("has_tags"),
+                json_is_array(db, Complaint.classification).label("has_classification")
+            )
+            .filter(Complaint.id > last_id)
+            .order_by(Complaint.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            break
+        for row in rows:
+            # Empty arrays keep the "tagged"/"classified" flags without element keys
+            values = row._asdict()
+            values["tags"] = [] if values.pop("has_tags") else None
+            values["classification"] = [] if values.pop("has_classification") else None
+            delta.add(SimpleNamespace(**values))
+        counted += len(rows)
+        last_id = rows[-1].id
+    return counted
+
+
+def _rebuild_array_dimension(db: Session, delta: RollupDelta, dimension: str, column):
+    """Aggregate one JSON array dimension per (day, element) in SQL"""
+    elements = json_array_elements(db, column)
+    day = day_of(db, Complaint.complaint_date)
+    value = func.substr(elements.c.value, 1, 200)
+    hours = positive_hours_between(db, Complaint.complaint_date, Complaint.company_response_date)
+
+    rows = (
+        db.query(
+            day.label("day"),
+            value.label("value"),
+            func.count(),
+            func.coalesce(func.sum(Complaint.sentiment_score), 0.0),
+            func.count(Complaint.sentiment_score),
+            func.coalesce(func.sum(Complaint.urgency_score), 0.0),
+            func.count(Complaint.urgency_score),
+            func.coalesce(func.sum(hours), 0.0),
+            func.count(hours),
+        )
+        .select_from(Complaint)
+        .join(elements, true())
+        .filter(json_is_array(db, column))
+        .group_by(day, value)
+        .all()
+    )
+    for row in rows:
+        delta.add_contributions({(row[0], dimension, str(row[1])): list(row[2:])})
+
+
+def ensure_rollups(db: Session):
+    """Build the rollups once for databases that predate them"""
+    if db.query(AnalyticsRollup.id).first() is None and db.query(Complaint.id).first() is not None:
+        logger.info("Analytics rollups are empty, rebuilding...")
+        rebuild_rollups(db)
+
+
+# Readers
+
+def _metric_columns():
+    t = AnalyticsRollup
+    return (
+        func.sum(t.count).label("count"),
+        func.sum(t.sentiment_score_sum).label("sentiment_score_sum"),
+        func.sum(t.sentiment_score_count).label("sentiment_score_count"),
+        func.sum(t.urgency_score_sum).label("urgency_score_sum"),
+        func.sum(t.urgency_score_count).label("urgency_score_count"),
+        func.sum(t.response_hours_sum).label("response_hours_sum"),
+        func.sum(t.response_hours_count).label("response_hours_count"),
+    )
+
+
+def _filtered(query, dimension: str, start_day: Optional[str], end_day: Optional[str]):
+    query = query.filter(AnalyticsRollup.dimension == dimension)
+    if start_day:
+        query = query.filter(AnalyticsRollup.day >= start_day)
+    if end_day:
+        query = query.filter(AnalyticsRollup.day <= end_day)
+    return query
+
+
+def totals_by_value(
+    db: Session,
+    dimension: str,
+    start_day: Optional[str] = None,
+    end_day: Optional[str] = None,
+    include_empty: bool = False,
+    limit: Optional[int] = None
+) -> List:
+    """Summed metrics per value of a dimension, largest count first"""
+    query = _filtered(db.query(AnalyticsRollup.value, *_metric_columns()), dimension, start_day, end_day)
+    if not include_empty:
+        query = query.filter(AnalyticsRollup.value != "")
+    query = (
+        query.group_by(AnalyticsRollup.value)
+        .having(func.sum(AnalyticsRollup.count) > 0)
+        .order_by(func.sum(AnalyticsRollup.count).desc())
+    )
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+
+def totals_by_day(
+    db: Session,
+    dimension: str = "all",
+    value: str = "",
+    start_day: Optional[str] = None,
+    end_day: Optional[str] = None
+) -> List:
+    """Summed metrics per day for one dimension value, oldest first"""
+    query = _filtered(db.query(AnalyticsRollup.day, *_metric_columns()), dimension, start_day, end_day)
+    query = query.filter(AnalyticsRollup.value == value, AnalyticsRollup.day != "")
+    return (
+        query.group_by(AnalyticsRollup.day)
+        .having(func.sum(AnalyticsRollup.count) > 0)
+        .order_by(AnalyticsRollup.day)
+        .all()
+    )
+
+
+def total(db: Session, dimension: str = "all", value: str = "", start_day: Optional[str] = None, end_day: Optional[str] = None):
+    """Summed metrics for one dimension value (all days unless bounded)"""
+    query = _filtered(db.query(*_metric_columns()), dimension, start_day, end_day)
+    return query.filter(AnalyticsRollup.value == value).one()
+
+
+def average(row, metric: str) -> float:
+    """Average of a summed metric (sentiment_score, urgency_score, response_hours)"""
+    n = getattr(row, f"{metric}_count") or 0
+    return float(getattr(row, f"{metric}_sum") or 0) / n if n else 0.0
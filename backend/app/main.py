@@ -1,10 +1,13 @@
 from fastapi import FastAPI, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine
+from app.core.database import engine, SessionLocal
+from app.db.rollups import ensure_rollups
 from app.db.base import Base
-from app.api.endpoints import complaints, analytics, responses, benchmark
+from app.api.endpoints import complaints, analytics, responses, benchmark, jobs
 from app.scraper.scheduler import start_scheduler, stop_scheduler, run_now
+from app.services.job_worker import start_job_worker, stop_job_worker
+from app.services.event_consumer import start_event_consumer, stop_event_consumer
 import logging
 
 # Configure logging
@@ -34,21 +37,36 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup():
-    """Create database tables and start scheduler on startup"""
+    """Create database tables, start scheduler, job worker and event consumer on startup"""
     logger.info("Creating database tables...")
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created successfully")
 
+    # Build analytics rollups for databases created before them
+    db = SessionLocal()
+    try:
+        ensure_rollups(db)
+    finally:
+        db.close()
+
     # Start scraping scheduler
     logger.info("Starting scraping scheduler...")
     start_scheduler()
 
+    # Start background job worker
+    start_job_worker()
+
+    # Analyze new complaints as soon as they are ingested
+    start_event_consumer()
+
 
 @app.on_event("shutdown")
 async def shutdown():
     """Cleanup on shutdown"""
     logger.info("Shutting down...")
     stop_scheduler()
+    stop_job_worker()
+    stop_event_consumer()
 
 
 @app.get("/")
@@ -68,16 +86,17 @@ async def health():
 
 
 @app.post("/scrape/run")
-async def run_scraper_manually(background_tasks: BackgroundTasks):
+async def run_scraper_manually(background_tasks: BackgroundTasks, full: bool = False):
     """
     Manually trigger scraping job (for testing)
 
     This will run the scraper in the background and return immediately.
-    Check logs for scraping progress.
+    Check logs for scraping progress. By default only new complaints are
+    collected; full=true re-crawls every page.
     """
-    background_tasks.add_task(run_now)
+    background_tasks.add_task(run_now, full)
     return {
-        "message": "Scraping job started in background",
+        "message": f"{'Full' if full else 'Incremental'} scraping job started in background",
         "note": "Check logs for progress"
     }
 
@@ -87,3 +106,4 @@ app.include_router(complaints.router)
 app.include_router(analytics.router)
 app.include_router(responses.router)
 app.include_router(benchmark.router)
+app.include_router(jobs.router)
@@ -27,6 +27,7 @@ class Complaint(ComplaintBase):
     # Store type and tags
     store_type: Optional[str] = None
     tags: Optional[List[str]] = None
+    primary_tag: Optional[str] = None
 
     # Analysis fields
     sentiment: Optional[str] = None
@@ -59,6 +60,13 @@ class Complaint(ComplaintBase):
         from_attributes = True
 
 
+class ComplaintPage(BaseModel):
+    """Schema for a cursor-paginated page of complaints"""
+    items: List[Complaint]
+    next_cursor: Optional[str] = None  # None on the last page
+    total: Optional[int] = None  # approximate, only with include_total=true
+
+
 class ComplaintStats(BaseModel):
     """Schema for statistics"""
     total: int
@@ -0,0 +1,200 @@
+"""
+Pool of long-lived browsers for fetching complaint pages
+
+Opening Chrome and clearing the Cloudflare challenge costs far more than
+loading a page, so instead of a browser per URL (or every detail page on
+the single listing browser) a fixed set of workers each keep a warmed-up
+browser and pull pages from a shared queue.
+
+- Every browser is warmed up once (e.g. loads the listing page and waits
+  for the challenge) before its first page.
+- Before each page the worker checks its browser still answers; a dead
+  browser is replaced and the page retried on the new one.
+- Browsers are recycled after max_pages_per_browser pages, which bounds
+  Chrome's memory growth over long runs.
+- All workers share one requests-per-minute budget (or the scraper's
+  politeness scheduler), so adding workers adds parallelism without
+  raising the load on the site.
+"""
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from app.ai.rate_limiter import TokenBucket
+from app.scraper.politeness import PolitenessScheduler
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """N warmed-up browsers serving fn(driver, ...) calls from a shared queue"""
+
+    def __init__(
+        self,
+        driver_factory: Callable[[], Any],
+        size: int = 3,
+        warm_up: Optional[Callable[[Any], None]] = None,
+        max_pages_per_browser: int = 50,
+        requests_per_minute: float = 30,
+        max_attempts: int = 2,
+        throttle: Optional[PolitenessScheduler] = None
+    ):
+        """
+        Args:
+            driver_factory: Creates a browser (e.g. ReclameAquiScraper._get_driver)
+            size: Number of workers / browsers
+            warm_up: Called once on every new browser before its first page
+            max_pages_per_browser: Pages served before a browser is replaced (0 = never)
+            requests_per_minute: Page loads per minute across all workers (0 = unlimited)
+            max_attempts: Tries per page when the browser crashes under it
+            throttle: Politeness scheduler of the site, shared with the listing
+                (replaces requests_per_minute)
+        """
+        self.driver_factory = driver_factory
+        self.size = max(1, size)
+        self.warm_up = warm_up
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_attempts = max(1, max_attempts)
+        self.throttle = throttle
+        self._rate = TokenBucket(requests_per_minute, capacity=1) if requests_per_minute and not throttle else None
+        self._tasks: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._stats = {"pages": 0, "browsers_started": 0, "recycled": 0, "crashed": 0}
+        self._stats_lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start_workers(self):
+        while len(self._workers) < self.size:
+            worker = threading.Thread(
+                target=self._worker,
+                name=f"browser-pool-{len(self._workers) + 1}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Run fn(driver, *args) on a pooled browser"""
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed")
+        self._start_workers()
+        future = Future()
+        self._tasks.put((future, fn, args))
+        return future
+
+    def map(self, fn: Callable, items: Iterable) -> List:
+        """fn(driver, item) for every item, results in the order of items (exceptions re-raised)"""
+        futures = [self.submit(fn, item) for item in items]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Finish the queued pages and quit every browser"""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join()
+        logger.info(f"Browser pool closed: {self.get_stats()}")
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    # Worker side
+
+    def _new_driver(self):
+        driver = self.driver_factory()
+        self._count("browsers_started")
+        try:
+            if self.warm_up:
+                self.warm_up(driver)
+        except Exception:
+            self._quit(driver)
+            raise
+        return driver
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting browser: {e}")
+
+    @staticmethod
+    def _healthy(driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _wait_turn(self):
+        if self.throttle:
+            self.throttle.wait()
+        elif self._rate:
+            wait = self._rate.reserve(1)
+            if wait > 0:
+                time.sleep(wait)
+
+    def _worker(self):
+        name = threading.current_thread().name
+        driver = None
+        pages = 0
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    return
+                future, fn, args = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                for attempt in range(1, self.max_attempts + 1):
+                    try:
+                        if driver is not None and not self._healthy(driver):
+                            logger.warning(f"{name}: browser stopped responding, replacing it")
+                            self._count("crashed")
+                            self._quit(driver)
+                            driver = None
+                        if driver is None:
+                            driver, pages = self._new_driver(), 0
+
+                        self._wait_turn()
+                        result = fn(driver, *args)
+                        pages += 1
+                        self._count("pages")
+                        future.set_result(result)
+                        break
+                    except Exception as e:
+                        # The page failed because the browser died: retry it on a fresh one
+                        if driver is not None and not self._healthy(driver) and attempt < self.max_attempts:
+                            logger.warning(f"{name}: browser crashed ({e}), retrying on a new one")
+                            self._count("crashed")
+                            self._quit(driver)
+                            driver = None
+                            continue
+                        future.set_exception(e)
+                        break
+
+                if driver is not None and self.max_pages_per_browser and pages >= self.max_pages_per_browser:
+                    logger.info(f"{name}: recycling browser after {pages} pages")
+                    self._count("recycled")
+                    self._quit(driver)
+                    driver = None
+        finally:
+            if driver is not None:
+                self._quit(driver)
@@ -0,0 +1,111 @@
+"""
+Fast extraction of the page data without parsing the whole DOM
+
+The scrapers only need two things from a Reclame Aqui page: the
+__NEXT_DATA__ JSON payload and the company category of the
+info_segmento_hero link. Instead of building a BeautifulSoup tree of the
+full multi-megabyte HTML to find them, they are read with a targeted
+string scan of the raw HTML, or straight from the browser with
+execute_script (which also avoids transferring page_source). The soup
+path is only used when the fast path misses.
+"""
+from bs4 import BeautifulSoup
+from html import unescape
+from typing import Dict, Optional, Tuple
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_NEXT_DATA_TAG = re.compile(r"<script\b[^>]*\bid=[\"']?__NEXT_DATA__[\"']?[^>]*>", re.I)
+_CATEGORY_LINK = re.compile(r"<a\b[^>]*\bid=[\"']?info_segmento_hero[\"']?[^>]*>", re.I)
+_PARAGRAPH = re.compile(r"<p\b[^>]*>(.*?)</p>", re.I | re.S)
+_TAGS = re.compile(r"<[^>]+>")
+
+
+def next_data_from_html(html: str) -> Optional[Dict]:
+    """__NEXT_DATA__ payload located by a string scan (None when missing or invalid)"""
+    match = _NEXT_DATA_TAG.search(html)
+    if not match:
+        return None
+    end = html.find("</script>", match.end())
+    if end < 0:
+        return None
+    try:
+        return json.loads(html[match.end():end])
+    except ValueError:
+        return None
+
+
+def page_category_from_html(html: str) -> Optional[str]:
+    """Text of the first <p> inside the info_segmento_hero link"""
+    match = _CATEGORY_LINK.search(html)
+    if not match:
+        return None
+    end = html.find("</a>", match.end())
+    paragraph = _PARAGRAPH.search(html, match.end(), end if end >= 0 else len(html))
+    if not paragraph:
+        return None
+    text = " ".join(unescape(_TAGS.sub("", paragraph.group(1))).split())
+    return text or None
+
+
+def next_data_from_driver(driver) -> Optional[Dict]:
+    """__NEXT_DATA__ payload read in the browser (no page_source transfer)"""
+    try:
+        text = driver.execute_script(
+            "var el = document.getElementById('__NEXT_DATA__'); return el ? el.textContent : null;"
+        )
+        return json.loads(text) if text else None
+    except Exception as e:
+        logger.debug(f"Could not read __NEXT_DATA__ from the browser: {e}")
+        return None
+
+
+def page_category_from_driver(driver) -> Optional[str]:
+    """Category read in the browser (whitespace collapsed like the other extractors)"""
+    try:
+        text = driver.execute_script(
+            "var el = document.querySelector('a#info_segmento_hero p'); return el ? el.textContent : null;"
+        )
+        return " ".join(text.split()) or None if text else None
+    except Exception as e:
+        logger.debug(f"Could not read the page category from the browser: {e}")
+        return None
+
+
+# Soup path (reference implementation and fallback)
+
+def next_data_from_soup(soup: BeautifulSoup) -> Optional[Dict]:
+    script = soup.find('script', id='__NEXT_DATA__')
+    if not script or not script.string:
+        return None
+    try:
+        return json.loads(script.string)
+    except ValueError:
+        return None
+
+
+def page_category_from_soup(soup: BeautifulSoup) -> Optional[str]:
+    category_link = soup.find('a', {'id': 'info_segmento_hero'})
+    if category_link:
+        category_p = category_link.find('p')
+        if category_p:
+            return " ".join(category_p.get_text().split()) or None
+    return None
+
+
+def extract_page_data(html: str) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    (__NEXT_DATA__ payload, page category) of a page's HTML
+
+    Uses the string scan and only parses the HTML with BeautifulSoup when
+    it finds no payload.
+    """
+    data = next_data_from_html(html)
+    if data is not None:
+        return data, page_category_from_html(html)
+    logger.debug("__NEXT_DATA__ not found by the fast scan, parsing the HTML")
+    soup = BeautifulSoup(html, 'html.parser')
+    return next_data_from_soup(soup), page_category_from_soup(soup)
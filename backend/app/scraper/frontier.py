@@ -0,0 +1,178 @@
+"""
+Crawl frontier - persisted scrape progress per company
+
+A crawl plans its listing pages up front (crawl_frontier.pages_pending)
+and moves each page to pages_done once the pipeline has written it, in
+the writer's transaction. A crawl that dies keeps status "running" with
+its pending pages, and the next run resumes from them instead of starting
+over.
+
+Incremental runs (the default unless a full re-crawl is requested) load
+the external_ids already stored and, since listings are sorted newest
+first, stop paginating at the first page holding the newest complaint of
+the previous successful run (last_seen_external_id) or once a whole page
+is already known. Complaints pushed onto the next page by new arrivals
+during the crawl count as known, so that overlap neither ends the crawl
+early nor keeps it going.
+"""
+from sqlalchemy.orm import Session
+from app.db.models import CompetitorComplaint, Complaint, CrawlFrontier
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def get_frontier(db: Session, company_slug: str) -> CrawlFrontier:
+    """Frontier row of a company, created on first use"""
+    frontier = db.query(CrawlFrontier).filter(CrawlFrontier.company_slug == company_slug).first()
+    if frontier is None:
+        frontier = CrawlFrontier(company_slug=company_slug, status="idle", pages_pending=[], pages_done=[])
+        db.add(frontier)
+        db.commit()
+        db.refresh(frontier)
+    return frontier
+
+
+def load_known_ids(db: Session, competitor_id: Optional[int] = None) -> Set[str]:
+    """external_ids of our stored complaints, or of a competitor's (streamed, one column)"""
+    if competitor_id is None:
+        query = db.query(Complaint.external_id).filter(Complaint.external_id.isnot(None))
+    else:
+        query = db.query(CompetitorComplaint.external_id).filter(
+            CompetitorComplaint.competitor_id == competitor_id, CompetitorComplaint.external_id.isnot(None)
+        )
+    return {external_id for external_id, in query.yield_per(10000)}
+
+
+class IncrementalStop:
+    """
+    stop_when of an incremental crawl (see run_pipeline)
+
+    Stops after the page holding stop_at, or after known_pages consecutive
+    pages whose complaints are all known. Every scraped complaint is added
+    to the known set, so complaints shifting onto the following page while
+    the crawl runs are recognised there.
+    """
+
+    def __init__(self, known_ids: Set[str], stop_at: Optional[str] = None, known_pages: int = 1):
+        self.known_ids = known_ids
+        self.stop_at = stop_at
+        self.known_pages = max(1, known_pages)
+        self._known_streak = 0
+
+    def __call__(self, page: int, complaints: List[Dict]) -> bool:
+        if reached_known(complaints, self.stop_at):
+            logger.info(f"Page {page} holds the newest complaint of the last run ({self.stop_at})")
+            return True
+
+        external_ids = {c["external_id"] for c in complaints if c.get("external_id")}
+        new_ids = external_ids - self.known_ids
+        self.known_ids |= external_ids
+        self._known_streak = self._known_streak + 1 if external_ids and not new_ids else 0
+
+        if self._known_streak >= self.known_pages:
+            logger.info(f"Page {page}: {self._known_streak} fully known page(s) in a row")
+            return True
+        return False
+
+
+def plan_crawl(
+    db: Session,
+    company_slug: str,
+    max_pages: int,
+    full: bool = False,
+    known_pages: int = 1,
+    competitor_id: Optional[int] = None
+) -> Tuple[List[int], Optional[IncrementalStop]]:
+    """
+    Listing pages for this run, resuming an interrupted crawl
+
+    Args:
+        company_slug: Company being crawled
+        max_pages: Pages of a new crawl (1..max_pages)
+        full: Crawl every page even if the stored complaints are already known
+        known_pages: Consecutive fully known pages that end an incremental crawl
+        competitor_id: Compare against this competitor's complaints instead of ours
+
+    Returns:
+        (pages to scrape in order, stop_when for run_pipeline or None for a full crawl)
+    """
+    frontier = get_frontier(db, company_slug)
+    now = datetime.now()
+
+    if frontier.status == "running" and frontier.pages_pending and not full:
+        logger.info(
+            f"Resuming {frontier.mode} crawl of {company_slug} started at {frontier.started_at}: "
+            f"{len(frontier.pages_done or [])} pages done, {len(frontier.pages_pending)} pending"
+        )
+        pages = list(frontier.pages_pending)
+    else:
+        frontier.mode = "full" if full else "incremental"
+        frontier.pages_pending = list(range(1, max_pages + 1))
+        frontier.pages_done = []
+        frontier.run_newest_external_id = None
+        frontier.started_at = now
+        pages = list(frontier.pages_pending)
+        logger.info(f"Starting {frontier.mode} crawl of {company_slug} ({max_pages} pages at most)")
+
+    frontier.status = "running"
+    frontier.updated_at = now
+    db.commit()
+
+    if frontier.mode != "incremental":
+        return pages, None
+    known_ids = load_known_ids(db, competitor_id)
+    logger.info(f"{len(known_ids)} known complaints loaded for the incremental crawl")
+    return pages, IncrementalStop(known_ids, frontier.last_seen_external_id, known_pages)
+
+
+def mark_page_done(db: Session, company_slug: str, page: int, complaints: List[Dict]):
+    """Move a written page from pending to done (commits)"""
+    frontier = get_frontier(db, company_slug)
+    # Reassigned, not mutated, so the JSON columns are flagged as changed
+    frontier.pages_pending = [p for p in frontier.pages_pending or [] if p != page]
+    frontier.pages_done = (frontier.pages_done or []) + [page]
+    if page == 1 and complaints and complaints[0].get("external_id"):
+        frontier.run_newest_external_id = complaints[0]["external_id"]
+    frontier.updated_at = datetime.now()
+    db.commit()
+
+
+def reached_known(complaints: List[Dict], stop_at: Optional[str]) -> bool:
+    """Whether a page holds the newest complaint of the previous run"""
+    return bool(stop_at) and any(c.get("external_id") == stop_at for c in complaints)
+
+
+def finish_crawl(db: Session, company_slug: str, completed: bool):
+    """
+    Close the current run
+
+    Args:
+        completed: The crawl covered what it had to (reached known complaints,
+            the end of the listing or every planned page). When False the
+            next run resumes from the pending pages.
+
+    Only mark_page_done takes pages off pages_pending, so pages a
+    completed crawl did not need stay listed there.
+    """
+    frontier = get_frontier(db, company_slug)
+    now = datetime.now()
+    frontier.updated_at = now
+
+    if completed:
+        frontier.status = "completed"
+        frontier.last_success_at = now
+        if frontier.run_newest_external_id:
+            frontier.last_seen_external_id = frontier.run_newest_external_id
+        logger.info(
+            f"Crawl of {company_slug} completed: {len(frontier.pages_done or [])} pages "
+            f"({len(frontier.pages_pending or [])} not needed), newest complaint {frontier.last_seen_external_id}"
+        )
+    else:
+        logger.warning(
+            f"Crawl of {company_slug} interrupted with {len(frontier.pages_pending or [])} pages pending, "
+            f"the next run resumes from them"
+        )
+    db.commit()
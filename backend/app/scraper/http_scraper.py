@@ -0,0 +1,361 @@
+"""
+HTTP-only scraper for Reclame Aqui
+
+The browser is only used to get past the Cloudflare challenge: it loads
+one listing page, and its cookies, user agent and the Next.js buildId are
+handed to a pooled requests session. Listing and detail pages are then
+read from the /_next/data/{buildId}/... JSON routes over keep-alive,
+compressed connections, without rendering or re-parsing any HTML.
+
+When the site answers with a challenge again (403/503 or HTML instead of
+JSON) or the buildId goes stale after a deploy (404), the browser is
+started once more to refresh the session.
+
+With browser_session=False the listing page is read over plain HTTP
+instead (no Chrome needed): only for sites without the challenge, such as
+the fixture replay server (app/scraper/replay.py).
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.scraper.extract import extract_page_data, next_data_from_driver, page_category_from_driver
+from app.scraper.next_data import complaints_from_page_props, apply_complaint_detail
+from app.scraper.reclame_aqui_scraper import ReclameAquiScraper
+from app.scraper.waits import next_data_present
+
+logger = logging.getLogger(__name__)
+
+# Identity of the browser-less session (browser_session=False)
+DIRECT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/120.0.0.0 Safari/537.36'
+)
+
+
+class SessionExpired(Exception):
+    """The HTTP session no longer works: challenge page or stale buildId"""
+
+
+class SessionRefreshLimit(Exception):
+    """The session expired more than max_session_refreshes times in one run"""
+
+
+class HttpReclameAquiScraper(ReclameAquiScraper):
+    """Scraper reading the Next.js JSON routes over a pooled HTTP session"""
+
+    def __init__(
+        self,
+        company_url: str,
+        max_pages: int = 10,
+        delay_min: float = 2,
+        delay_max: float = 5,
+        max_workers: int = 4,
+        start_page: int = 1,
+        fetch_details: bool = False,
+        page_step: int = 1,
+        max_session_refreshes: int = 3,
+        timeout: float = 30,
+        requests_per_minute: float = 30,
+        min_delay: float = 0.5,
+        max_delay: float = 300,
+        browser_session: bool = True
+    ):
+        super().__init__(
+            company_url,
+            max_pages=max_pages,
+            delay_min=delay_min,
+            delay_max=delay_max,
+            max_workers=max_workers,
+            start_page=start_page,
+            fetch_details=fetch_details,
+            page_step=page_step,
+            requests_per_minute=requests_per_minute,
+            min_delay=min_delay,
+            max_delay=max_delay
+        )
+        self.max_session_refreshes = max_session_refreshes
+        self.timeout = timeout
+        self.browser_session = browser_session  # False: read the listing page over plain HTTP too
+        self.build_id: Optional[str] = None
+        self.page_category: Optional[str] = None
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        self._session_version = 0
+        self._refreshes = 0
+        # Path of the company page on the site (e.g. "empresa/drogaria-venancio-site-e-televendas")
+        self._company_path = urlparse(company_url).path.strip('/')
+
+    # Session
+
+    def _new_session(self, user_agent: str, cookies: List[Dict]) -> requests.Session:
+        """Keep-alive session sized for the detail workers, with the browser's identity"""
+        session = requests.Session()
+        retry = Retry(
+            total=2,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(self.max_workers, 1), max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'application/json, text/plain, */*',
+            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Language': 'pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7',
+            'x-nextjs-data': '1',  # sent by the Next.js router on client-side navigation
+        })
+        for cookie in cookies:
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        return session
+
+    def _load_listing(self, driver, url: str) -> Tuple[Dict, requests.Session]:
+        """Load a listing page and return its __NEXT_DATA__ and a session with the browser's identity"""
+        started = time.monotonic()
+        driver.get(url)
+        self._wait_for_page(driver, started=started)
+        self._wait(driver, next_data_present, "next_data")
+
+        # Read in the browser; the page source is only parsed when that misses
+        data = next_data_from_driver(driver)
+        self.page_category = page_category_from_driver(driver)
+        if data is None:
+            data, self.page_category = extract_page_data(driver.page_source)
+        if data is None:
+            raise SessionExpired(f"No __NEXT_DATA__ on {url}")
+
+        return data, self._new_session(driver.execute_script("return navigator.userAgent"), driver.get_cookies())
+
+    def _load_listing_direct(self, url: str, attempts: int = 3) -> Tuple[Dict, requests.Session]:
+        """
+        _load_listing over plain HTTP (browser_session=False)
+
+        A challenge answer is waited out like in the browser: the
+        scheduler backs off and the page is requested again.
+
+        Raises:
+            SessionExpired: Se a página continuar sem __NEXT_DATA__ após todas as tentativas
+        """
+        session = self._new_session(DIRECT_USER_AGENT, [])
+        for attempt in range(1, attempts + 1):
+            self._throttle()
+            started = time.monotonic()
+            try:
+                response = session.get(url, headers={'Accept': 'text/html', 'x-nextjs-data': None}, timeout=self.timeout)
+            except requests.RequestException:
+                self.throttle.record(error=True)
+                raise
+            data, self.page_category = extract_page_data(response.text) if response.ok else (None, None)
+            challenged = response.status_code in (403, 503) or (response.ok and data is None)
+            self.throttle.record(
+                time.monotonic() - started,
+                challenge=challenged,
+                error=not response.ok and not challenged
+            )
+            if data is not None:
+                return data, session
+            logger.warning(f"No __NEXT_DATA__ on {url} ({response.status_code}), attempt {attempt}/{attempts}")
+        session.close()
+        raise SessionExpired(f"No __NEXT_DATA__ on {url}")
+
+    def _solve_challenge(self, page: int) -> Dict:
+        """
+        Load a listing page in the browser and take over its session
+
+        Returns:
+            pageProps of the loaded page (its complaints need no extra request)
+        """
+        url = f"{self.base_url}/{self._company_path}/lista-reclamacoes/?pagina={page}"
+        if not self.browser_session:
+            logger.info(f"Opening HTTP session without a browser: {url}")
+            data, session = self._load_listing_direct(url)
+        elif self.shared_pool is not None:
+            # A warm browser of the shared pool: no Chrome start per company
+            logger.info(f"Clearing the challenge on a pooled browser: {url}")
+            data, session = self.shared_pool.submit(self._load_listing, url).result()
+        else:
+            logger.info(f"Opening browser to clear the challenge: {url}")
+            driver = self._get_driver()
+            try:
+                self._throttle()
+                data, session = self._load_listing(driver, url)
+            finally:
+                driver.quit()
+
+        with self._session_lock:
+            if self._session:
+                self._session.close()
+            self._session = session
+            self._session_version += 1
+            self.build_id = data.get('buildId')
+        logger.info(f"HTTP session ready (buildId {self.build_id})")
+        return data.get('props', {}).get('pageProps', {})
+
+    def _refresh_session(self, version: int, page: int):
+        """Solve the challenge again, once per expired session version"""
+        with self._session_lock:
+            if version != self._session_version:
+                return  # another worker already refreshed it
+            if self._refreshes >= self.max_session_refreshes:
+                raise SessionRefreshLimit(f"HTTP session expired {self._refreshes} times, giving up")
+            self._refreshes += 1
+        logger.warning(f"HTTP session expired, refreshing ({self._refreshes}/{self.max_session_refreshes})")
+        self._solve_challenge(page)
+
+    def _get_page_props(self, path: str, params: Optional[Dict] = None) -> Dict:
+        """
+        GET /_next/data/{buildId}/{path}.json and return its pageProps
+
+        Raises:
+            SessionExpired: Se o site devolver um desafio ou o buildId estiver desatualizado
+        """
+        url = f"{self.base_url}/_next/data/{self.build_id}/{path}.json"
+        self._throttle()
+        started = time.monotonic()
+        try:
+            response = self._session.get(url, params=params, timeout=self.timeout)
+        except requests.RequestException:
+            self.throttle.record(error=True)
+            raise
+        latency = time.monotonic() - started
+
+        # Challenge answers (403/503, HTML instead of JSON) make the scheduler back off;
+        # a 404 is a stale buildId, not the site pushing back
+        challenged = response.status_code in (403, 503) or (
+            response.ok and 'json' not in response.headers.get('Content-Type', '')
+        )
+        failed = response.status_code >= 400 and response.status_code not in (403, 404, 503)
+        self.throttle.record(latency, challenge=challenged, error=failed)
+
+        if response.status_code in (403, 404, 503):
+            raise SessionExpired(f"{response.status_code} for {url}")
+        response.raise_for_status()
+        if 'json' not in response.headers.get('Content-Type', ''):
+            raise SessionExpired(f"Non-JSON response for {url}")
+
+        data = response.json()
+        if data.get('notFound'):
+            return {}
+        return data.get('pageProps', {})
+
+    def _fetch_page_props(self, path: str, params: Optional[Dict] = None, page: int = 1) -> Dict:
+        """_get_page_props, refreshing the session when it expired"""
+        while True:
+            version = self._session_version
+            try:
+                return self._get_page_props(path, params)
+            except SessionExpired as e:
+                logger.warning(f"{e}")
+                self._refresh_session(version, page)
+
+    # Pages
+
+    def _listing_complaints(self, page: int) -> List[Dict]:
+        page_props = self._fetch_page_props(f"{self._company_path}/lista-reclamacoes", {'pagina': page}, page)
+        return complaints_from_page_props(page_props)
+
+    def _detail_path(self, url_path: str) -> str:
+        """_next/data path of a complaint page (/{company-slug}/{complaint-slug_ID}/)"""
+        if url_path.startswith('http'):
+            url_path = urlparse(url_path).path
+        url_path = url_path.strip('/')
+        if not url_path.startswith(f"{self.company_slug}/"):
+            url_path = f"{self.company_slug}/{url_path}"
+        return url_path
+
+    def _fetch_details(self, complaint_data: Dict, page: int) -> Dict:
+        """Fill a listing complaint from its detail JSON (keeps the listing data on error)"""
+        url_path = complaint_data.get('url')
+        if not url_path:
+            return complaint_data
+        try:
+            page_props = self._fetch_page_props(self._detail_path(url_path), page=page)
+            complaint_detail = page_props.get('complaint') or page_props.get('complaintDetail')
+            if complaint_detail:
+                apply_complaint_detail(complaint_data, complaint_detail)
+        except Exception as e:
+            logger.error(f"Error fetching details for {url_path}: {e}")
+            with self._lock:
+                self.errors.append(f"Detail fetch error for {url_path}: {e}")
+        return complaint_data
+
+    def _finish(self, complaint_data: Dict) -> Dict:
+        if self.page_category:
+            complaint_data['category'] = self.page_category
+        complaint_data['scraped_at'] = datetime.now()
+        complaint_data.pop('url', None)
+        return complaint_data
+
+    def iter_pages(self, save_debug: bool = False) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Scrape page by page
+
+        Args:
+            save_debug: Unused (no HTML is fetched), kept for interface compatibility
+
+        Yields:
+            (page, complaints of that page), in the same shape as ReclameAquiScraper
+        """
+        page_numbers = self._target_pages()
+        if not page_numbers:
+            return
+        executor = ThreadPoolExecutor(max_workers=max(self.max_workers, 1)) if self.fetch_details else None
+        collected = 0
+
+        try:
+            logger.info(f"Starting HTTP scrape of {self.company_url}")
+            first_page_props = self._solve_challenge(page_numbers[0])
+
+            for page_index, target_page in enumerate(page_numbers, 1):
+                logger.info(f"Scraping page {target_page} ({page_index}/{len(page_numbers)})")
+
+                try:
+                    if page_index == 1:
+                        page_complaints = complaints_from_page_props(first_page_props)
+                    else:
+                        page_complaints = self._listing_complaints(target_page)
+                except Exception as e:
+                    self._page_failed(target_page, str(e))
+                    if isinstance(e, SessionRefreshLimit):
+                        break
+                    continue
+
+                if not page_complaints:
+                    logger.info(f"No complaints on page {target_page}, stopping")
+                    break
+
+                if executor:
+                    page_complaints = list(executor.map(lambda c: self._fetch_details(c, target_page), page_complaints))
+                page_complaints = [self._finish(c) for c in page_complaints]
+                logger.info(f"Extracted {len(page_complaints)} complaints from page {target_page}")
+
+                collected += len(page_complaints)
+                yield target_page, page_complaints
+
+        except Exception as e:
+            logger.error(f"Fatal error during scraping: {e}")
+            self.errors.append(f"Fatal error: {e}")
+
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+            if self._session:
+                self._session.close()
+                self._session = None
+
+        logger.info(f"Scraping completed. Collected {collected} complaints")
+        if self.errors:
+            logger.warning(f"Encountered {len(self.errors)} errors during scraping")
+        self.waits.log_summary()
+        self.throttle.log_summary()
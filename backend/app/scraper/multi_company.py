@@ -0,0 +1,209 @@
+"""
+Concurrent crawl of our company page and the competitors' pages
+
+Every crawl target (RECLAME_AQUI_COMPANY_URL plus one per Competitor.slug)
+runs the usual single-company crawl - crawl frontier, streaming pipeline,
+incremental stop - on its own worker thread. Our complaints go to
+complaints, a competitor's to competitor_complaints, and the Competitor
+metrics are recomputed from the scraped rows at the end of the run.
+
+Politeness is per site, not per company: all scrapers of a domain wait on
+one shared PolitenessScheduler (DomainBudgets), so a challenge seen by any
+of them slows them all down, and they share one pool of warmed-up
+browsers. Crawling more companies at once adds parallelism without adding
+load on the site or Chrome instances.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.db import crud
+from app.db.models import Competitor
+from app.scraper import frontier
+from app.scraper.browser_pool import BrowserPool
+from app.scraper.pipeline import run_pipeline
+from app.scraper.politeness import PolitenessScheduler
+from app.scraper.reclame_aqui_scraper import ReclameAquiScraper
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def company_url(slug: str) -> str:
+    """Reclame Aqui page of a company slug (on SCRAPER_BASE_URL)"""
+    return f"{settings.SCRAPER_BASE_URL.rstrip('/')}/empresa/{slug}"
+
+
+class CrawlTarget:
+    """A company page to crawl and where its complaints are stored"""
+
+    def __init__(self, company_url: str, max_pages: int, competitor_id: Optional[int] = None, name: str = ""):
+        self.company_url = company_url
+        self.max_pages = max_pages
+        self.competitor_id = competitor_id  # None for our own company
+        self.name = name or company_url
+
+    @property
+    def domain(self) -> str:
+        return urlparse(self.company_url).netloc
+
+    def upsert(self, db: Session, complaints: List[Dict]) -> Dict[str, int]:
+        """Batch writer for run_pipeline"""
+        if self.competitor_id is None:
+            return crud.bulk_upsert_complaints(db, complaints)
+        return crud.bulk_upsert_competitor_complaints(db, self.competitor_id, complaints)
+
+
+def crawl_targets(db: Session, include_competitors: bool = True) -> List[CrawlTarget]:
+    """Our company page first, then every competitor with a slug"""
+    targets = [CrawlTarget(settings.RECLAME_AQUI_COMPANY_URL, settings.SCRAPER_MAX_PAGES)]
+    if include_competitors:
+        for competitor in db.query(Competitor).filter(Competitor.slug.isnot(None)).order_by(Competitor.id):
+            targets.append(CrawlTarget(
+                company_url(competitor.slug),
+                settings.SCRAPER_COMPETITOR_MAX_PAGES,
+                competitor_id=competitor.id,
+                name=competitor.name
+            ))
+    return targets
+
+
+class DomainBudgets:
+    """One politeness scheduler per site, shared by every scraper of that site"""
+
+    def __init__(self, requests_per_minute: float):
+        self.requests_per_minute = requests_per_minute
+        self._schedulers: Dict[str, PolitenessScheduler] = {}
+        self._lock = threading.Lock()
+
+    def for_domain(self, domain: str) -> PolitenessScheduler:
+        with self._lock:
+            if domain not in self._schedulers:
+                self._schedulers[domain] = PolitenessScheduler(
+                    initial_delay=settings.SCRAPER_DELAY_MIN,
+                    min_delay=min(settings.SCRAPER_DELAY_FLOOR, settings.SCRAPER_DELAY_MIN),
+                    max_delay=settings.SCRAPER_BACKOFF_MAX_SECONDS,
+                    jitter=settings.SCRAPER_DELAY_MAX / settings.SCRAPER_DELAY_MIN if settings.SCRAPER_DELAY_MIN else 1,
+                    requests_per_minute=self.requests_per_minute
+                )
+            return self._schedulers[domain]
+
+    def log_summary(self):
+        for domain, scheduler in self._schedulers.items():
+            logger.info(f"{domain}: {scheduler.get_stats()}")
+
+
+def crawl_company(
+    scraper: ReclameAquiScraper,
+    target: CrawlTarget,
+    full: bool = False,
+    session_factory: Callable = SessionLocal
+) -> Dict:
+    """
+    Crawl one company into the database
+
+    Resumes an interrupted crawl of the company or, in incremental mode,
+    stops once its pages hold only known complaints.
+
+    Returns:
+        run_pipeline totals plus scrape_errors (errors reported by the scraper)
+    """
+    logger.info(
+        f"Scraping up to {target.max_pages} pages from {target.company_url} "
+        f"({settings.SCRAPER_BACKEND} backend)"
+    )
+    with session_factory() as db:
+        scraper.pages, stop_when = frontier.plan_crawl(
+            db, scraper.company_slug, target.max_pages,
+            full=full, known_pages=settings.SCRAPER_INCREMENTAL_KNOWN_PAGES, competitor_id=target.competitor_id
+        )
+
+    result = run_pipeline(
+        scraper.iter_pages(),
+        queue_size=settings.SCRAPER_PIPELINE_QUEUE_PAGES,
+        session_factory=session_factory,
+        upsert=target.upsert,
+        on_written=lambda db, page, complaints: frontier.mark_page_done(db, scraper.company_slug, page, complaints),
+        stop_when=stop_when
+    )
+
+    # Pages left pending after errors are resumed by the next run; an early
+    # stop only completes the crawl when no page before it failed
+    failed = scraper.failed_pages or result["write_errors"]
+    completed = not failed and (bool(result["stopped_early"]) or not scraper.get_errors())
+    with session_factory() as db:
+        frontier.finish_crawl(db, scraper.company_slug, completed=completed)
+
+    result["scrape_errors"] = len(scraper.get_errors())
+    for error in scraper.get_errors()[:3]:
+        logger.warning(f"  - {target.name}: {error}")
+    return result
+
+
+def crawl_all(
+    scraper_factory: Callable[[str, int], ReclameAquiScraper],
+    targets: List[CrawlTarget],
+    full: bool = False,
+    workers: Optional[int] = None,
+    session_factory: Callable = SessionLocal
+) -> Dict[str, Dict]:
+    """
+    Crawl every target concurrently and refresh the competitor metrics
+
+    Args:
+        scraper_factory: Builds the scraper of a company (company_url, max_pages)
+        targets: Companies to crawl (crawl_targets)
+        full: Re-crawl every page instead of stopping at known complaints
+        workers: Companies crawled at the same time (default SCRAPER_COMPANY_WORKERS)
+
+    Returns:
+        crawl_company result per target name ({"error": ...} when the crawl failed)
+    """
+    budgets = DomainBudgets(settings.SCRAPER_DOMAIN_REQUESTS_PER_MINUTE)
+    pools: Dict[str, BrowserPool] = {}
+    scrapers = []
+    for target in targets:
+        scraper = scraper_factory(target.company_url, target.max_pages)
+        scraper.throttle = budgets.for_domain(target.domain)
+        if target.domain not in pools:
+            # Browsers are started lazily, on the first page a scraper sends to the pool
+            pools[target.domain] = BrowserPool(
+                scraper._get_driver,
+                size=settings.SCRAPER_BROWSER_POOL_SIZE,
+                warm_up=scraper._warm_up_browser,
+                max_pages_per_browser=settings.SCRAPER_BROWSER_RECYCLE_PAGES,
+                throttle=scraper.throttle
+            )
+        scraper.shared_pool = pools[target.domain]
+        scrapers.append((target, scraper))
+
+    results: Dict[str, Dict] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers or settings.SCRAPER_COMPANY_WORKERS)) as executor:
+            futures = [
+                (target, executor.submit(crawl_company, scraper, target, full, session_factory))
+                for target, scraper in scrapers
+            ]
+            for target, future in futures:
+                try:
+                    results[target.name] = future.result()
+                except Exception as e:
+                    logger.error(f"Error crawling {target.name}: {e}", exc_info=True)
+                    results[target.name] = {"error": str(e)}
+    finally:
+        for pool in pools.values():
+            pool.close()
+        budgets.log_summary()
+
+    competitor_ids = [
+        target.competitor_id for target in targets
+        if target.competitor_id is not None and results.get(target.name, {}).get("pages_written")
+    ]
+    if competitor_ids:
+        with session_factory() as db:
+            refreshed = crud.refresh_competitor_metrics(db, competitor_ids)
+        logger.info(f"Refreshed the metrics of {refreshed} competitors")
+    return results
@@ -0,0 +1,139 @@
+"""
+Parsing of the Reclame Aqui Next.js page data
+
+The listing and detail pages carry their data as Next.js page props, both
+embedded in the HTML (<script id="__NEXT_DATA__">, under props.pageProps)
+and served on their own by the /_next/data/{buildId}/... JSON routes
+(under pageProps). Every scraper backend turns those props into complaint
+dicts through these functions, so ingestion sees the same shape whatever
+fetched the page.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Reclame Aqui status codes -> status stored on complaints
+STATUS_MAP = {
+    'SOLVED': 'Resolvido',
+    'REPLIED': 'Respondida',
+    'ANSWERED': 'Respondida',
+    'NOT_SOLVED': 'Não resolvido',
+    'NOT_REPLIED': 'Não respondida',
+    'PENDING': 'Não respondida',
+    'IN_REPLICA': 'Em réplica',
+    'EVALUATED': 'Avaliada',
+}
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse the ISO dates of the page data ("2025-11-17T18:22:27", optionally with a zone)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00').split('+')[0])
+    except ValueError:
+        return None
+
+
+def complaints_from_page_props(page_props: Dict) -> List[Dict]:
+    """
+    Complaint dicts from the page props of a listing page
+
+    Args:
+        page_props: props.pageProps of __NEXT_DATA__, or pageProps of a _next/data response
+
+    Returns:
+        Complaints with the fields ingestion expects, plus 'url' (path of the detail page)
+    """
+    complaints_data = page_props.get('complaints') or {}
+
+    # Get the list of complaints (usually in 'LAST' key)
+    items = complaints_data.get('LAST', [])
+    if not items:
+        # Try other possible keys
+        for key in ['data', 'items', 'list']:
+            if key in complaints_data and isinstance(complaints_data[key], list):
+                items = complaints_data[key]
+                break
+
+    if not items:
+        logger.warning("No complaints found in JSON data")
+        return []
+
+    extracted = []
+    for item in items:
+        try:
+            raw_status = item.get('status', '')
+            complaint_data = {
+                'title': item.get('title', 'Sem título'),
+                'text': item.get('description', ''),
+                'user_name': item.get('userName', 'Anônimo'),
+                'complaint_date': parse_datetime(item.get('created')) or datetime.now(),
+                'status': STATUS_MAP.get(raw_status, raw_status),
+                'location': item.get('userState'),
+                'external_id': str(item.get('id', '')),
+                'url': item.get('url', ''),  # URL for fetching details
+                # Response data if available
+                'company_response_text': None,
+                'company_response_date': None,
+                'customer_evaluation': item.get('dealAgain'),
+                'evaluation_date': None,
+            }
+
+            # Only add if we have meaningful data
+            if complaint_data['title'] and complaint_data['external_id']:
+                extracted.append(complaint_data)
+
+        except Exception as e:
+            logger.error(f"Error extracting complaint from JSON: {e}")
+            continue
+
+    return extracted
+
+
+def apply_complaint_detail(basic_data: Dict, complaint_detail: Dict) -> Dict:
+    """
+    Fill a listing complaint with the data of its detail page
+
+    Args:
+        basic_data: Complaint from complaints_from_page_props (updated in place)
+        complaint_detail: pageProps.complaint of the detail page
+
+    Returns:
+        basic_data
+    """
+    # Location (city + state)
+    city = complaint_detail.get('userCity', '')
+    state = complaint_detail.get('userState', '')
+    if city and state:
+        basic_data['location'] = f"{city} - {state}"
+    elif city:
+        basic_data['location'] = city
+    elif state:
+        basic_data['location'] = state
+
+    # Full description
+    if complaint_detail.get('description'):
+        basic_data['text'] = complaint_detail['description']
+
+    interactions = complaint_detail.get('interactions') or []
+    logger.debug(f"Found {len(interactions)} interactions in complaint")
+
+    for interaction in interactions:
+        int_type = interaction.get('type', '')
+        # Company response - can be ANSWER or REPLY
+        if int_type in ('ANSWER', 'REPLY'):
+            basic_data['company_response_text'] = interaction.get('message', '')
+            created = parse_datetime(interaction.get('created'))
+            if created:
+                basic_data['company_response_date'] = created
+        # Customer evaluation - can be FINAL_ANSWER or EVALUATION
+        elif int_type in ('FINAL_ANSWER', 'EVALUATION'):
+            basic_data['customer_evaluation'] = interaction.get('message', '')
+            created = parse_datetime(interaction.get('created'))
+            if created:
+                basic_data['evaluation_date'] = created
+
+    return basic_data
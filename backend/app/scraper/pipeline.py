@@ -0,0 +1,138 @@
+"""
+Streaming scrape-to-database pipeline
+
+The scraper thread produces one batch per listing page (iter_pages) and
+hands it to a DB writer thread through a bounded queue. The writer
+upserts every batch in its own transaction (crud.bulk_upsert_complaints),
+so progress is durable page by page. When the writer falls behind, the
+scraper blocks on the full queue instead of buffering, which keeps memory
+at queue_size pages whatever the length of the run.
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from app.core.database import SessionLocal
+from app.db import crud
+from sqlalchemy.orm import Session
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def _writer(
+    batches: "queue.Queue",
+    totals: Dict,
+    state: Dict,
+    session_factory: Callable,
+    upsert: Callable,
+    on_written: Optional[Callable]
+):
+    """Upsert batches until the producer is done (one transaction per batch)"""
+    db = session_factory()
+    try:
+        while True:
+            item = batches.get()
+            if item is _DONE:
+                return
+            page, complaints = item
+            try:
+                result = upsert(db, complaints)
+                if on_written:
+                    on_written(db, page, complaints)
+                for key, value in result.items():
+                    totals[key] = totals.get(key, 0) + value
+                totals["pages_written"] += 1
+                logger.info(
+                    f"Page {page}: {result.get('created', 0)} new, {result.get('updated', 0)} refreshed, "
+                    f"{result.get('unchanged', 0)} unchanged"
+                )
+            except Exception as e:
+                db.rollback()
+                totals["write_errors"] += 1
+                logger.error(f"Error writing page {page}: {e}", exc_info=True)
+                if totals["write_errors"] >= state["max_write_errors"]:
+                    state["failed"] = e
+                    return
+    finally:
+        db.close()
+        state["stopped"].set()
+
+
+def run_pipeline(
+    pages: Iterator[Tuple[int, List[Dict]]],
+    queue_size: int = 4,
+    max_write_errors: int = 3,
+    session_factory: Callable = SessionLocal,
+    upsert: Callable = crud.bulk_upsert_complaints,
+    on_written: Optional[Callable[[Session, int, List[Dict]], None]] = None,
+    stop_when: Optional[Callable[[int, List[Dict]], bool]] = None
+) -> Dict[str, int]:
+    """
+    Scrape and persist page by page
+
+    Args:
+        pages: Batches from a scraper's iter_pages()
+        queue_size: Pages buffered between the scraper and the writer
+        max_write_errors: Failed batches after which the crawl is stopped
+        session_factory: Creates the writer's session
+        upsert: Persists one batch, returns counts (crud.bulk_upsert_complaints)
+        on_written: Called by the writer after a batch is persisted, with its session
+            (e.g. to record the page in the crawl frontier)
+        stop_when: Checked on every scraped batch; True stops the crawl after that batch
+
+    Returns:
+        Dict with pages_scraped, pages_written, scraped, write_errors, stopped_early
+        (1 when stop_when ended the crawl) and the summed upsert counts
+        (created, updated, unchanged, changes)
+    """
+    batches: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+    totals = {"pages_scraped": 0, "pages_written": 0, "scraped": 0, "write_errors": 0, "stopped_early": 0}
+    state = {"failed": None, "stopped": threading.Event(), "max_write_errors": max(1, max_write_errors)}
+
+    writer = threading.Thread(
+        target=_writer,
+        args=(batches, totals, state, session_factory, upsert, on_written),
+        name="scrape-db-writer",
+        daemon=True
+    )
+    writer.start()
+
+    def put(item) -> bool:
+        """Blocking put that gives up when the writer has stopped"""
+        while not state["stopped"].is_set():
+            try:
+                batches.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for page, complaints in pages:
+            if not complaints:
+                continue
+            totals["pages_scraped"] += 1
+            totals["scraped"] += len(complaints)
+            if not put((page, complaints)):
+                logger.error(f"DB writer stopped ({state['failed']}), stopping the crawl")
+                break
+            if stop_when and stop_when(page, complaints):
+                logger.info(f"Stopping the crawl after page {page}")
+                totals["stopped_early"] = 1
+                break
+    finally:
+        # Stops the scraper (closes its browser) if the loop ended early
+        close = getattr(pages, "close", None)
+        if close:
+            close()
+        put(_DONE)
+        writer.join()
+
+    logger.info(
+        f"Pipeline finished: {totals['pages_written']}/{totals['pages_scraped']} pages written, "
+        f"{totals.get('created', 0)} new, {totals.get('updated', 0)} refreshed, "
+        f"{totals['write_errors']} write errors"
+    )
+    return totals
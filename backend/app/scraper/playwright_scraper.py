@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from playwright.async_api import async_playwright, Page, Browser
 from bs4 import BeautifulSoup
+from app.scraper.reclame_aqui_scraper import site_root
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +24,7 @@ class PlaywrightReclameAquiScraper:
         self.delay_min = delay_min
         self.delay_max = delay_max
         self.max_concurrent = max_concurrent  # Concurrent browser contexts
+        self.base_url = site_root(company_url)  # Host of the complaint pages
         self.complaints = []
         self.errors = []
 
@@ -114,7 +116,7 @@ class PlaywrightReclameAquiScraper:
 
                             if href:
                                 # Build full URL
-                                full_url = f"https://www.reclameaqui.com.br{href}" if not href.startswith('http') else href
+                                full_url = f"{self.base_url}{href}" if not href.startswith('http') else href
 
                                 # Avoid duplicates
                                 if full_url not in [l['url'] for l in page_links]:
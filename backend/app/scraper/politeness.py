@@ -0,0 +1,157 @@
+"""
+Adaptive request scheduler for the scrapers
+
+Replaces the fixed random delay between pages. Every page load or JSON
+request of a site first waits for its turn (wait()), and reports how it
+went (record()):
+
+- Challenge pages and errors multiply the delay between requests by
+  backoff_factor, up to max_delay.
+- After healthy_streak healthy responses in a row the delay shrinks by
+  recovery_factor, down to min_delay. Responses much slower than the
+  latency average do not count as healthy.
+- Requests are spaced by the current delay across all workers sharing the
+  scheduler, and a token bucket caps them at requests_per_minute whatever
+  the delay.
+
+The challenge rate, error rate and latency of the last `window` responses
+are kept for the run summary.
+"""
+from collections import deque
+from typing import Dict, Optional
+from app.ai.rate_limiter import TokenBucket
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PolitenessScheduler:
+    """Thread-safe adaptive delay + requests-per-minute ceiling for one site"""
+
+    def __init__(
+        self,
+        initial_delay: float = 2,
+        min_delay: float = 0.5,
+        max_delay: float = 300,
+        jitter: float = 2.5,
+        requests_per_minute: float = 30,
+        backoff_factor: float = 2.0,
+        recovery_factor: float = 0.8,
+        healthy_streak: int = 5,
+        slow_factor: float = 3.0,
+        window: int = 50
+    ):
+        """
+        Args:
+            initial_delay: Delay between requests at the start of the run (seconds)
+            min_delay: Shortest delay reached while the site is healthy
+            max_delay: Longest delay reached by backing off
+            jitter: Each wait is delay * uniform(1, jitter) (1 = no jitter)
+            requests_per_minute: Ceiling across all users of the scheduler (0 = none)
+            backoff_factor: Delay multiplier on a challenge or error
+            recovery_factor: Delay multiplier after healthy_streak healthy responses
+            healthy_streak: Healthy responses in a row before the delay shrinks
+            slow_factor: A response slower than slow_factor x the average latency is not healthy
+            window: Recent responses the rates are computed over
+        """
+        self.min_delay = min_delay
+        self.max_delay = max(max_delay, min_delay)
+        self.delay = min(max(initial_delay, min_delay), self.max_delay)
+        self.jitter = max(1.0, jitter)
+        self.backoff_factor = backoff_factor
+        self.recovery_factor = recovery_factor
+        self.healthy_streak = max(1, healthy_streak)
+        self.slow_factor = slow_factor
+        self._ceiling = TokenBucket(requests_per_minute, capacity=1) if requests_per_minute else None
+        self._recent: deque = deque(maxlen=max(1, window))  # "ok" / "slow" / "challenge" / "error"
+        self._latency_avg: Optional[float] = None
+        self._streak = 0
+        self._next_at = 0.0
+        self._backed_off_at = float("-inf")
+        self._totals = {"requests": 0, "challenges": 0, "errors": 0, "backoffs": 0, "waited_seconds": 0.0}
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until this caller may send its next request"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + self.delay * random.uniform(1.0, self.jitter)
+            self._totals["requests"] += 1
+        wait = start - now
+        if self._ceiling:
+            wait = max(wait, self._ceiling.reserve(1))
+        if wait > 0:
+            with self._lock:
+                self._totals["waited_seconds"] += wait
+            time.sleep(wait)
+
+    def record(self, latency: Optional[float] = None, challenge: bool = False, error: bool = False):
+        """
+        Report the outcome of a request
+
+        Args:
+            latency: Seconds until the page/response was usable
+            challenge: The site answered with a challenge page (403/503, "Just a moment...")
+            error: The request failed (timeout, 429/5xx, crashed page)
+        """
+        with self._lock:
+            if challenge or error:
+                outcome = "challenge" if challenge else "error"
+                self._totals["challenges" if challenge else "errors"] += 1
+                self._streak = 0
+                self._recent.append(outcome)
+                now = time.monotonic()
+                # Failures of one burst (several workers hitting the same block) back off once
+                if now - self._backed_off_at < self.delay:
+                    return
+                previous = self.delay
+                self.delay = min(self.max_delay, self.delay * self.backoff_factor)
+                self._next_at = max(self._next_at, now + self.delay)
+                self._backed_off_at = now
+                self._totals["backoffs"] += 1
+                logger.warning(f"Site answered with {outcome}, backing off: delay {previous:.2f}s -> {self.delay:.2f}s")
+                return
+
+            slow = (
+                latency is not None and self._latency_avg is not None
+                and latency > self._latency_avg * self.slow_factor
+            )
+            if latency is not None:
+                self._latency_avg = latency if self._latency_avg is None else 0.8 * self._latency_avg + 0.2 * latency
+            self._recent.append("slow" if slow else "ok")
+            if slow:
+                self._streak = 0
+                return
+
+            self._streak += 1
+            if self._streak >= self.healthy_streak:
+                self._streak = 0
+                if self.delay > self.min_delay:
+                    self.delay = max(self.min_delay, self.delay * self.recovery_factor)
+                    logger.debug(f"Site healthy, delay down to {self.delay:.2f}s")
+
+    def get_stats(self) -> Dict:
+        """Totals, current delay and the rates over the recent window"""
+        with self._lock:
+            recent = len(self._recent) or 1
+            return {
+                **self._totals,
+                "waited_seconds": round(self._totals["waited_seconds"], 1),
+                "delay_seconds": round(self.delay, 2),
+                "avg_latency_seconds": round(self._latency_avg, 2) if self._latency_avg is not None else None,
+                "challenge_rate": round(self._recent.count("challenge") / recent, 3),
+                "error_rate": round(self._recent.count("error") / recent, 3),
+                "slow_rate": round(self._recent.count("slow") / recent, 3),
+            }
+
+    def log_summary(self):
+        stats = self.get_stats()
+        logger.info(
+            f"Politeness: {stats['requests']} requests, {stats['challenges']} challenges, {stats['errors']} errors, "
+            f"{stats['backoffs']} backoffs, final delay {stats['delay_seconds']}s, "
+            f"avg latency {stats['avg_latency_seconds']}s, {stats['waited_seconds']}s waited"
+        )
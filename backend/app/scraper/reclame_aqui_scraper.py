@@ -1,44 +1,78 @@
 import time
-import random
 import logging
 import re
-import json
 from bs4 import BeautifulSoup
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from typing import List, Dict, Optional
+from selenium.common.exceptions import WebDriverException
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
 import threading
+from app.scraper.browser_pool import BrowserPool
+from app.scraper.politeness import PolitenessScheduler
+from app.scraper.waits import (
+    WaitStats, wait_until, any_of, body_present, challenge_cleared, document_ready,
+    next_data_present, selector_present, url_contains
+)
+from app.scraper.next_data import complaints_from_page_props, apply_complaint_detail
+from app.scraper.extract import (
+    next_data_from_driver, next_data_from_soup, page_category_from_driver, page_category_from_soup
+)
 
 logger = logging.getLogger(__name__)
 
+# Complaint links on a rendered listing page (HTML fallback)
+LISTING_LINK_SELECTOR = 'div.sc-1sm4sxr-0 a'
+
+DEFAULT_BASE_URL = "https://www.reclameaqui.com.br"
+
+
+def site_root(company_url: str) -> str:
+    """Scheme and host of a company URL (the site every page of the crawl is read from)"""
+    parsed = urlparse(company_url)
+    return f"{parsed.scheme}://{parsed.netloc}" if parsed.scheme and parsed.netloc else DEFAULT_BASE_URL
+
 
 class ReclameAquiScraper:
     """Scraper for collecting complaints from Reclame Aqui"""
 
-    def __init__(self, company_url: str, max_pages: int = 10, delay_min: int = 2, delay_max: int = 5, max_workers: int = 3, start_page: int = 1, fetch_details: bool = False, page_step: int = 1):
+    def __init__(self, company_url: str, max_pages: int = 10, delay_min: int = 2, delay_max: int = 5, max_workers: int = 3, start_page: int = 1, fetch_details: bool = False, page_step: int = 1, browser_recycle_pages: int = 50, requests_per_minute: float = 30, min_delay: float = 0.5, max_delay: float = 300):
         self.company_url = company_url
         self.max_pages = max_pages
         self.start_page = start_page  # Starting page number for batch processing
         self.page_step = page_step  # Step between pages (e.g., 10 to skip pages and avoid duplicates)
         self.delay_min = delay_min
         self.delay_max = delay_max
-        self.max_workers = max_workers  # Number of parallel threads for fetching complaints
+        self.max_workers = max_workers  # Number of pooled browsers fetching complaint pages
+        self.browser_recycle_pages = browser_recycle_pages  # Pages per pooled browser before it is replaced
+        self.requests_per_minute = requests_per_minute  # Ceiling of page loads per minute (listing + pool)
         self.fetch_details = fetch_details  # If True, fetch individual pages for complete data (slower)
         self.complaints = []
         self.errors = []
+        self.failed_pages: List[int] = []  # Listing pages that could not be read (left pending in the frontier)
         self._lock = threading.Lock()  # Thread-safe access to complaints list
         self.on_page_complete = None  # Callback for incremental imports
+        self.pages: Optional[List[int]] = None  # Explicit listing pages to scrape (e.g. from the crawl frontier)
+        self._pool: Optional[BrowserPool] = None  # Created on the first complaint page fetch
+        self.shared_pool: Optional[BrowserPool] = None  # Pool shared with other scrapers (closed by its owner)
+        # Adaptive delay between page loads, starting at delay_min (replaced by a per-site one when shared)
+        self.throttle = PolitenessScheduler(
+            initial_delay=delay_min,
+            min_delay=min(min_delay, delay_min),
+            max_delay=max_delay,
+            jitter=delay_max / delay_min if delay_min else 1,
+            requests_per_minute=requests_per_minute
+        )
+        self.waits = WaitStats()  # Time actually spent in each wait step
 
         # Extract company slug from URL (e.g., "drogaria-venancio-site-e-televendas" from the company URL)
         # URL format: https://www.reclameaqui.com.br/empresa/drogaria-venancio-site-e-televendas
         url_parts = company_url.rstrip('/').split('/')
         self.company_slug = url_parts[-1] if url_parts else ''
+        # Complaint pages and JSON routes live on the same host (a replay server in benchmarks)
+        self.base_url = site_root(company_url)
 
     def _get_driver(self) -> uc.Chrome:
         """Configure and return undetected ChromeDriver to bypass Cloudflare"""
@@ -126,36 +160,60 @@ class ReclameAquiScraper:
             logger.error(f"Failed to initialize undetected ChromeDriver: {e}")
             raise
 
-    def _random_delay(self, min_sec: Optional[int] = None, max_sec: Optional[int] = None):
-        """Random delay to avoid detection"""
-        min_sec = min_sec or self.delay_min
-        max_sec = max_sec or self.delay_max
-        delay = random.uniform(min_sec, max_sec)
-        logger.debug(f"Waiting {delay:.2f} seconds...")
-        time.sleep(delay)
-
-    def _fetch_single_complaint(self, complaint_url: str) -> Optional[BeautifulSoup]:
+    def _warm_up_browser(self, driver):
+        """Clear the Cloudflare challenge on a new pooled browser before its first complaint page"""
+        self._throttle()
+        started = time.monotonic()
+        driver.get(f"{self.company_url.rstrip('/')}/lista-reclamacoes/")
+        self._wait_for_page(driver, started=started)
+
+    def _browser_pool(self) -> BrowserPool:
+        """Pool of warmed-up browsers for complaint pages (started on first use)"""
+        if self.shared_pool is not None:
+            return self.shared_pool
+        if self._pool is None:
+            self._pool = BrowserPool(
+                self._get_driver,
+                size=self.max_workers,
+                warm_up=self._warm_up_browser,
+                max_pages_per_browser=self.browser_recycle_pages,
+                throttle=self.throttle
+            )
+        return self._pool
+
+    def _complaint_url(self, url_path: str) -> str:
+        """Complaint page URL - format: /{company-slug}/{complaint-slug_ID}/"""
+        if url_path.startswith('http'):
+            return url_path
+        return f"{self.base_url}/{self.company_slug}/{url_path.lstrip('/')}/"
+
+    def _target_pages(self) -> List[int]:
+        """Listing pages to scrape: self.pages when set, else start_page/page_step/max_pages"""
+        if self.pages is not None:
+            return list(self.pages)
+        # Generate page numbers using step (e.g., 1, 11, 21... with step=10)
+        end_page = 1 + (self.max_pages - 1) * self.page_step
+        return [self.start_page + page - 1 for page in range(1, end_page + 1, self.page_step)][:self.max_pages]
+
+    def _page_failed(self, page: int, error: str):
+        """Record a listing page that could not be read"""
+        logger.error(f"Page {page}: {error}")
+        self.errors.append(f"Page {page}: {error}")
+        self.failed_pages.append(page)
+
+    def _throttle(self):
+        """Wait for the politeness scheduler before loading a page"""
+        self.throttle.wait()
+
+    def _fetch_single_complaint(self, driver, complaint_url: str) -> Optional[BeautifulSoup]:
         """
-        Fetch and parse a single complaint page (thread-safe)
-        Each thread gets its own WebDriver instance
+        Fetch and parse a single complaint page on a pooled browser (thread-safe)
         """
-        driver = None
         try:
             logger.info(f"Fetching complaint: {complaint_url[:60]}...")
-            driver = self._get_driver()
-
+            started = time.monotonic()
             driver.get(complaint_url)
-
-            # Wait for page load - INCREASED timeout for better reliability
-            WebDriverWait(driver, 30).until(  # Increased from 10 to 30 seconds
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-
-            # Wait for Cloudflare - INCREASED timeout
-            self._wait_for_cloudflare(driver, timeout=20)  # Increased from 15 to 20 seconds
-
-            # Small delay to avoid overwhelming server
-            self._random_delay(1, 2)
+            self._wait_for_page(driver, cloudflare_timeout=20, started=started)
 
             # Parse and return
             complaint_soup = BeautifulSoup(driver.page_source, 'html.parser')
@@ -164,33 +222,43 @@ class ReclameAquiScraper:
 
         except Exception as e:
             logger.error(f"Error fetching complaint {complaint_url}: {e}")
+            self.throttle.record(error=True)
             with self._lock:
                 self.errors.append(f"Fetch error for {complaint_url}: {e}")
             return None
-        finally:
-            if driver:
-                driver.quit()
+
+    def _wait(self, driver, predicate, step: str, timeout: Optional[float] = None) -> bool:
+        """wait_until recorded in this scraper's wait histogram"""
+        return wait_until(driver, predicate, step, stats=self.waits, timeout=timeout)
 
     def _wait_for_cloudflare(self, driver, timeout=30):
         """Wait for Cloudflare challenge to complete"""
-        logger.info("Checking for Cloudflare challenge...")
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            page_source = driver.page_source.lower()
-
-            # Check if Cloudflare challenge is present
-            if 'cloudflare' in page_source and ('just a moment' in page_source or 'verify you are human' in page_source):
-                logger.info("Cloudflare challenge detected, waiting for resolution...")
-                time.sleep(2)
-                continue
-            else:
-                logger.info("Cloudflare challenge passed or not present")
-                return True
-
+        if self._wait(driver, challenge_cleared, "cloudflare", timeout):
+            logger.debug("Cloudflare challenge passed or not present")
+            return True
         logger.warning(f"Cloudflare challenge not resolved after {timeout} seconds")
         return False
 
+    def _wait_for_page(self, driver, cloudflare_timeout: float = 30, started: Optional[float] = None) -> bool:
+        """
+        Wait until a freshly loaded page carries its data
+
+        Returns as soon as the body is there, the challenge is gone and
+        __NEXT_DATA__ (or, for client-rendered listings, the complaint
+        links) is present. The outcome (latency since `started`, challenge
+        seen, timeout) is reported to the politeness scheduler.
+        """
+        started = started if started is not None else time.monotonic()
+        self._wait(driver, body_present, "page_load")
+        try:
+            challenged = not challenge_cleared(driver)
+        except Exception:
+            challenged = False
+        cleared = self._wait_for_cloudflare(driver, timeout=cloudflare_timeout)
+        ready = self._wait(driver, any_of(next_data_present, selector_present(LISTING_LINK_SELECTOR)), "next_data")
+        self.throttle.record(time.monotonic() - started, challenge=challenged, error=not (cleared and ready))
+        return ready
+
     def _fetch_complaint_details_with_driver(self, driver, complaint_url: str, basic_data: Dict) -> Dict:
         """
         Fetch individual complaint page using existing driver to extract complete details including location.
@@ -200,88 +268,29 @@ class ReclameAquiScraper:
             logger.info(f"Fetching details for: {basic_data.get('title', 'N/A')[:40]}...")
             logger.info(f"URL: {complaint_url}")
 
+            started = time.monotonic()
             driver.get(complaint_url)
+            self._wait_for_page(driver, cloudflare_timeout=20, started=started)
 
-            # Wait for page load
-            WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-
-            # Wait for Cloudflare
-            self._wait_for_cloudflare(driver, timeout=20)
-
-            # Small delay
-            time.sleep(2)
-
-            # Parse page
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-            # Extract from __NEXT_DATA__ JSON in individual complaint page
-            script = soup.find('script', id='__NEXT_DATA__')
-            if script:
+            # Read __NEXT_DATA__ in the browser instead of parsing the whole page
+            data = next_data_from_driver(driver)
+            if data:
                 try:
-                    data = json.loads(script.string)
                     complaint_detail = data.get('props', {}).get('pageProps', {}).get('complaint', {})
 
                     if complaint_detail:
-                        # Extract location (city + state)
-                        city = complaint_detail.get('userCity', '')
-                        state = complaint_detail.get('userState', '')
-                        if city and state:
-                            basic_data['location'] = f"{city} - {state}"
-                        elif city:
-                            basic_data['location'] = city
-                        elif state:
-                            basic_data['location'] = state
-
-                        # Extract full description
-                        if complaint_detail.get('description'):
-                            basic_data['text'] = complaint_detail.get('description', basic_data.get('text', ''))
-
-                        # Extract company response
-                        interactions = complaint_detail.get('interactions', [])
-                        logger.info(f"Found {len(interactions)} interactions in complaint")
-
-                        # Debug: Log all interaction types found
-                        if interactions:
-                            for i, interaction in enumerate(interactions):
-                                int_type = interaction.get('type', 'UNKNOWN')
-                                int_msg = interaction.get('message', '')[:100] if interaction.get('message') else 'NO MESSAGE'
-                                logger.info(f"  Interaction {i}: type={int_type}, message_preview={int_msg}...")
-
-                        for interaction in interactions:
-                            int_type = interaction.get('type', '')
-                            # Company response - can be ANSWER or REPLY
-                            if int_type in ('ANSWER', 'REPLY'):
-                                basic_data['company_response_text'] = interaction.get('message', '')
-                                created = interaction.get('created', '')
-                                if created:
-                                    try:
-                                        basic_data['company_response_date'] = datetime.fromisoformat(created.replace('Z', '+00:00').split('+')[0])
-                                    except:
-                                        pass
-                                logger.info(f"Found {int_type}: {basic_data['company_response_text'][:100]}...")
-                            # Customer evaluation - can be FINAL_ANSWER or EVALUATION
-                            elif int_type in ('FINAL_ANSWER', 'EVALUATION'):
-                                basic_data['customer_evaluation'] = interaction.get('message', '')
-                                created = interaction.get('created', '')
-                                if created:
-                                    try:
-                                        basic_data['evaluation_date'] = datetime.fromisoformat(created.replace('Z', '+00:00').split('+')[0])
-                                    except:
-                                        pass
-                                logger.info(f"Found {int_type}: {basic_data['customer_evaluation'][:100]}...")
+                        apply_complaint_detail(basic_data, complaint_detail)
 
                         logger.info(f"Extracted details from JSON - Location: {basic_data.get('location', 'N/A')}")
 
                         # Save individual page HTML for debugging (first 3 only)
-                        if hasattr(self, '_debug_count'):
-                            self._debug_count += 1
-                        else:
-                            self._debug_count = 1
+                        with self._lock:
+                            self._debug_count = getattr(self, '_debug_count', 0) + 1
+                            debug_count = self._debug_count
 
-                        if self._debug_count <= 3:
-                            debug_file = f"debug_html/individual_{self._debug_count}.html"
+                        if debug_count <= 3:
+                            Path("debug_html").mkdir(exist_ok=True)
+                            debug_file = f"debug_html/individual_{debug_count}.html"
                             with open(debug_file, 'w', encoding='utf-8') as f:
                                 f.write(driver.page_source)
                             logger.info(f"Saved individual page HTML to {debug_file}")
@@ -291,6 +300,7 @@ class ReclameAquiScraper:
 
             # Fallback: extract location from HTML if not found in JSON
             if not basic_data.get('location'):
+                soup = BeautifulSoup(driver.page_source, 'html.parser')
                 location_elem = soup.find('span', {'data-testid': 'complaint-location'})
                 if location_elem:
                     basic_data['location'] = location_elem.get_text(strip=True)
@@ -298,6 +308,10 @@ class ReclameAquiScraper:
 
             return basic_data
 
+        except WebDriverException:
+            self.throttle.record(error=True)
+            raise  # let the browser pool replace a crashed browser and retry
+
         except Exception as e:
             logger.error(f"Error fetching complaint details: {e}")
             with self._lock:
@@ -309,79 +323,14 @@ class ReclameAquiScraper:
         Extract complaints data from __NEXT_DATA__ JSON in the page.
         This is more reliable than parsing HTML as it contains structured data.
         """
-        try:
-            script = soup.find('script', id='__NEXT_DATA__')
-            if not script:
-                return []
-
-            data = json.loads(script.string)
-            complaints_data = data.get('props', {}).get('pageProps', {}).get('complaints', {})
-
-            # Get the list of complaints (usually in 'LAST' key)
-            items = complaints_data.get('LAST', [])
-            if not items:
-                # Try other possible keys
-                for key in ['data', 'items', 'list']:
-                    if key in complaints_data and isinstance(complaints_data[key], list):
-                        items = complaints_data[key]
-                        break
-
-            if not items:
-                logger.warning("No complaints found in JSON data")
-                return []
-
-            extracted = []
-            for item in items:
-                try:
-                    # Parse ISO date format: "2025-11-17T18:22:27"
-                    created_str = item.get('created', '')
-                    complaint_date = datetime.now()
-                    if created_str:
-                        try:
-                            complaint_date = datetime.fromisoformat(created_str.replace('Z', '+00:00').split('+')[0])
-                        except:
-                            pass
-
-                    # Map status
-                    status_map = {
-                        'SOLVED': 'Resolvido',
-                        'REPLIED': 'Respondida',
-                        'ANSWERED': 'Respondida',
-                        'NOT_SOLVED': 'Não resolvido',
-                        'NOT_REPLIED': 'Não respondida',
-                        'PENDING': 'Não respondida',
-                        'IN_REPLICA': 'Em réplica',
-                        'EVALUATED': 'Avaliada',
-                    }
-                    raw_status = item.get('status', '')
-                    status = status_map.get(raw_status, raw_status)
-
-                    complaint_data = {
-                        'title': item.get('title', 'Sem título'),
-                        'text': item.get('description', ''),
-                        'user_name': item.get('userName', 'Anônimo'),
-                        'complaint_date': complaint_date,
-                        'status': status,
-                        'location': item.get('userState'),
-                        'external_id': str(item.get('id', '')),
-                        'url': item.get('url', ''),  # URL for fetching details
-                        # Response data if available
-                        'company_response_text': None,
-                        'company_response_date': None,
-                        'customer_evaluation': item.get('dealAgain'),
-                        'evaluation_date': None,
-                    }
-
-                    # Only add if we have meaningful data
-                    if complaint_data['title'] and complaint_data['external_id']:
-                        extracted.append(complaint_data)
-
-                except Exception as e:
-                    logger.error(f"Error extracting complaint from JSON: {e}")
-                    continue
-
-            return extracted
+        return self._complaints_from_next_data(next_data_from_soup(soup))
 
+    def _complaints_from_next_data(self, data: Optional[Dict]) -> List[Dict]:
+        """Complaints of a listing page's __NEXT_DATA__ payload"""
+        if not data:
+            return []
+        try:
+            return complaints_from_page_props(data.get('props', {}).get('pageProps', {}))
         except Exception as e:
             logger.error(f"Error parsing __NEXT_DATA__ JSON: {e}")
             return []
@@ -619,7 +568,10 @@ class ReclameAquiScraper:
 
     def scrape_complaints(self, save_debug: bool = False) -> List[Dict]:
         """
-        Main scraping method
+        Main scraping method: every page of iter_pages, kept in memory
+
+        Long runs should consume iter_pages (see app.scraper.pipeline) so
+        each page is persisted as soon as it is scraped.
 
         Args:
             save_debug: If True, saves HTML pages for debugging
@@ -627,9 +579,30 @@ class ReclameAquiScraper:
         Returns:
             List of complaint dictionaries
         """
+        for page, page_complaints in self.iter_pages(save_debug=save_debug):
+            with self._lock:
+                self.complaints.extend(page_complaints)
+            # Call callback for incremental imports if set
+            if self.on_page_complete:
+                self.on_page_complete(page, page_complaints)
+        return self.complaints
+
+    def iter_pages(self, save_debug: bool = False) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Scrape page by page
+
+        Args:
+            save_debug: If True, saves HTML pages for debugging
+
+        Yields:
+            (page, complaints of that page); the browser moves on to the
+            next page only when the caller asks for it
+        """
         driver = None
-        retry_count = 0
-        max_retries = 3
+        collected = 0
+        page_numbers = self._target_pages()
+        if not page_numbers:
+            return
 
         try:
             driver = self._get_driver()
@@ -637,44 +610,32 @@ class ReclameAquiScraper:
 
             # Navigate to the first page initially
             base_url = self.company_url.rstrip('/')
-            initial_url = f"{base_url}/lista-reclamacoes/?pagina={self.start_page}"
+            initial_url = f"{base_url}/lista-reclamacoes/?pagina={page_numbers[0]}"
 
             logger.info(f"Loading initial page: {initial_url}")
+            self._throttle()
+            started = time.monotonic()
             driver.get(initial_url)
 
-            # Wait for initial page load
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-
-            # Wait for Cloudflare
-            self._wait_for_cloudflare(driver, timeout=30)
-
-            # Wait for JavaScript to load
-            try:
-                WebDriverWait(driver, 10).until(
-                    lambda d: d.execute_script('return document.readyState') == 'complete'
-                )
-                time.sleep(3)  # Give React time to render
-            except:
-                pass
-
-            # Generate page numbers using step (e.g., 1, 11, 21... with step=10)
-            end_page = 1 + (self.max_pages - 1) * self.page_step
-            page_numbers = list(range(1, end_page + 1, self.page_step))[:self.max_pages]
+            # Wait for the page data (no fixed render delay)
+            self._wait_for_page(driver, started=started)
+            self._wait(driver, document_ready, "document_ready")
 
             for page_index, page in enumerate(page_numbers, 1):
                 logger.info(f"Scraping page {page} ({page_index}/{len(page_numbers)})")
+                page_complaints = []
 
                 # For pages after the first, click on the pagination button
-                if page > 1:
+                if page_index > 1:
                     try:
-                        target_page = self.start_page + page - 1
+                        target_page = page
                         logger.info(f"Navigating to page {target_page} via pagination click")
 
+                        self._throttle()
+                        started = time.monotonic()
+
                         # Scroll down to make pagination visible
                         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                        time.sleep(1)
 
                         # Try multiple strategies to click the next page
                         clicked = False
@@ -687,7 +648,6 @@ class ReclameAquiScraper:
                                 href = link.get_attribute('href') or ''
                                 if f'pagina={target_page}' in href:
                                     driver.execute_script("arguments[0].scrollIntoView(true);", link)
-                                    time.sleep(0.5)
                                     link.click()
                                     clicked = True
                                     logger.info(f"Clicked pagination link for page {target_page}")
@@ -695,8 +655,8 @@ class ReclameAquiScraper:
                         except Exception as e:
                             logger.debug(f"Strategy 1 failed: {e}")
 
-                        # Strategy 2: Click the "next" button
-                        if not clicked:
+                        # Strategy 2: Click the "next" button (only when the target is the next page)
+                        if not clicked and target_page == page_numbers[page_index - 2] + 1:
                             try:
                                 next_selectors = [
                                     'button[aria-label*="Próxima"]',
@@ -713,7 +673,6 @@ class ReclameAquiScraper:
                                         next_btn = driver.find_element(By.CSS_SELECTOR, selector)
                                         if next_btn and next_btn.is_displayed():
                                             driver.execute_script("arguments[0].scrollIntoView(true);", next_btn)
-                                            time.sleep(0.5)
                                             next_btn.click()
                                             clicked = True
                                             logger.info(f"Clicked next button with selector: {selector}")
@@ -748,55 +707,36 @@ class ReclameAquiScraper:
                             driver.get(url)
                             logger.info(f"Fallback: Full page reload for page {target_page}")
 
-                        # Wait for content to update
-                        time.sleep(3)
-                        WebDriverWait(driver, 15).until(
-                            EC.presence_of_element_located((By.TAG_NAME, "body"))
-                        )
-
-                        # Wait for Cloudflare
-                        self._wait_for_cloudflare(driver, timeout=30)
-
-                        # Wait for React to render and content to change
-                        try:
-                            WebDriverWait(driver, 10).until(
-                                lambda d: d.execute_script('return document.readyState') == 'complete'
-                            )
-                            time.sleep(3)  # Additional time for React hydration
-                        except:
-                            pass
+                        # Wait for the URL to switch to the target page, then for its data
+                        self._wait(driver, url_contains(f"pagina={target_page}"), "navigation")
+                        self._wait_for_page(driver, started=started)
+                        self._wait(driver, document_ready, "document_ready")
 
                     except Exception as e:
-                        logger.error(f"Error navigating to page {page}: {e}")
+                        self._page_failed(page, f"navigation error: {e}")
+                        self.throttle.record(error=True)
                         continue
 
-                # Scroll to load lazy content
+                # Scroll to load lazy content, until the complaint links are rendered
                 driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
+                self._wait(driver, selector_present(LISTING_LINK_SELECTOR), "listing")
                 driver.execute_script("window.scrollTo(0, 0);")
-                time.sleep(1)
-
-                # Get page source
-                page_source = driver.page_source
 
+                # The page source is only transferred and parsed for debugging or the HTML fallback
+                page_source = driver.page_source if save_debug else None
                 if save_debug:
                     self._save_debug_html(page_source, page)
 
-                # Parse HTML
-                soup = BeautifulSoup(page_source, 'html.parser')
-
                 # Extract company category from page header (applies to all complaints)
                 # This is more reliable than trying to extract from individual complaint pages
-                page_category = None
-                category_link = soup.find('a', {'id': 'info_segmento_hero'})
-                if category_link:
-                    category_p = category_link.find('p')
-                    if category_p:
-                        page_category = category_p.get_text(strip=True)
-                        logger.info(f"Extracted company category from page: {page_category}")
-
-                # Extract complaints data from __NEXT_DATA__ JSON (more reliable than HTML parsing)
-                complaints_from_json = self._extract_complaints_from_json(soup)
+                page_category = page_category_from_driver(driver)
+                if page_category:
+                    logger.info(f"Extracted company category from page: {page_category}")
+
+                # Extract complaints data from __NEXT_DATA__ JSON (more reliable than HTML parsing),
+                # read in the browser rather than from a parsed copy of the page
+                next_data = next_data_from_driver(driver)
+                complaints_from_json = self._complaints_from_next_data(next_data)
                 if complaints_from_json:
                     logger.info(f"Extracted {len(complaints_from_json)} complaints from JSON on page {page}")
 
@@ -804,48 +744,28 @@ class ReclameAquiScraper:
                     if self.fetch_details:
                         logger.info(f"Fetching detailed data for {len(complaints_from_json)} complaints...")
 
-                        # Use same driver sequentially to avoid DNS errors
-                        for i, complaint_data in enumerate(complaints_from_json):
-                            # Build complaint URL - format: /{company-slug}/{complaint-slug_ID}/
-                            url_path = complaint_data.get('url', '')
-                            if url_path:
-                                if not url_path.startswith('http'):
-                                    # Remove any leading slash from url_path
-                                    url_path = url_path.lstrip('/')
-                                    # Build URL with company slug: /company-slug/complaint-slug/
-                                    complaint_url = f"https://www.reclameaqui.com.br/{self.company_slug}/{url_path}/"
-                                else:
-                                    complaint_url = url_path
-
+                        # Detail pages are spread over the browser pool (the listing driver stays on the listing)
+                        pool = self._browser_pool()
+                        futures = [
+                            pool.submit(self._fetch_complaint_details_with_driver, self._complaint_url(c['url']), c)
+                            if c.get('url') else None
+                            for c in complaints_from_json
+                        ]
+                        for i, (complaint_data, future) in enumerate(zip(complaints_from_json, futures)):
+                            if future is not None:
                                 try:
-                                    updated_data = self._fetch_complaint_details_with_driver(driver, complaint_url, complaint_data)
-                                    if page_category:
-                                        updated_data['category'] = page_category
-                                    updated_data['scraped_at'] = datetime.now()
-                                    # Remove URL field before saving
-                                    updated_data.pop('url', None)
-                                    with self._lock:
-                                        self.complaints.append(updated_data)
-                                    logger.info(f"Progress: {i+1}/{len(complaints_from_json)} complaints processed")
-
-                                    # Small delay between requests
-                                    time.sleep(1)
+                                    complaint_data = future.result()
                                 except Exception as e:
+                                    # Browser could not be started/recovered: keep the listing data
                                     logger.error(f"Error fetching details: {e}")
-                                    # Add basic data on error
-                                    if page_category:
-                                        complaint_data['category'] = page_category
-                                    complaint_data['scraped_at'] = datetime.now()
-                                    complaint_data.pop('url', None)
                                     with self._lock:
-                                        self.complaints.append(complaint_data)
-                            else:
-                                # No URL, add with basic data
-                                if page_category:
-                                    complaint_data['category'] = page_category
-                                complaint_data['scraped_at'] = datetime.now()
-                                with self._lock:
-                                    self.complaints.append(complaint_data)
+                                        self.errors.append(f"Detail fetch error: {e}")
+                            if page_category:
+                                complaint_data['category'] = page_category
+                            complaint_data['scraped_at'] = datetime.now()
+                            complaint_data.pop('url', None)
+                            page_complaints.append(complaint_data)
+                            logger.info(f"Progress: {i+1}/{len(complaints_from_json)} complaints processed")
                     else:
                         # Fast mode: just use basic JSON data
                         for complaint_data in complaints_from_json:
@@ -853,28 +773,23 @@ class ReclameAquiScraper:
                                 complaint_data['category'] = page_category
                             complaint_data['scraped_at'] = datetime.now()
                             complaint_data.pop('url', None)  # Remove URL field
-                            with self._lock:
-                                self.complaints.append(complaint_data)
-
-                    # Call callback for incremental imports if set
-                    if self.on_page_complete:
-                        # Get the complaints from this page (last N added to self.complaints)
-                        page_complaints_count = len(complaints_from_json)
-                        if self.fetch_details:
-                            page_complaints = self.complaints[-page_complaints_count:] if len(self.complaints) >= page_complaints_count else self.complaints[:]
-                        else:
-                            page_complaints = complaints_from_json
-                        self.on_page_complete(page, page_complaints)
-
-                    # Random delay between pages
-                    self._random_delay(self.delay_min, self.delay_max)
-                    continue  # Skip the old link-based extraction
+                            page_complaints.append(complaint_data)
+
+                    collected += len(page_complaints)
+                    yield page, page_complaints
+                    continue  # Skip the old link-based extraction (the next page waits for the throttle)
 
                 # Fallback: Use the old selector-based approach if JSON extraction fails
                 # Use the correct selector for complaint links from the list page
                 # This gets the links to individual complaint pages
+                if page_source is None:
+                    page_source = driver.page_source
+                soup = BeautifulSoup(page_source, 'html.parser')
+                if not page_category:
+                    page_category = page_category_from_soup(soup)
+
                 complaint_links = []
-                link_selector = 'div.sc-1sm4sxr-0 a'
+                link_selector = LISTING_LINK_SELECTOR
 
                 # Find all complaint links
                 link_elements = soup.select(link_selector)
@@ -891,36 +806,26 @@ class ReclameAquiScraper:
                             if complaint_url and complaint_url.count('/') >= 3 and not any(x in complaint_url for x in ['lista-reclamacoes', 'sobre', 'cupons', 'compare', '#']):
                                 # Make absolute URL
                                 if not complaint_url.startswith('http'):
-                                    complaint_url = f"https://www.reclameaqui.com.br{complaint_url}"
+                                    complaint_url = f"{self.base_url}{complaint_url}"
 
                                 complaint_links.append(complaint_url)
                         except Exception as e:
                             logger.error(f"Error extracting link: {e}")
 
-                # Now fetch each complaint page individually using parallel workers
+                # Now fetch each complaint page on the browser pool
                 complaint_elements = []
-                logger.info(f"Fetching {len(complaint_links)} complaint pages in parallel with {self.max_workers} workers...")
-
-                # Use ThreadPoolExecutor for parallel fetching
-                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    # Submit all fetch tasks
-                    future_to_url = {
-                        executor.submit(self._fetch_single_complaint, url): url
-                        for url in complaint_links
-                    }
-
-                    # Collect results as they complete
-                    completed_count = 0
-                    for future in as_completed(future_to_url):
-                        completed_count += 1
-                        complaint_url = future_to_url[future]
-                        try:
-                            complaint_soup = future.result()
-                            if complaint_soup:
-                                complaint_elements.append(complaint_soup)
-                                logger.info(f"Progress: {completed_count}/{len(complaint_links)} complaints fetched")
-                        except Exception as e:
-                            logger.error(f"Thread exception for {complaint_url}: {e}")
+                logger.info(f"Fetching {len(complaint_links)} complaint pages in parallel with {self.max_workers} browsers...")
+
+                pool = self._browser_pool()
+                futures = {pool.submit(self._fetch_single_complaint, url): url for url in complaint_links}
+                for completed_count, (future, complaint_url) in enumerate(futures.items(), 1):
+                    try:
+                        complaint_soup = future.result()
+                        if complaint_soup:
+                            complaint_elements.append(complaint_soup)
+                            logger.info(f"Progress: {completed_count}/{len(complaint_links)} complaints fetched")
+                    except Exception as e:
+                        logger.error(f"Browser pool error for {complaint_url}: {e}")
 
                 if not complaint_elements:
                     logger.warning(f"No complaints found on page {page}")
@@ -939,15 +844,21 @@ class ReclameAquiScraper:
                                 complaint['category'] = page_category
                                 logger.debug(f"Applied page category '{page_category}' to complaint")
 
-                            self.complaints.append(complaint)
+                            page_complaints.append(complaint)
                             logger.debug(f"Extracted complaint {idx + 1}: {complaint.get('title', 'N/A')[:50]}")
                     except Exception as e:
                         logger.error(f"Error processing complaint {idx + 1} on page {page}: {e}")
                         self.errors.append(f"Page {page}, complaint {idx + 1}: {e}")
 
-                # Random delay between pages
-                if page < self.max_pages:
-                    self._random_delay()
+                if page_complaints:
+                    collected += len(page_complaints)
+                    yield page, page_complaints
+                elif next_data:
+                    # The page loaded but lists nothing: past the end of the listing
+                    logger.info(f"No complaints on page {page}, stopping")
+                    break
+                else:
+                    self._page_failed(page, "no complaints found")
 
         except Exception as e:
             logger.error(f"Fatal error during scraping: {e}")
@@ -957,12 +868,15 @@ class ReclameAquiScraper:
             if driver:
                 driver.quit()
                 logger.info("WebDriver closed")
+            if self._pool:
+                self._pool.close()
+                self._pool = None
 
-        logger.info(f"Scraping completed. Collected {len(self.complaints)} complaints")
+        logger.info(f"Scraping completed. Collected {collected} complaints")
         if self.errors:
             logger.warning(f"Encountered {len(self.errors)} errors during scraping")
-
-        return self.complaints
+        self.waits.log_summary()
+        self.throttle.log_summary()
 
     def get_errors(self) -> List[str]:
         """Return list of errors encountered during scraping"""
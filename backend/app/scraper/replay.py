@@ -0,0 +1,444 @@
+"""
+Local replay of Reclame Aqui pages for the scrapers
+
+ReplayServer serves recorded (or synthesized) page data on localhost the
+way the site does, so every scraper backend can run against it without
+touching the real site: point its company URL at
+`{server.url}/empresa/{slug}` (RECLAME_AQUI_COMPANY_URL and
+SCRAPER_BASE_URL for the scheduled job).
+
+Routes:
+    /empresa/{slug}/lista-reclamacoes/?pagina=N          listing page (HTML)
+    /{slug}/{complaint-path}/                            complaint page (HTML)
+    /_next/data/{buildId}/empresa/{slug}/lista-reclamacoes.json?pagina=N
+    /_next/data/{buildId}/{slug}/{complaint-path}.json   complaint JSON
+
+The HTML pages are rendered from the recorded page props: __NEXT_DATA__,
+the category link, the complaint links and pagination of a listing, and
+the data-testid elements of a complaint page. A stale buildId answers 404,
+like after a deploy. Every response can be delayed (latency) and a share
+of them answered with a Cloudflare-style challenge (challenge_rate): a 403
+"Just a moment..." page that reloads itself, as the browser sees it.
+
+Fixture layout (FixtureStore):
+    meta.json                          {"buildId": ..., "category": ...}
+    {slug}/listing_{N}.json            pageProps of listing page N
+    {slug}/complaints/{path}.json      pageProps of a complaint page
+"""
+from datetime import datetime, timedelta
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUILD_ID = "replay"
+DEFAULT_CATEGORY = "Farmácias e Drogarias"
+
+_LISTING_PATH = re.compile(r"^/empresa/([^/]+)/lista-reclamacoes/?$")
+_LISTING_JSON = re.compile(r"^/_next/data/([^/]+)/empresa/([^/]+)/lista-reclamacoes\.json$")
+_DETAIL_JSON = re.compile(r"^/_next/data/([^/]+)/([^/]+)/([^/]+)\.json$")
+_DETAIL_PATH = re.compile(r"^/([^/]+)/([^/]+)/?$")
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+CHALLENGE_HTML = (
+    "<!DOCTYPE html><html><head><title>Just a moment...</title></head>"
+    "<body><p>Verify you are human by completing the action below.</p>"
+    "<script>setTimeout(function () { location.reload(); }, 500);</script></body></html>"
+)
+
+
+class FixtureStore:
+    """Recorded page props on disk (see the module docstring for the layout)"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        meta_path = self.directory / "meta.json"
+        meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+        self.build_id: str = meta.get("buildId") or DEFAULT_BUILD_ID
+        self.category: Optional[str] = meta.get("category")
+
+    def save_meta(self, build_id: str, category: Optional[str]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.build_id, self.category = build_id, category
+        meta = {"buildId": build_id, "category": category}
+        (self.directory / "meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def slugs(self) -> List[str]:
+        return sorted(path.name for path in self.directory.iterdir() if path.is_dir()) if self.directory.exists() else []
+
+    def last_page(self, slug: str) -> int:
+        pages = [int(path.stem.split("_")[1]) for path in (self.directory / slug).glob("listing_*.json")]
+        return max(pages, default=0)
+
+    def listing(self, slug: str, page: int) -> Optional[Dict]:
+        return self._read(self.directory / slug / f"listing_{page}.json")
+
+    def detail(self, slug: str, complaint_path: str) -> Optional[Dict]:
+        return self._read(self.directory / slug / "complaints" / f"{_SAFE_NAME.sub('_', complaint_path)}.json")
+
+    def save_listing(self, slug: str, page: int, page_props: Dict):
+        self._write(self.directory / slug / f"listing_{page}.json", page_props)
+
+    def save_detail(self, slug: str, complaint_path: str, page_props: Dict):
+        self._write(self.directory / slug / "complaints" / f"{_SAFE_NAME.sub('_', complaint_path)}.json", page_props)
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Dict]:
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+    @staticmethod
+    def _write(path: Path, page_props: Dict):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(page_props, ensure_ascii=False), encoding="utf-8")
+
+
+def listing_items(page_props: Optional[Dict]) -> List[Dict]:
+    """Complaint items of listing page props (same keys as complaints_from_page_props)"""
+    complaints = (page_props or {}).get("complaints") or {}
+    for key in ("LAST", "data", "items", "list"):
+        if isinstance(complaints.get(key), list) and complaints[key]:
+            return complaints[key]
+    return []
+
+
+def complaint_path(slug: str, url: str) -> str:
+    """Complaint page segment of a listing item url ("/{slug}/{path}/", "{path}" or a full URL)"""
+    path = urlparse(url).path.strip("/")
+    if path.startswith(f"{slug}/"):
+        path = path[len(slug) + 1:]
+    return path
+
+
+# Rendering
+
+def _next_data_script(page_props: Dict, page: str, query: Dict, build_id: str) -> str:
+    payload = {"props": {"pageProps": page_props}, "page": page, "query": query, "buildId": build_id}
+    text = json.dumps(payload, ensure_ascii=False).replace("</", "<\\/")
+    return f'<script id="__NEXT_DATA__" type="application/json">{text}</script>'
+
+
+def _category_link(category: Optional[str]) -> str:
+    if not category:
+        return ""
+    return f'<a id="info_segmento_hero" href="/segmentos/"><p>{escape(category)}</p></a>'
+
+
+def render_listing(slug: str, page: int, page_props: Dict, build_id: str, category: Optional[str], last_page: int) -> str:
+    """Listing page HTML: __NEXT_DATA__, category, complaint links and pagination"""
+    cards = "".join(
+        f'<div class="sc-1sm4sxr-0"><a href="/{slug}/{escape(complaint_path(slug, item.get("url", "")))}/">'
+        f'<h4>{escape(item.get("title", ""))}</h4></a><p>{escape(item.get("description", "")[:200])}</p></div>'
+        for item in listing_items(page_props) if item.get("url")
+    )
+    pagination = "".join(
+        f'<a href="/empresa/{slug}/lista-reclamacoes/?pagina={number}">{number}</a>'
+        for number in range(1, last_page + 1)
+    )
+    if page < last_page:
+        pagination += f'<a aria-label="Próxima" href="/empresa/{slug}/lista-reclamacoes/?pagina={page + 1}">›</a>'
+    return (
+        f"<!DOCTYPE html><html><head><title>{escape(slug)} - Reclamações</title></head><body><main>"
+        f"{_category_link(category)}<section>{cards}</section><nav>{pagination}</nav></main>"
+        f"{_next_data_script(page_props, '/empresa/[shortname]/lista-reclamacoes', {'shortname': slug, 'pagina': str(page)}, build_id)}"
+        "</body></html>"
+    )
+
+
+def render_detail(slug: str, path: str, page_props: Dict, build_id: str, category: Optional[str]) -> str:
+    """Complaint page HTML: __NEXT_DATA__ plus the data-testid elements of the HTML parsers"""
+    complaint = page_props.get("complaint") or page_props.get("complaintDetail") or {}
+    location = " - ".join(part for part in (complaint.get("userCity"), complaint.get("userState")) if part)
+    interactions = "".join(
+        f'<div data-testid="{"complaint-interaction" if item.get("type") in ("ANSWER", "REPLY") else "complaint-evaluation-interaction"}">'
+        f'<span>{escape(item.get("type", ""))}</span><span>{escape(item.get("created", ""))}</span>'
+        f'<p>{escape(item.get("message", ""))}</p></div>'
+        for item in complaint.get("interactions") or []
+    )
+    return (
+        f"<!DOCTYPE html><html><head><title>{escape(complaint.get('title', ''))}</title></head><body><main>"
+        f"{_category_link(category)}"
+        f'<h1 data-testid="complaint-title">{escape(complaint.get("title", ""))}</h1>'
+        f'<span data-testid="complaint-author">{escape(complaint.get("userName", ""))}</span>'
+        f'<time datetime="{escape(complaint.get("created", ""))}">{escape(complaint.get("created", ""))}</time>'
+        f'<span data-testid="complaint-status">{escape(complaint.get("status", ""))}</span>'
+        f'<span data-testid="complaint-location">{escape(location)}</span>'
+        f'<p data-testid="complaint-description">{escape(complaint.get("description", ""))}</p>'
+        f"{interactions}</main>"
+        f"{_next_data_script(page_props, '/[shortname]/[complaint]', {'shortname': slug, 'complaint': path}, build_id)}"
+        "</body></html>"
+    )
+
+
+# Server
+
+class ReplayServer:
+    """
+    Threaded HTTP server replaying a FixtureStore on localhost
+
+    Usable as a context manager; counts what it served in `stats`.
+    """
+
+    def __init__(
+        self,
+        fixtures_dir,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        challenge_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            fixtures_dir: FixtureStore directory
+            port: 0 picks a free port (see .url)
+            latency: Seconds added before every response
+            challenge_rate: Share of requests (0-1) answered with a challenge page
+            seed: Seed of the challenge draws, for reproducible runs
+        """
+        self.store = FixtureStore(fixtures_dir)
+        self.latency = latency
+        self.challenge_rate = challenge_rate
+        self._random = random.Random(seed)
+        self._stats = {
+            "listing_html": 0, "detail_html": 0, "listing_json": 0, "detail_json": 0,
+            "challenges": 0, "not_found": 0,
+        }
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def company_url(self, slug: str) -> str:
+        return f"{self.url}/empresa/{slug}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Replaying {self.store.directory} on {self.url}")
+        return self
+
+    def serve_forever(self):
+        logger.info(f"Replaying {self.store.directory} on {self.url}")
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _challenged(self) -> bool:
+        if self.challenge_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.challenge_rate
+
+    def respond(self, path: str, query: Dict[str, List[str]]):
+        """(status, content type, body) of a request"""
+        if self.latency > 0:
+            time.sleep(self.latency)
+        if self._challenged():
+            self._count("challenges")
+            return 403, "text/html; charset=utf-8", CHALLENGE_HTML
+
+        store = self.store
+        page = int((query.get("pagina") or ["1"])[0] or 1)
+
+        match = _LISTING_JSON.match(path)
+        if match:
+            build_id, slug = match.groups()
+            if build_id != store.build_id:
+                return self._not_found()
+            self._count("listing_json")
+            return 200, "application/json", json.dumps({"pageProps": store.listing(slug, page) or {}, "__N_SSP": True})
+
+        match = _DETAIL_JSON.match(path)
+        if match:
+            build_id, slug, path_segment = match.groups()
+            page_props = store.detail(slug, path_segment) if build_id == store.build_id else None
+            if page_props is None:
+                return self._not_found()
+            self._count("detail_json")
+            return 200, "application/json", json.dumps({"pageProps": page_props, "__N_SSP": True})
+
+        match = _LISTING_PATH.match(path)
+        if match:
+            slug = match.group(1)
+            self._count("listing_html")
+            # Past the last recorded page the listing is empty, like past the end on the site
+            page_props = store.listing(slug, page) or {"complaints": {"LAST": []}}
+            return 200, "text/html; charset=utf-8", render_listing(
+                slug, page, page_props, store.build_id, store.category, store.last_page(slug)
+            )
+
+        match = _DETAIL_PATH.match(path)
+        if match:
+            slug, path_segment = match.groups()
+            page_props = store.detail(slug, path_segment)
+            if page_props is None:
+                return self._not_found()
+            self._count("detail_html")
+            return 200, "text/html; charset=utf-8", render_detail(slug, path_segment, page_props, store.build_id, store.category)
+
+        return self._not_found()
+
+    def _not_found(self):
+        self._count("not_found")
+        return 404, "text/html; charset=utf-8", "<html><body>404</body></html>"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the site
+            disable_nagle_algorithm = True  # headers and body go out separately
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                try:
+                    status, content_type, body = server.respond(unquote(parsed.path), parse_qs(parsed.query))
+                except Exception as e:
+                    logger.error(f"Replay error for {self.path}: {e}")
+                    status, content_type, body = 500, "text/plain", str(e)
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(f"replay: {format % args}")
+
+        return Handler
+
+
+# Fixtures
+
+def synthesize_fixtures(
+    directory,
+    slugs: List[str],
+    pages: int = 10,
+    per_page: int = 10,
+    with_details: bool = True,
+    seed: int = 0
+) -> FixtureStore:
+    """
+    Write made-up pages in the site's shape (for runs without recorded pages)
+
+    Complaint ids are unique per slug and stable for a seed, so repeated
+    runs see the same complaints.
+    """
+    rng = random.Random(seed)
+    store = FixtureStore(directory)
+    store.save_meta(DEFAULT_BUILD_ID, DEFAULT_CATEGORY)
+    statuses = ["SOLVED", "REPLIED", "NOT_REPLIED", "NOT_SOLVED", "EVALUATED"]
+    words = ["entrega", "atraso", "pedido", "reembolso", "atendimento", "produto", "cobrança", "cancelamento"]
+    states = [("Rio de Janeiro", "RJ"), ("Niterói", "RJ"), ("São Paulo", "SP"), ("Belo Horizonte", "MG")]
+    started = datetime(2025, 11, 1, 12, 0)
+
+    for slug in slugs:
+        for page in range(1, pages + 1):
+            items = []
+            for position in range(per_page):
+                number = (page - 1) * per_page + position
+                external_id = f"{slug[:4].upper()}{seed}x{number:06d}"
+                title = f"Problema com {rng.choice(words)} e {rng.choice(words)}"
+                path = f"{re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')}_{external_id}"
+                created = (started - timedelta(hours=number * 7)).isoformat()
+                city, state = rng.choice(states)
+                description = " ".join(rng.choice(words) for _ in range(60)).capitalize() + "."
+                status = rng.choice(statuses)
+                items.append({
+                    "id": external_id, "title": title, "description": description[:300],
+                    "userName": f"Consumidor {number}", "created": created, "status": status,
+                    "userState": state, "url": path, "dealAgain": rng.choice([True, False, None]),
+                })
+                if with_details:
+                    interactions = []
+                    if status != "NOT_REPLIED":
+                        interactions.append({
+                            "type": "ANSWER", "message": "Olá, sentimos muito pelo ocorrido. Entraremos em contato.",
+                            "created": (started - timedelta(hours=number * 7 - 5)).isoformat(),
+                        })
+                    if status in ("SOLVED", "NOT_SOLVED", "EVALUATED"):
+                        interactions.append({
+                            "type": "FINAL_ANSWER", "message": "Problema resolvido após contato.",
+                            "created": (started - timedelta(hours=number * 7 - 30)).isoformat(),
+                        })
+                    store.save_detail(slug, path, {"complaint": {
+                        "id": external_id, "title": title, "description": description, "userName": f"Consumidor {number}",
+                        "created": created, "status": status, "userCity": city, "userState": state,
+                        "interactions": interactions,
+                    }})
+            store.save_listing(slug, page, {"complaints": {"LAST": items}})
+    return store
+
+
+def record_fixtures(scraper, directory, pages: int, with_details: bool = False) -> FixtureStore:
+    """
+    Record a company's pages from the site with an HttpReclameAquiScraper
+
+    The scraper clears the challenge as in a normal run; the page props of
+    its listing pages (and, with with_details, complaint pages) are saved
+    as they came.
+
+    Returns:
+        The FixtureStore written to
+    """
+    store = FixtureStore(directory)
+    slug = scraper.company_slug
+    company_path = scraper._company_path
+    try:
+        first_page_props = scraper._solve_challenge(1)
+        store.save_meta(scraper.build_id, scraper.page_category)
+        for page in range(1, pages + 1):
+            page_props = first_page_props if page == 1 else scraper._fetch_page_props(
+                f"{company_path}/lista-reclamacoes", {'pagina': page}, page
+            )
+            items = listing_items(page_props)
+            if not items:
+                logger.info(f"No complaints on page {page}, stopping")
+                break
+            store.save_listing(slug, page, page_props)
+            logger.info(f"Recorded listing page {page} ({len(items)} complaints)")
+            if with_details:
+                for item in items:
+                    if item.get("url"):
+                        path = complaint_path(slug, item["url"])
+                        store.save_detail(slug, path, scraper._fetch_page_props(scraper._detail_path(path), page=page))
+    finally:
+        if scraper._session:
+            scraper._session.close()
+            scraper._session = None
+    return store
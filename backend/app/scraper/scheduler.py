@@ -3,9 +3,11 @@ Scheduler for automated scraping of Reclame Aqui
 """
 from apscheduler.schedulers.background import BackgroundScheduler
 from app.scraper.reclame_aqui_scraper import ReclameAquiScraper
+from app.scraper.http_scraper import HttpReclameAquiScraper
+from app.scraper import multi_company
 from app.core.database import SessionLocal
-from app.db import crud
 from app.core.config import settings
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,76 +16,75 @@ logger = logging.getLogger(__name__)
 scheduler = BackgroundScheduler()
 
 
-def scrape_job():
+def build_scraper(company_url: Optional[str] = None, max_pages: Optional[int] = None) -> ReclameAquiScraper:
+    """Scraper for the configured backend (SCRAPER_BACKEND), by default for our company page"""
+    company_url = company_url or settings.RECLAME_AQUI_COMPANY_URL
+    max_pages = max_pages or settings.SCRAPER_MAX_PAGES
+    if settings.SCRAPER_BACKEND == "http":
+        return HttpReclameAquiScraper(
+            company_url=company_url,
+            max_pages=max_pages,
+            delay_min=settings.SCRAPER_DELAY_MIN,
+            delay_max=settings.SCRAPER_DELAY_MAX,
+            max_workers=settings.SCRAPER_HTTP_WORKERS,
+            fetch_details=settings.SCRAPER_FETCH_DETAILS,
+            requests_per_minute=settings.SCRAPER_REQUESTS_PER_MINUTE,
+            min_delay=settings.SCRAPER_DELAY_FLOOR,
+            max_delay=settings.SCRAPER_BACKOFF_MAX_SECONDS
+        )
+    if settings.SCRAPER_BACKEND != "selenium":
+        raise ValueError(f"Unknown SCRAPER_BACKEND: {settings.SCRAPER_BACKEND}")
+    return ReclameAquiScraper(
+        company_url=company_url,
+        max_pages=max_pages,
+        delay_min=settings.SCRAPER_DELAY_MIN,
+        delay_max=settings.SCRAPER_DELAY_MAX,
+        max_workers=settings.SCRAPER_BROWSER_POOL_SIZE,
+        fetch_details=settings.SCRAPER_FETCH_DETAILS,
+        browser_recycle_pages=settings.SCRAPER_BROWSER_RECYCLE_PAGES,
+        requests_per_minute=settings.SCRAPER_REQUESTS_PER_MINUTE,
+        min_delay=settings.SCRAPER_DELAY_FLOOR,
+        max_delay=settings.SCRAPER_BACKOFF_MAX_SECONDS
+    )
+
+
+def scrape_job(full: bool = False):
     """
     Job that runs periodically to scrape new complaints
+
+    Crawls our company page and, with SCRAPER_CRAWL_COMPETITORS, every
+    competitor's page concurrently (multi_company.crawl_all).
+
+    Args:
+        full: Re-crawl every page instead of stopping at already known complaints
     """
     logger.info("=" * 60)
     logger.info("Starting scheduled scraping job")
     logger.info("=" * 60)
 
-    db = None
-
     try:
-        # Initialize scraper
-        scraper = ReclameAquiScraper(
-            company_url=settings.RECLAME_AQUI_COMPANY_URL,
-            max_pages=settings.SCRAPER_MAX_PAGES,
-            delay_min=settings.SCRAPER_DELAY_MIN,
-            delay_max=settings.SCRAPER_DELAY_MAX
-        )
-
-        # Scrape complaints
-        logger.info(f"Scraping up to {settings.SCRAPER_MAX_PAGES} pages from {settings.RECLAME_AQUI_COMPANY_URL}")
-        complaints = scraper.scrape_complaints(save_debug=False)
-
-        if not complaints:
-            logger.warning("No complaints collected in this run")
-            return
-
-        logger.info(f"Collected {len(complaints)} complaints from scraper")
-
-        # Save to database
-        db = SessionLocal()
-
-        # Filter out duplicates (check by external_id if available)
-        new_complaints = []
-        duplicate_count = 0
-
-        for complaint in complaints:
-            external_id = complaint.get('external_id')
-
-            if external_id:
-                # Check if already exists
-                existing = crud.get_complaint_by_external_id(db, external_id)
-                if existing:
-                    duplicate_count += 1
-                    continue
-
-            new_complaints.append(complaint)
-
-        if new_complaints:
-            count = crud.bulk_create_complaints(db, new_complaints)
-            logger.info(f"Saved {count} new complaints to database")
-        else:
-            logger.info("No new complaints to save (all duplicates)")
-
-        if duplicate_count > 0:
-            logger.info(f"Skipped {duplicate_count} duplicate complaints")
-
-        # Report errors
-        if scraper.get_errors():
-            logger.warning(f"Scraping completed with {len(scraper.get_errors())} errors")
-            for error in scraper.get_errors()[:3]:
-                logger.warning(f"  - {error}")
+        with SessionLocal() as db:
+            targets = multi_company.crawl_targets(db, include_competitors=settings.SCRAPER_CRAWL_COMPETITORS)
+
+        # Scrape and save page by page: new complaints inserted, known ones refreshed
+        results = multi_company.crawl_all(build_scraper, targets, full=full)
+
+        for name, result in results.items():
+            if "error" in result:
+                logger.warning(f"{name}: crawl failed ({result['error']})")
+            elif not result["scraped"]:
+                logger.warning(f"{name}: no complaints collected in this run")
+            else:
+                logger.info(
+                    f"{name}: collected {result['scraped']} complaints from {result['pages_scraped']} pages: "
+                    f"saved {result.get('created', 0)} new complaints, refreshed {result.get('updated', 0)} "
+                    f"({result.get('changes', 0)} field changes logged), {result.get('unchanged', 0)} unchanged, "
+                    f"{result['scrape_errors']} scraping errors"
+                )
 
     except Exception as e:
         logger.error(f"Error in scraping job: {e}", exc_info=True)
 
-    finally:
-        if db:
-            db.close()
-
     logger.info("Scheduled scraping job completed")
     logger.info("=" * 60)
 
@@ -119,9 +120,9 @@ def stop_scheduler():
         logger.info("Scheduler stopped")
 
 
-def run_now():
+def run_now(full: bool = False):
     """
     Trigger scraping job immediately (for manual triggering)
     """
-    logger.info("Manual scraping triggered")
-    scrape_job()
+    logger.info(f"Manual {'full' if full else 'incremental'} scraping triggered")
+    scrape_job(full=full)
@@ -0,0 +1,170 @@
+"""
+Condition-based waits for the Selenium scraper
+
+Instead of fixed time.sleep() calls around navigation, scrolling and
+hydration, every wait polls a readiness predicate (document ready,
+__NEXT_DATA__ present, challenge gone, URL switched to the target page)
+and returns as soon as it holds, bounded by a per-step timeout.
+
+Each wait is recorded in a WaitStats histogram by step name, so a run can
+report how long the scraper actually spent waiting and where.
+"""
+from typing import Callable, Dict, Optional
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import JavascriptException, NoSuchElementException, TimeoutException
+import bisect
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the histogram buckets; the last bucket is open
+BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30)
+
+# Default timeout (seconds) per step
+TIMEOUTS = {
+    "page_load": 30,  # <body> present after driver.get()
+    "cloudflare": 30,  # challenge page gone
+    "document_ready": 10,  # document.readyState == 'complete'
+    "next_data": 15,  # <script id="__NEXT_DATA__"> present
+    "navigation": 15,  # URL switched to the target listing page
+    "listing": 10,  # complaint links rendered (HTML fallback)
+}
+
+POLL_FREQUENCY = 0.1
+
+
+class WaitStats:
+    """Thread-safe histogram of wait durations per step"""
+
+    def __init__(self):
+        self._steps: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, step: str, seconds: float, timed_out: bool = False):
+        with self._lock:
+            stats = self._steps.setdefault(step, {
+                "count": 0, "total": 0.0, "max": 0.0, "timeouts": 0, "buckets": [0] * (len(BUCKETS) + 1)
+            })
+            stats["count"] += 1
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            stats["timeouts"] += int(timed_out)
+            stats["buckets"][bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per step: count, total/avg/max seconds, timeouts and the bucket counts ("<=0.5s": n, ...)"""
+        labels = [f"<={bound}s" for bound in BUCKETS] + [f">{BUCKETS[-1]}s"]
+        with self._lock:
+            return {
+                step: {
+                    "count": stats["count"],
+                    "total_seconds": round(stats["total"], 2),
+                    "avg_seconds": round(stats["total"] / stats["count"], 3) if stats["count"] else 0.0,
+                    "max_seconds": round(stats["max"], 2),
+                    "timeouts": stats["timeouts"],
+                    "histogram": {label: n for label, n in zip(labels, stats["buckets"]) if n},
+                }
+                for step, stats in self._steps.items()
+            }
+
+    def total_seconds(self) -> float:
+        with self._lock:
+            return sum(stats["total"] for stats in self._steps.values())
+
+    def log_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        logger.info(f"Time spent waiting: {self.total_seconds():.1f}s")
+        for step, stats in sorted(summary.items(), key=lambda item: -item[1]["total_seconds"]):
+            logger.info(
+                f"  {step}: {stats['count']} waits, {stats['total_seconds']}s total, "
+                f"avg {stats['avg_seconds']}s, max {stats['max_seconds']}s, "
+                f"{stats['timeouts']} timeouts, {stats['histogram']}"
+            )
+
+
+def wait_until(
+    driver,
+    predicate: Callable,
+    step: str,
+    stats: Optional[WaitStats] = None,
+    timeout: Optional[float] = None,
+    required: bool = False
+) -> bool:
+    """
+    Poll predicate(driver) until it is truthy or the step times out
+
+    Args:
+        driver: Selenium driver
+        predicate: Readiness check, e.g. next_data_present
+        step: Step name (histogram key and default timeout from TIMEOUTS)
+        stats: Histogram to record the wait in
+        timeout: Overrides TIMEOUTS[step]
+        required: Raise instead of returning False on timeout
+
+    Returns:
+        True when the predicate held, False on timeout
+
+    Raises:
+        TimeoutException: Se required=True e a condição não for atendida a tempo
+    """
+    timeout = timeout if timeout is not None else TIMEOUTS.get(step, 10)
+    started = time.monotonic()
+    try:
+        WebDriverWait(
+            driver, timeout, poll_frequency=POLL_FREQUENCY,
+            ignored_exceptions=(JavascriptException, NoSuchElementException)  # page swapped mid-probe
+        ).until(predicate)
+        ok = True
+    except TimeoutException:
+        ok = False
+    elapsed = time.monotonic() - started
+
+    if stats:
+        stats.record(step, elapsed, timed_out=not ok)
+    if not ok:
+        logger.warning(f"Wait '{step}' timed out after {timeout}s")
+        if required:
+            raise TimeoutException(f"Wait '{step}' timed out after {timeout}s")
+    return ok
+
+
+# Predicates (cheap JavaScript probes instead of reading page_source)
+
+def body_present(driver) -> bool:
+    return bool(driver.execute_script("return !!document.body"))
+
+
+def document_ready(driver) -> bool:
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def next_data_present(driver) -> bool:
+    return bool(driver.execute_script("return !!document.getElementById('__NEXT_DATA__')"))
+
+
+def challenge_cleared(driver) -> bool:
+    """No Cloudflare interstitial ("Just a moment...", "Verify you are human")"""
+    text = driver.execute_script(
+        "return (document.title + ' ' + (document.body ? document.body.innerText.slice(0, 2000) : '')).toLowerCase()"
+    ) or ""
+    return not ("just a moment" in text or "verify you are human" in text)
+
+
+def url_contains(fragment: str) -> Callable:
+    return lambda driver: fragment in (driver.current_url or "")
+
+
+def selector_present(css_selector: str) -> Callable:
+    return lambda driver: bool(driver.execute_script("return !!document.querySelector(arguments[0])", css_selector))
+
+
+def any_of(*predicates: Callable) -> Callable:
+    return lambda driver: any(predicate(driver) for predicate in predicates)
+
+
+def all_of(*predicates: Callable) -> Callable:
+    return lambda driver: all(predicate(driver) for predicate in predicates)
@@ -7,30 +7,50 @@ from app.ai.entity_extractor import EntityExtractor
 from app.ai.urgency_scorer import UrgencyScorer
 from app.ai.store_type_classifier import StoreTypeClassifier
 from app.ai.smart_tagger import SmartTagger
-from app.db.crud import update_complaint_analysis, get_complaint
-from app.db.models import Complaint
+from app.ai.fused_analyzer import FusedAnalyzer
+from app.core.config import settings
+from app.db.crud import (
+    update_complaint_analysis, get_complaint, create_job, add_job_items, finish_job, reset_job_progress,
+    count_unanalyzed, get_unanalyzed_batch
+)
+from app.services.job_queue import JobCancelled, is_cancel_requested
+from app.db.models import Complaint, Job
 from sqlalchemy.orm import Session
-from typing import Dict, Optional
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Stages that call Gemini and do not depend on each other
+LLM_STAGES = ("sentiment", "classification", "entities", "store_type", "tags")
+
 
 class AnalysisService:
     """Complete analysis pipeline for complaints"""
 
-    def __init__(self):
+    def __init__(self, mode: Optional[str] = None, stage_timeout: Optional[float] = None):
         self.sentiment_analyzer = SentimentAnalyzer()
         self.classifier = Classifier()
         self.entity_extractor = EntityExtractor()
         self.urgency_scorer = UrgencyScorer()
         self.store_type_classifier = StoreTypeClassifier()
         self.smart_tagger = SmartTagger()
+        self.fused_analyzer = FusedAnalyzer()
+        self.mode = mode or settings.ANALYSIS_MODE
+        self.stage_timeout = stage_timeout if stage_timeout is not None else settings.ANALYSIS_STAGE_TIMEOUT_SECONDS
 
     async def analyze_complaint(self, db: Session, complaint_id: int) -> Dict:
         """
         Pipeline completo de anÃ¡lise de uma reclamaÃ§Ã£o
 
+        In "concurrent" mode the independent Gemini stages run at the same
+        time and urgency only waits for sentiment. A stage that fails or
+        times out does not block the others: whatever succeeded is saved
+        and the result is marked as "partial". In "fused" mode a single
+        prompt answers every stage and only the fields that fail
+        validation are re-run through their own analyzers.
+
         Args:
             db: Database session
             complaint_id: ID da reclamaÃ§Ã£o
@@ -47,117 +67,292 @@ class AnalysisService:
         if not complaint:
             raise ValueError(f"Complaint {complaint_id} not found")
 
-        logger.info(f"Starting analysis for complaint {complaint_id}")
+        results, errors = await self._analyze(complaint_id, complaint.title, complaint.text)
+
+        # Update database with whatever succeeded
+        logger.info(f"Updating database for complaint {complaint_id}")
+        update_complaint_analysis(db, complaint_id, **self._analysis_fields(results))
+
+        return {
+            "complaint_id": complaint_id,
+            "sentiment": results['sentiment'],
+            "classification": results['classification'],
+            "entities": results['entities'],
+            "urgency_score": results['urgency'],
+            "store_type": results['store_type'],
+            "tags": results['tags'],
+            "status": "partial" if errors else "completed",
+            "failed_stages": errors
+        }
+
+    async def _analyze(self, complaint_id: int, title: Optional[str], body: str) -> Tuple[Dict, Dict]:
+        """
+        Run the pipeline for one complaint without touching the database
+
+        Returns:
+            (results, errors) per stage
+
+        Raises:
+            Exception: Se todas as etapas falharem
+        """
+        logger.info(f"Starting {self.mode} analysis for complaint {complaint_id}")
 
         # Combine title and text for analysis
-        text = f"{complaint.title}\n\n{complaint.text}" if complaint.title else complaint.text
+        text = f"{title}\n\n{body}" if title else body
 
-        try:
-            # 1. Sentiment Analysis
-            logger.info(f"Analyzing sentiment for complaint {complaint_id}")
-            sentiment_result = await self.sentiment_analyzer.analyze(text)
-
-            # 2. Classification
-            logger.info(f"Classifying complaint {complaint_id}")
-            classification_result = await self.classifier.classify(text)
-
-            # 3. Entity Extraction
-            logger.info(f"Extracting entities from complaint {complaint_id}")
-            entities = await self.entity_extractor.extract(text)
-
-            # 4. Urgency Score
-            logger.info(f"Calculating urgency for complaint {complaint_id}")
-            urgency = self.urgency_scorer.calculate_score(
-                text,
-                sentiment_result['sentiment_score']
-            )
-
-            # 5. Store Type Classification (physical vs online)
-            logger.info(f"Classifying store type for complaint {complaint_id}")
-            store_type_result = await self.store_type_classifier.classify(text)
-
-            # 6. Smart Tags (middle distribution)
-            logger.info(f"Generating smart tags for complaint {complaint_id}")
-            tags_result = await self.smart_tagger.generate_tags(text, complaint.title)
-
-            # Update database
-            logger.info(f"Updating database for complaint {complaint_id}")
-            update_complaint_analysis(
-                db,
-                complaint_id,
-                sentiment=sentiment_result['sentiment'],
-                sentiment_score=sentiment_result['sentiment_score'],
-                classification=classification_result['categories'],
-                entities=entities,
-                urgency_score=urgency,
-                store_type=store_type_result['store_type'],
-                tags=tags_result['tags']
-            )
+        if self.mode == "sequential":
+            results, errors = await self._run_sequential(complaint_id, text, title)
+        elif self.mode == "fused":
+            results, errors = await self._run_fused(complaint_id, text, title)
+        else:
+            results, errors = await self._run_concurrent(complaint_id, text, title)
 
+        if errors and len(errors) == len(results):
+            raise Exception(f"All analysis stages failed: {errors}")
+
+        if errors:
+            logger.warning(f"Partial analysis for complaint {complaint_id}, failed stages: {list(errors)}")
+        else:
             logger.info(f"Analysis complete for complaint {complaint_id}")
 
-            return {
-                "complaint_id": complaint_id,
-                "sentiment": sentiment_result,
-                "classification": classification_result,
-                "entities": entities,
-                "urgency_score": urgency,
-                "store_type": store_type_result,
-                "tags": tags_result,
-                "status": "completed"
-            }
+        return results, errors
+
+    def _stage_calls(self, text: str, title: Optional[str], stages: Tuple[str, ...] = LLM_STAGES) -> Dict[str, Awaitable]:
+        """Build the Gemini-backed stage coroutines"""
+        factories = {
+            "sentiment": lambda: self.sentiment_analyzer.analyze(text),
+            "classification": lambda: self.classifier.classify(text),
+            "entities": lambda: self.entity_extractor.extract(text),
+            "store_type": lambda: self.store_type_classifier.classify(text),
+            "tags": lambda: self.smart_tagger.generate_tags(text, title),
+        }
+        return {name: factories[name]() for name in stages}
 
+    async def _run_stage(self, complaint_id: int, name: str, call: Awaitable) -> Tuple[Any, Optional[str]]:
+        """Run a single stage with its timeout, returning (result, error)"""
+        try:
+            return await asyncio.wait_for(call, timeout=self.stage_timeout), None
+        except asyncio.TimeoutError:
+            logger.error(f"Stage '{name}' timed out after {self.stage_timeout}s for complaint {complaint_id}")
+            return None, f"timeout after {self.stage_timeout}s"
         except Exception as e:
-            logger.error(f"Error analyzing complaint {complaint_id}: {e}")
-            raise
+            logger.error(f"Stage '{name}' failed for complaint {complaint_id}: {e}")
+            return None, str(e)
+
+    def _run_urgency(self, text: str, sentiment_result: Optional[Dict]) -> Tuple[Optional[float], Optional[str]]:
+        """Urgency is computed locally but needs the sentiment score"""
+        if not sentiment_result:
+            return None, "sentiment unavailable"
+        return self.urgency_scorer.calculate_score(text, sentiment_result['sentiment_score']), None
+
+    async def _run_sequential(self, complaint_id: int, text: str, title: Optional[str]) -> Tuple[Dict, Dict]:
+        """Await each stage one after another"""
+        results, errors = {}, {}
+        for name, call in self._stage_calls(text, title).items():
+            logger.info(f"Running stage '{name}' for complaint {complaint_id}")
+            results[name], error = await self._run_stage(complaint_id, name, call)
+            if error:
+                errors[name] = error
+
+        results['urgency'], error = self._run_urgency(text, results['sentiment'])
+        if error:
+            errors['urgency'] = error
+        return results, errors
+
+    async def _run_concurrent(
+        self,
+        complaint_id: int,
+        text: str,
+        title: Optional[str],
+        known: Optional[Dict] = None
+    ) -> Tuple[Dict, Dict]:
+        """Fan out independent stages; urgency waits only for sentiment
+
+        Stages already present in ``known`` are not run again.
+        """
+        results = dict(known or {})
+        pending = tuple(name for name in LLM_STAGES if results.get(name) is None)
+        tasks = {
+            name: asyncio.create_task(self._run_stage(complaint_id, name, call))
+            for name, call in self._stage_calls(text, title, pending).items()
+        }
+
+        errors = {}
+
+        if 'sentiment' in tasks:
+            results['sentiment'], error = await tasks.pop('sentiment')
+            if error:
+                errors['sentiment'] = error
+        results['urgency'], error = self._run_urgency(text, results['sentiment'])
+        if error:
+            errors['urgency'] = error
+
+        for name, task in tasks.items():
+            results[name], error = await task
+            if error:
+                errors[name] = error
+        return results, errors
+
+    async def _run_fused(self, complaint_id: int, text: str, title: Optional[str]) -> Tuple[Dict, Dict]:
+        """One fused prompt, then the separate analyzers for invalid fields"""
+        fused, error = await self._run_stage(complaint_id, 'fused', self.fused_analyzer.analyze(text))
+        known = fused or {}
+
+        fallback = [name for name in LLM_STAGES if known.get(name) is None]
+        if fallback:
+            reason = error or "invalid fused output"
+            logger.info(f"Falling back to separate analyzers for {fallback} on complaint {complaint_id} ({reason})")
+
+        return await self._run_concurrent(complaint_id, text, title, known=known)
+
+    def _analysis_fields(self, results: Dict) -> Dict:
+        """Map stage results to Complaint columns, skipping failed stages"""
+        fields = {}
+        if results.get('sentiment'):
+            fields['sentiment'] = results['sentiment']['sentiment']
+            fields['sentiment_score'] = results['sentiment']['sentiment_score']
+        if results.get('classification'):
+            fields['classification'] = results['classification']['categories']
+        if results.get('entities') is not None:
+            fields['entities'] = results['entities']
+        if results.get('urgency') is not None:
+            fields['urgency_score'] = results['urgency']
+        if results.get('store_type'):
+            fields['store_type'] = results['store_type']['store_type']
+        if results.get('tags'):
+            fields['tags'] = results['tags']['tags']
+            fields['primary_tag'] = results['tags'].get('primary_tag')
+        return fields
 
     async def analyze_batch(
         self,
         db: Session,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        job: Optional[Job] = None,
+        complaint_ids: Optional[List[int]] = None
     ) -> Dict:
         """
         Analisar mÃºltiplas reclamaÃ§Ãµes nÃ£o analisadas
 
+        Unanalyzed complaint IDs are read in chunks (keyset on id, so
+        complaints that fail are not picked up again in the same run). Each
+        chunk is analyzed with at most ``concurrency`` complaints in flight
+        and committed in a single transaction, together with the per-item
+        outcomes on the job record. Only aggregate counts are returned.
+
+        When ``job`` comes from the job queue its lifecycle belongs to the
+        worker: progress restarts from the complaints still unanalyzed (so a
+        re-run after a lost lease is safe), the cancel flag is checked
+        between chunks and the job is not marked as finished here.
+
         Args:
             db: Database session
             limit: NÃºmero mÃ¡ximo de reclamaÃ§Ãµes a analisar (None = todas)
+            concurrency: ReclamaÃ§Ãµes analisadas ao mesmo tempo
+            chunk_size: ReclamaÃ§Ãµes carregadas e gravadas por lote
+            job: Job record to report into (a new one is created if None)
+            complaint_ids: Restrict the batch to these complaints
 
         Returns:
             Dict com estatÃ­sticas da anÃ¡lise em lote
+
+        Raises:
+            JobCancelled: Se o job da fila for cancelado durante a execuÃ§Ã£o
         """
-        # Get unanalyzed complaints
-        query = db.query(Complaint).filter(Complaint.sentiment == None)
-        if limit:
-            query = query.limit(limit)
+        concurrency = concurrency or settings.ANALYSIS_BATCH_CONCURRENCY
+        chunk_size = chunk_size or settings.ANALYSIS_BATCH_CHUNK_SIZE
 
-        complaints = query.all()
-        total = len(complaints)
+        unanalyzed = count_unanalyzed(db, complaint_ids)
+        total = min(unanalyzed, limit) if limit else unanalyzed
 
-        logger.info(f"Starting batch analysis for {total} complaints")
+        owns_job = job is None
+        if owns_job:
+            params = {"limit": limit}
+            if complaint_ids is not None:
+                params["complaint_ids"] = list(complaint_ids)
+            job = create_job(db, "analyze_batch", params=params, total=total)
+        else:
+            reset_job_progress(db, job, total=total)
 
-        results = []
-        errors = []
+        logger.info(f"Starting batch analysis for {total} complaints (job {job.id}, concurrency {concurrency})")
 
-        for complaint in complaints:
-            try:
-                result = await self.analyze_complaint(db, complaint.id)
-                results.append(result)
-                logger.info(f"Successfully analyzed complaint {complaint.id}")
-            except Exception as e:
-                logger.error(f"Error analyzing complaint {complaint.id}: {e}")
-                errors.append({
-                    "complaint_id": complaint.id,
-                    "error": str(e)
-                })
+        semaphore = asyncio.Semaphore(concurrency)
+        partial = 0
+        last_id = 0
+
+        try:
+            while job.processed < total:
+                if not owns_job and is_cancel_requested(db, job):
+                    raise JobCancelled(f"Job {job.id} cancelled after {job.processed}/{total} complaints")
 
-        logger.info(f"Batch analysis complete: {len(results)}/{total} successful")
+                rows = get_unanalyzed_batch(
+                    db, after_id=last_id, limit=min(chunk_size, total - job.processed), complaint_ids=complaint_ids
+                )
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                outcomes = await asyncio.gather(*[
+                    self._analyze_bounded(semaphore, row.id, row.title, row.text)
+                    for row in rows
+                ])
+
+                items = []
+                for complaint_id, results, errors, error in outcomes:
+                    if error:
+                        items.append({"complaint_id": complaint_id, "status": "failed", "error": error})
+                        continue
+                    update_complaint_analysis(db, complaint_id, commit=False, **self._analysis_fields(results))
+                    status = "partial" if errors else "completed"
+                    partial += bool(errors)
+                    items.append({
+                        "complaint_id": complaint_id,
+                        "status": status,
+                        "error": "; ".join(f"{name}: {msg}" for name, msg in errors.items()) or None
+                    })
+
+                add_job_items(db, job, items)
+                db.commit()
+                logger.info(f"Batch job {job.id}: {job.processed}/{total} processed, {job.failed} failed")
+
+        except JobCancelled:
+            logger.info(f"Batch job {job.id} cancelled at {job.processed}/{total}")
+            raise
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Batch job {job.id} aborted: {e}")
+            if owns_job:
+                finish_job(db, job, status="failed", error=str(e))
+            raise
+
+        if owns_job:
+            finish_job(db, job)
+        logger.info(f"Batch analysis complete: {job.succeeded}/{job.processed} successful")
 
         return {
-            "total_processed": total,
-            "successful": len(results),
-            "failed": len(errors),
-            "success_rate": len(results) / total if total > 0 else 0,
-            "results": results,
-            "errors": errors
+            "job_id": job.id,
+            "total_processed": job.processed,
+            "successful": job.succeeded,
+            "partial": partial,
+            "failed": job.failed,
+            "success_rate": job.succeeded / job.processed if job.processed > 0 else 0
         }
+
+    async def _analyze_bounded(
+        self,
+        semaphore: asyncio.Semaphore,
+        complaint_id: int,
+        title: Optional[str],
+        body: str
+    ) -> Tuple[int, Optional[Dict], Optional[Dict], Optional[str]]:
+        """Analyze one complaint of a batch, returning (id, results, errors, error)"""
+        async with semaphore:
+            try:
+                results, errors = await self._analyze(complaint_id, title, body)
+                return complaint_id, results, errors, None
+            except Exception as e:
+                logger.error(f"Error analyzing complaint {complaint_id}: {e}")
+                return complaint_id, None, None, str(e)
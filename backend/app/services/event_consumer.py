@@ -0,0 +1,140 @@
+"""
+Event consumer - analyzes complaints as soon as their "created" events are committed
+"""
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.db import crud
+from app.db.outbox import wait_for_events, fetch_pending_events, mark_events_processed, notify_events
+from app.services.analysis_service import AnalysisService
+from datetime import datetime
+from typing import Dict, Optional
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisEventConsumer:
+    """
+    Consumes the complaint event outbox and runs batch analysis on it
+
+    After a wake-up the consumer waits a short window so a scraping burst
+    is analyzed as one batch. It then drains the outbox batch by batch and
+    reads the next batch only when the previous one is done. That gives
+    backpressure: ingestion never blocks, and unconsumed events wait in
+    the table, not in memory.
+
+    Events are marked processed after their batch runs, even if a complaint
+    failed. The failure is recorded on the batch job. If the whole batch
+    errors, the events stay pending and are retried.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        batch_window: Optional[float] = None,
+        poll_interval: Optional[float] = None
+    ):
+        self.batch_size = batch_size or settings.EVENT_BATCH_SIZE
+        self.batch_window = batch_window if batch_window is not None else settings.EVENT_BATCH_WINDOW_SECONDS
+        self.poll_interval = poll_interval or settings.EVENT_POLL_SECONDS
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Metrics
+        self.events_consumed = 0
+        self.batches = 0
+        self.last_lag_seconds: Optional[float] = None
+
+    def start(self):
+        """Run the consumer loop in a daemon thread"""
+        self._thread = threading.Thread(target=self.run_forever, name="event-consumer", daemon=True)
+        self._thread.start()
+        logger.info("Analysis event consumer started")
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        notify_events()
+        if self._thread:
+            self._thread.join(timeout)
+        logger.info("Analysis event consumer stopped")
+
+    def run_forever(self):
+        """Drain the outbox, then sleep until notified (or the poll interval)"""
+        while not self._stop.is_set():
+            try:
+                self.drain()
+            except Exception as e:
+                logger.error(f"Event consumer error: {e}")
+
+            if wait_for_events(self.poll_interval) and self.batch_window:
+                # Let the rest of the burst arrive
+                self._stop.wait(self.batch_window)
+
+    def drain(self) -> int:
+        """Process pending events until the outbox is empty; returns events consumed"""
+        consumed = 0
+        db = SessionLocal()
+        service = AnalysisService()
+        try:
+            while not self._stop.is_set():
+                events = fetch_pending_events(db, self.batch_size)
+                if not events:
+                    break
+
+                event_ids = [e.id for e in events]
+                complaint_ids = list(dict.fromkeys(e.complaint_id for e in events))
+                oldest = events[0].created_at
+
+                # "updated" events of analyzed complaints need no job
+                result = None
+                if crud.count_unanalyzed(db, complaint_ids):
+                    result = asyncio.run(service.analyze_batch(db, complaint_ids=complaint_ids))
+                mark_events_processed(db, event_ids)
+
+                consumed += len(event_ids)
+                self.events_consumed += len(event_ids)
+                self.batches += 1
+                if oldest:
+                    self.last_lag_seconds = (datetime.now() - oldest).total_seconds()
+
+                if result is None:
+                    logger.info(
+                        f"Consumed {len(event_ids)} events: nothing to analyze (lag {self.last_lag_seconds or 0:.1f}s)"
+                    )
+                    continue
+                logger.info(
+                    f"Consumed {len(event_ids)} events: {result['successful']} analyzed, "
+                    f"{result['failed']} failed (job {result['job_id']}, lag {self.last_lag_seconds or 0:.1f}s)"
+                )
+        finally:
+            db.close()
+        return consumed
+
+    def get_stats(self) -> Dict:
+        return {
+            "events_consumed": self.events_consumed,
+            "batches": self.batches,
+            "last_lag_seconds": self.last_lag_seconds,
+        }
+
+
+# Consumer running inside the API process
+consumer: Optional[AnalysisEventConsumer] = None
+
+
+def start_event_consumer():
+    """Start the in-process consumer (if enabled)"""
+    global consumer
+    if not settings.EVENT_CONSUMER_ENABLED:
+        logger.info("In-process analysis event consumer disabled")
+        return
+    consumer = AnalysisEventConsumer()
+    consumer.start()
+
+
+def stop_event_consumer():
+    """Stop the in-process consumer"""
+    if consumer:
+        consumer.stop()
@@ -0,0 +1,289 @@
+"""
+Job queue - DB-backed queue for analysis and response generation jobs
+
+Jobs are claimed with a lease. A worker that dies stops renewing its lease
+and the job becomes claimable again once the lease expires, so every job
+runs at least once (handlers must be safe to re-run).
+
+A failed job is requeued with an exponential backoff (available_at), so a
+job failing on a persistent error such as a Gemini quota does not burn
+through its attempts in seconds.
+"""
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import Job, JobItem
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = ("analyze_batch", "analyze_complaint", "generate_response")
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# Set on enqueue so an in-process worker picks the job up without waiting
+# for its next poll
+_wakeup = threading.Event()
+
+
+class JobCancelled(Exception):
+    """Raised by a handler when its job was cancelled while running"""
+
+
+def enqueue_job(
+    db: Session,
+    job_type: str,
+    params: Optional[Dict] = None,
+    max_attempts: Optional[int] = None
+) -> Job:
+    """
+    Add a job to the queue
+
+    Raises:
+        ValueError: Se o tipo de job for desconhecido
+    """
+    if job_type not in JOB_TYPES:
+        raise ValueError(f"Unknown job type '{job_type}'")
+
+    job = Job(
+        job_type=job_type,
+        status="queued",
+        params=params or {},
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    logger.info(f"Enqueued job {job.id} ({job_type})")
+    _wakeup.set()
+    return job
+
+
+def wait_for_jobs(timeout: float) -> bool:
+    """Block until a job is enqueued in this process or the timeout expires"""
+    woken = _wakeup.wait(timeout)
+    _wakeup.clear()
+    return woken
+
+
+def _claimable(now: datetime):
+    """Queued jobs past their retry backoff plus running jobs whose lease has expired"""
+    return or_(
+        and_(Job.status == "queued", or_(Job.available_at.is_(None), Job.available_at <= now)),
+        and_(Job.status == "running", Job.lease_expires_at < now)
+    )
+
+
+def claim_next_job(db: Session, worker_id: str, lease_seconds: float) -> Optional[Job]:
+    """
+    Atomically take the oldest claimable job
+
+    The claim is a conditional UPDATE, so two workers racing for the same
+    job cannot both win it.
+    """
+    now = datetime.now()
+    candidates = (
+        db.query(Job.id)
+        .filter(_claimable(now))
+        .order_by(Job.id)
+        .limit(10)
+        .all()
+    )
+
+    for (job_id,) in candidates:
+        claimed = (
+            db.query(Job)
+            .filter(Job.id == job_id, _claimable(now))
+            .update({
+                Job.status: "running",
+                Job.worker_id: worker_id,
+                Job.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                Job.attempts: Job.attempts + 1,
+                Job.started_at: now,
+                Job.finished_at: None
+            }, synchronize_session=False)
+        )
+        db.commit()
+        if not claimed:
+            continue
+
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if job.attempts > job.max_attempts:
+            logger.error(f"Job {job.id} exceeded {job.max_attempts} attempts, marking as failed")
+            _finish(db, job, "failed", error=job.error or "lease expired too many times")
+            continue
+        if job.cancel_requested:
+            _finish(db, job, "cancelled")
+            continue
+
+        logger.info(f"Worker {worker_id} claimed job {job.id} ({job.job_type}, attempt {job.attempts})")
+        return job
+
+    return None
+
+
+def renew_lease(db: Session, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+    """Extend the lease of a running job; False if the worker lost it"""
+    renewed = (
+        db.query(Job)
+        .filter(Job.id == job_id, Job.worker_id == worker_id, Job.status == "running")
+        .update({Job.lease_expires_at: datetime.now() + timedelta(seconds=lease_seconds)},
+                synchronize_session=False)
+    )
+    db.commit()
+    return bool(renewed)
+
+
+def _finish(db: Session, job: Job, status: str, error: Optional[str] = None, result: Optional[Dict] = None) -> Job:
+    job.status = status
+    job.error = error
+    if result is not None:
+        job.result = result
+    job.lease_expires_at = None
+    job.finished_at = datetime.now()
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def complete_job(db: Session, job: Job, result: Optional[Dict] = None) -> Job:
+    """Mark a job as completed with its result"""
+    return _finish(db, job, "completed", result=result)
+
+
+def mark_cancelled(db: Session, job: Job, reason: Optional[str] = None) -> Job:
+    """Mark a running job as cancelled once its handler stopped"""
+    return _finish(db, job, "cancelled", error=reason)
+
+
+def fail_job(db: Session, job: Job, error: str) -> Job:
+    """Requeue a failed job after a backoff, or mark it failed once it ran out of attempts"""
+    if job.attempts < job.max_attempts and not job.cancel_requested:
+        delay = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** max(job.attempts - 1, 0)
+        job.status = "queued"
+        job.error = error
+        job.lease_expires_at = None
+        job.worker_id = None
+        job.available_at = datetime.now() + timedelta(seconds=delay)
+        db.commit()
+        logger.warning(
+            f"Job {job.id} failed (attempt {job.attempts}/{job.max_attempts}), retrying in {delay:.0f}s: {error}"
+        )
+        return job
+
+    logger.error(f"Job {job.id} failed after {job.attempts} attempts: {error}")
+    return _finish(db, job, "failed", error=error)
+
+
+def cancel_job(db: Session, job: Job) -> Job:
+    """
+    Cancel a job
+
+    Queued jobs are cancelled right away. Running jobs are flagged and
+    stop at the handler's next checkpoint.
+
+    Raises:
+        ValueError: Se o job já tiver terminado
+    """
+    if job.status in FINISHED_STATUSES:
+        raise ValueError(f"Job {job.id} is already {job.status}")
+
+    job.cancel_requested = True
+    if job.status == "queued":
+        return _finish(db, job, "cancelled")
+
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def retry_job(db: Session, job: Job) -> Job:
+    """
+    Put a failed or cancelled job back in the queue
+
+    Raises:
+        ValueError: Se o job não estiver em failed/cancelled
+    """
+    if job.status not in ("failed", "cancelled"):
+        raise ValueError(f"Only failed or cancelled jobs can be retried (job {job.id} is {job.status})")
+
+    job.status = "queued"
+    job.attempts = 0
+    job.cancel_requested = False
+    job.error = None
+    job.worker_id = None
+    job.lease_expires_at = None
+    job.available_at = None
+    job.finished_at = None
+    db.commit()
+    db.refresh(job)
+
+    _wakeup.set()
+    return job
+
+
+def is_cancel_requested(db: Session, job: Job) -> bool:
+    """Re-read the cancel flag of a running job"""
+    db.refresh(job, attribute_names=["cancel_requested"])
+    return bool(job.cancel_requested)
+
+
+def list_jobs(
+    db: Session,
+    status: Optional[str] = None,
+    job_type: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50
+) -> List[Job]:
+    """List jobs, newest first"""
+    query = db.query(Job)
+    if status:
+        query = query.filter(Job.status == status)
+    if job_type:
+        query = query.filter(Job.job_type == job_type)
+    return query.order_by(Job.id.desc()).offset(skip).limit(limit).all()
+
+
+def get_job_items(
+    db: Session,
+    job_id: int,
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[JobItem]:
+    """Per-item outcomes of a job"""
+    query = db.query(JobItem).filter(JobItem.job_id == job_id)
+    if status:
+        query = query.filter(JobItem.status == status)
+    return query.order_by(JobItem.id).offset(skip).limit(limit).all()
+
+
+def job_to_dict(job: Job) -> Dict:
+    """Serialize a job with its progress"""
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "params": job.params,
+        "result": job.result,
+        "error": job.error,
+        "progress": {
+            "total": job.total or 0,
+            "processed": job.processed or 0,
+            "succeeded": job.succeeded or 0,
+            "failed": job.failed or 0,
+            "percent": round(100 * job.processed / job.total, 1) if job.total else None
+        },
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "worker_id": job.worker_id,
+        "lease_expires_at": job.lease_expires_at,
+        "available_at": job.available_at,
+        "cancel_requested": bool(job.cancel_requested),
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
@@ -0,0 +1,157 @@
+"""
+Job worker - executes queued jobs, in the API process or standalone
+"""
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.db.models import Job
+from app.services.analysis_service import AnalysisService
+from app.services.response_service import ResponseService
+from app.services.job_queue import (
+    JobCancelled, claim_next_job, renew_lease, complete_job, fail_job,
+    mark_cancelled, wait_for_jobs
+)
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import os
+import socket
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def _handle_analyze_batch(db: Session, job: Job) -> Dict:
+    params = job.params or {}
+    return await AnalysisService().analyze_batch(
+        db, limit=params.get("limit"), job=job, complaint_ids=params.get("complaint_ids")
+    )
+
+
+async def _handle_analyze_complaint(db: Session, job: Job) -> Dict:
+    result = await AnalysisService().analyze_complaint(db, job.params["complaint_id"])
+    return jsonable_encoder(result)
+
+
+async def _handle_generate_response(db: Session, job: Job) -> Dict:
+    result = await ResponseService().generate_and_save_response(db, job.params["complaint_id"])
+    return jsonable_encoder(result)
+
+
+JOB_HANDLERS: Dict[str, Callable[[Session, Job], Awaitable[Dict]]] = {
+    "analyze_batch": _handle_analyze_batch,
+    "analyze_complaint": _handle_analyze_complaint,
+    "generate_response": _handle_generate_response,
+}
+
+
+class JobWorker:
+    """
+    Claims jobs from the queue and runs them one at a time
+
+    While a job runs, a heartbeat thread keeps renewing its lease. If the
+    process dies the lease expires and another worker picks the job up.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[float] = None
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.poll_interval = poll_interval or settings.JOB_WORKER_POLL_SECONDS
+        self.lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Run the worker loop in a daemon thread"""
+        self._thread = threading.Thread(target=self.run_forever, name="job-worker", daemon=True)
+        self._thread.start()
+        logger.info(f"Job worker {self.worker_id} started")
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    def run_forever(self):
+        """Process jobs until stop() is called"""
+        while not self._stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                logger.error(f"Job worker {self.worker_id} error: {e}")
+            wait_for_jobs(self.poll_interval)
+
+    def run_once(self) -> bool:
+        """Claim and run a single job; False if the queue was empty"""
+        db = SessionLocal()
+        try:
+            job = claim_next_job(db, self.worker_id, self.lease_seconds)
+            if not job:
+                return False
+            self._execute(db, job)
+            return True
+        finally:
+            db.close()
+
+    def _execute(self, db: Session, job: Job):
+        handler = JOB_HANDLERS[job.job_type]
+        heartbeat_stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job.id, heartbeat_stop), name=f"job-{job.id}-lease", daemon=True
+        )
+        heartbeat.start()
+
+        try:
+            result = asyncio.run(handler(db, job))
+            complete_job(db, job, result)
+            logger.info(f"Job {job.id} ({job.job_type}) completed")
+        except JobCancelled as e:
+            db.rollback()
+            mark_cancelled(db, job, str(e))
+            logger.info(f"Job {job.id} cancelled")
+        except Exception as e:
+            db.rollback()
+            fail_job(db, job, str(e))
+        finally:
+            heartbeat_stop.set()
+            heartbeat.join()
+
+    def _heartbeat(self, job_id: int, stop: threading.Event):
+        """Renew the lease every third of its duration"""
+        while not stop.wait(self.lease_seconds / 3):
+            db = SessionLocal()
+            try:
+                if not renew_lease(db, job_id, self.worker_id, self.lease_seconds):
+                    logger.warning(f"Worker {self.worker_id} lost the lease on job {job_id}")
+                    return
+            except Exception as e:
+                logger.error(f"Error renewing lease on job {job_id}: {e}")
+            finally:
+                db.close()
+
+
+# Worker running inside the API process
+worker: Optional[JobWorker] = None
+
+
+def start_job_worker():
+    """Start the in-process worker (if enabled)"""
+    global worker
+    if not settings.JOB_WORKER_ENABLED:
+        logger.info("In-process job worker disabled")
+        return
+    worker = JobWorker()
+    worker.start()
+
+
+def stop_job_worker():
+    """Stop the in-process worker"""
+    if worker:
+        worker.stop()
@@ -1,86 +1,47 @@
 """
-Auto-analyze script - monitors DB and runs AI analysis on new complaints
-Runs analysis every time 5 new unanalyzed complaints are detected
+Auto-analyze script - analyzes new complaints as soon as they are ingested
+
+Consumes the complaint event outbox written by the scraper/ingestion code.
+Use it when the API runs with EVENT_CONSUMER_ENABLED=false; events written
+by other processes are picked up every EVENT_POLL_SECONDS.
 """
-import time
-import requests
+import argparse
 import logging
-from app.core.database import SessionLocal
-from app.db.models import Complaint
+import sys
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
-logger = logging.getLogger(__name__)
+# Add parent to path
+sys.path.insert(0, '.')
 
-API_URL = "http://localhost:3003/analytics/analyze/batch"
-CHECK_INTERVAL = 10  # seconds between checks
-BATCH_SIZE = 5  # analyze when this many new complaints exist
+from app.core.database import engine
+from app.db.base import Base
+from app.services.event_consumer import AnalysisEventConsumer
 
-def get_counts():
-    """Get total and analyzed complaint counts"""
-    db = SessionLocal()
-    try:
-        total = db.query(Complaint).count()
-        analyzed = db.query(Complaint).filter(Complaint.sentiment != None).count()
-        return total, analyzed
-    finally:
-        db.close()
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 
-def run_analysis(limit):
-    """Run AI analysis via API"""
-    try:
-        response = requests.post(f"{API_URL}?limit={limit}", timeout=120)
-        if response.status_code == 200:
-            result = response.json()
-            return result.get('analyzed', 0)
-        else:
-            logger.error(f"API error: {response.status_code}")
-            return 0
-    except Exception as e:
-        logger.error(f"Request error: {e}")
-        return 0
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=None, help="Events analyzed per batch")
+    parser.add_argument("--poll", type=float, default=None, help="Seconds between outbox polls")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    consumer = AnalysisEventConsumer(batch_size=args.batch_size, poll_interval=args.poll)
+
     print("=" * 60)
-    print("AUTO-ANALYZE - Monitoring for new complaints")
+    print("AUTO-ANALYZE - Consuming new complaint events")
     print("=" * 60)
-    print(f"Will analyze every {BATCH_SIZE} new unanalyzed complaints")
-    print(f"Checking every {CHECK_INTERVAL} seconds")
+    print(f"Batch size: {consumer.batch_size}")
+    print(f"Polling the outbox every {consumer.poll_interval} seconds")
     print("=" * 60)
     print()
 
-    last_analyzed_count = 0
-    total_analyzed_this_session = 0
-
-    while True:
-        try:
-            total, analyzed = get_counts()
-            unanalyzed = total - analyzed
-
-            if unanalyzed >= BATCH_SIZE:
-                logger.info(f"Found {unanalyzed} unanalyzed complaints - running analysis...")
-
-                # Analyze in batches
-                newly_analyzed = run_analysis(unanalyzed)
-                total_analyzed_this_session += newly_analyzed
-
-                logger.info(f"Analyzed {newly_analyzed} complaints")
-                logger.info(f"Session total: {total_analyzed_this_session}")
-
-                # Update counts
-                total, analyzed = get_counts()
-
-            # Status update
-            logger.info(f"DB: {total} total, {analyzed} analyzed, {total - analyzed} pending")
-
-            time.sleep(CHECK_INTERVAL)
+    try:
+        consumer.run_forever()
+    except KeyboardInterrupt:
+        print("\n\nStopping auto-analyze...")
+        print(f"Events consumed this session: {consumer.events_consumed}")
 
-        except KeyboardInterrupt:
-            print("\n\nStopping auto-analyze...")
-            print(f"Total analyzed this session: {total_analyzed_this_session}")
-            break
-        except Exception as e:
-            logger.error(f"Error: {e}")
-            time.sleep(CHECK_INTERVAL)
 
 if __name__ == "__main__":
     main()
@@ -54,7 +54,7 @@ async def analyze_single(complaint_id: int, analyzer: SentimentAnalyzer, tagger:
     finally:
         db.close()
 
-async def batch_analyze(batch_size: int = 10, delay: float = 1.0):
+async def batch_analyze(batch_size: int = 10, delay: float = 0.0):
     """Analyze all unanalyzed complaints in batches"""
     print("=" * 60)
     print("BATCH ANALYSIS - Fixed Tags System")
@@ -104,9 +104,6 @@ async def batch_analyze(batch_size: int = 10, delay: float = 1.0):
                 errors += 1
                 print(f"  [FAIL] Complaint {cid} failed")
 
-            # Small delay between individual analyses to avoid rate limiting
-            await asyncio.sleep(0.5)
-
         # Progress report
         elapsed = time.time() - start_time
         rate = processed / elapsed if elapsed > 0 else 0
@@ -114,8 +111,9 @@ async def batch_analyze(batch_size: int = 10, delay: float = 1.0):
         print(f"  Progress: {processed}/{total_unanalyzed} ({100*processed/total_unanalyzed:.1f}%)")
         print(f"  Rate: {rate:.1f}/s | ETA: {remaining/60:.1f} min")
 
-        # Delay between batches
-        await asyncio.sleep(delay)
+        # Optional pause between batches (GeminiClient already enforces the API quota)
+        if delay:
+            await asyncio.sleep(delay)
 
     elapsed = time.time() - start_time
     print("\n" + "=" * 60)
@@ -129,7 +127,7 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--batch-size", type=int, default=10, help="Batch size")
-    parser.add_argument("--delay", type=float, default=1.0, help="Delay between batches")
+    parser.add_argument("--delay", type=float, default=0.0, help="Extra delay between batches (rate limiting is handled by GeminiClient)")
     args = parser.parse_args()
 
     asyncio.run(batch_analyze(args.batch_size, args.delay))
@@ -0,0 +1,91 @@
+"""
+Benchmark of the page data extraction: BeautifulSoup vs the fast scan
+
+Runs both extractors (app/scraper/extract.py) over saved pages - by default
+the debug_html/*.html files written by the scraper with save_debug - and
+reports the CPU time per page of each. Also checks that both paths return
+the same __NEXT_DATA__ payload and category, and exits with status 1 when
+they disagree on any page.
+
+Usage:
+    python benchmark_extraction.py                     # debug_html/*.html, 5 rounds
+    python benchmark_extraction.py pages/ -n 20        # another directory, 20 rounds
+"""
+from app.scraper.extract import (
+    next_data_from_html, next_data_from_soup, page_category_from_html, page_category_from_soup
+)
+from bs4 import BeautifulSoup
+from pathlib import Path
+import argparse
+import sys
+import time
+
+
+def extract_soup(html: str):
+    soup = BeautifulSoup(html, 'html.parser')
+    return next_data_from_soup(soup), page_category_from_soup(soup)
+
+
+def extract_fast(html: str):
+    return next_data_from_html(html), page_category_from_html(html)
+
+
+def cpu_time(extract, html: str, rounds: int) -> float:
+    """Best CPU seconds of one extraction over the rounds"""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.process_time()
+        extract(html)
+        best = min(best, time.process_time() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", default="debug_html", help="Directory with saved .html pages")
+    parser.add_argument("-n", "--rounds", type=int, default=5, help="Extractions per page and method")
+    args = parser.parse_args()
+
+    files = sorted(Path(args.directory).glob("*.html"))
+    if not files:
+        print(f"[SKIP] No .html files in {args.directory} (run the scraper with save_debug=True first)")
+        return
+
+    print("=" * 70)
+    print(f"EXTRACTION BENCHMARK - {len(files)} pages, best of {args.rounds} rounds")
+    print("=" * 70)
+    print(f"{'page':<32}{'size':>10}{'soup ms':>10}{'fast ms':>10}{'speedup':>9}")
+
+    mismatches = []
+    total_soup = total_fast = 0.0
+    for path in files:
+        html = path.read_text(encoding="utf-8", errors="replace")
+
+        if extract_soup(html) != extract_fast(html):
+            mismatches.append(path.name)
+
+        soup_seconds = cpu_time(extract_soup, html, args.rounds)
+        fast_seconds = cpu_time(extract_fast, html, args.rounds)
+        total_soup += soup_seconds
+        total_fast += fast_seconds
+        speedup = soup_seconds / fast_seconds if fast_seconds else float("inf")
+        print(
+            f"{path.name[:31]:<32}{len(html) // 1024:>8}KB"
+            f"{soup_seconds * 1000:>10.2f}{fast_seconds * 1000:>10.2f}{speedup:>8.1f}x"
+        )
+
+    print("-" * 70)
+    speedup = total_soup / total_fast if total_fast else float("inf")
+    print(
+        f"{'total':<32}{'':>10}{total_soup * 1000:>10.2f}{total_fast * 1000:>10.2f}{speedup:>8.1f}x"
+    )
+    print()
+
+    if mismatches:
+        print(f"[FAIL] Soup and fast extraction differ on {len(mismatches)} page(s): {', '.join(mismatches)}")
+        sys.exit(1)
+    print(f"[OK] Both paths agree on all {len(files)} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Throughput benchmark of the scraper backends against the fixture replay server
+
+Starts a ReplayServer (app/scraper/replay.py) on synthesized pages - or on
+a recorded fixtures directory - and crawls it with every available
+backend, each in its own process so CPU and memory are measured per
+backend:
+
+    http-direct  HTTP backend, session opened over plain HTTP (no Chrome)
+    http         HTTP backend, challenge cleared in Chrome
+    selenium     Selenium backend
+    playwright   Playwright scraper (always reads every complaint page)
+
+Reports pages/s, complaints/s, CPU ms per page (scraper process plus its
+browsers) and peak RSS (scraper process and largest child process).
+Backends whose browser or package is missing are skipped.
+
+For CI: --save-baseline writes the results to a JSON file, --baseline
+compares a run against it and exits with status 1 when pages/s drops or
+CPU per page / RSS grows by more than --max-regression, or when a backend
+fails or collects fewer complaints than the fixtures hold.
+
+Usage:
+    python benchmark_scrapers.py                                   # every backend, 10 synthesized pages
+    python benchmark_scrapers.py --backends http-direct --details --pages 20
+    python benchmark_scrapers.py --latency 0.2 --challenge-rate 0.05 --seed 1
+    python benchmark_scrapers.py --fixtures fixtures/ --baseline bench.json --max-regression 0.25
+"""
+from app.scraper.replay import ReplayServer, listing_items, synthesize_fixtures
+from pathlib import Path
+import argparse
+import importlib.util
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, RSS is not reported
+    resource = None
+
+BACKENDS = ("http-direct", "http", "selenium", "playwright")
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+BENCH_SLUG = "drogaria-venancio-site-e-televendas"
+
+
+def unavailable_reason(backend: str):
+    """Why a backend cannot run here (None when it can)"""
+    if backend in ("http", "selenium") and not any(shutil.which(name) for name in CHROME_BINARIES):
+        return "Chrome not found"
+    if backend == "playwright" and importlib.util.find_spec("playwright") is None:
+        return "playwright not installed"
+    return None
+
+
+def _max_rss_mb(who) -> float:
+    if resource is None:
+        return None
+    rss = resource.getrusage(who).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KB elsewhere
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_backend(backend: str, company_url: str, pages: int, details: bool, workers: int) -> dict:
+    """Crawl company_url with one backend (runs in the worker process)"""
+    # No politeness delay or ceiling: the benchmark measures the scraper, not the schedule
+    options = dict(max_pages=pages, delay_min=0, delay_max=0, requests_per_minute=0, min_delay=0)
+    started_cpu = time.process_time()
+    started = time.perf_counter()
+
+    if backend == "playwright":
+        import asyncio
+        from app.scraper.playwright_scraper import PlaywrightReclameAquiScraper
+        scraper = PlaywrightReclameAquiScraper(company_url, max_pages=pages, max_concurrent=workers)
+        complaints = len(asyncio.run(scraper.scrape_complaints()))
+        pages = None  # not reported by the scraper, counted by the server
+    else:
+        if backend == "selenium":
+            from app.scraper.reclame_aqui_scraper import ReclameAquiScraper
+            scraper = ReclameAquiScraper(company_url, max_workers=workers, fetch_details=details, **options)
+        else:
+            from app.scraper.http_scraper import HttpReclameAquiScraper
+            scraper = HttpReclameAquiScraper(
+                company_url, max_workers=workers, fetch_details=details,
+                browser_session=backend == "http", **options
+            )
+        yielded = [len(page_complaints) for _, page_complaints in scraper.iter_pages()]
+        pages, complaints = len(yielded), sum(yielded)
+
+    return {
+        "seconds": time.perf_counter() - started,
+        "cpu_seconds": time.process_time() - started_cpu + _children_cpu(),
+        "rss_mb": _max_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        "child_rss_mb": _max_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+        "pages": pages,
+        "complaints": complaints,
+        "errors": len(scraper.get_errors()),
+    }
+
+
+def worker_main(args):
+    """--worker: run one backend and print its result as the last output line"""
+    result = run_backend(args.worker, args.company_url, args.pages, args.details, args.workers)
+    print(json.dumps(result))
+
+
+def benchmark(server: ReplayServer, slug: str, backend: str, args) -> dict:
+    """Run a backend in a worker process and add the pages the server served to it"""
+    before = server.stats
+    command = [
+        sys.executable, str(Path(__file__).resolve()), "--worker", backend,
+        "--company-url", server.company_url(slug),
+        "--pages", str(args.pages), "--workers", str(args.workers),
+    ] + (["--details"] if args.details else [])
+    completed = subprocess.run(command, capture_output=True, text=True, timeout=args.timeout)
+    after = server.stats
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "worker failed")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    served = {key: after[key] - before[key] for key in after}
+    # Pages the scraper returned; session refreshes reload listing pages without adding any
+    pages = result["pages"] if result["pages"] is not None else served["listing_html"] + served["listing_json"]
+    seconds = result["seconds"] or 1e-9
+    result.update({
+        "pages": pages,
+        "detail_pages": served["detail_html"] + served["detail_json"],
+        "challenges": served["challenges"],
+        "pages_per_sec": round(pages / seconds, 2),
+        "complaints_per_sec": round(result["complaints"] / seconds, 2),
+        "cpu_ms_per_page": round(result["cpu_seconds"] * 1000 / pages, 1) if pages else None,
+        "seconds": round(result["seconds"], 2),
+        "cpu_seconds": round(result["cpu_seconds"], 2),
+    })
+    return result
+
+
+def regressions(backend: str, result: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics of a result worse than the baseline by more than tolerance"""
+    found = []
+    if baseline.get("pages_per_sec") and result["pages_per_sec"] < baseline["pages_per_sec"] * (1 - tolerance):
+        found.append(f"{backend}: {result['pages_per_sec']} pages/s (baseline {baseline['pages_per_sec']})")
+    for metric in ("cpu_ms_per_page", "rss_mb"):
+        if baseline.get(metric) and result.get(metric) and result[metric] > baseline[metric] * (1 + tolerance):
+            found.append(f"{backend}: {metric} {result[metric]} (baseline {baseline[metric]})")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Comma-separated backends to run")
+    parser.add_argument("--fixtures", help="Recorded fixtures directory (default: synthesized pages)")
+    parser.add_argument("--slug", help="Company of the fixtures to crawl (default: the first one)")
+    parser.add_argument("--pages", type=int, default=10, help="Listing pages crawled per backend")
+    parser.add_argument("--per-page", type=int, default=10, help="Complaints per synthesized page")
+    parser.add_argument("--details", action="store_true", help="Also read every complaint page")
+    parser.add_argument("--workers", type=int, default=4, help="Detail workers / pooled browsers")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the server adds to every response")
+    parser.add_argument("--challenge-rate", type=float, default=0.0, help="Share of responses that are challenges (0-1)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the fixtures and challenge draws")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before a backend run is aborted")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Tolerated slowdown/growth vs the baseline")
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--company-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker_main(args)
+        return
+
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    unknown = [name for name in backends if name not in BACKENDS]
+    if unknown:
+        parser.error(f"Unknown backends: {', '.join(unknown)} (choose from {', '.join(BACKENDS)})")
+
+    with tempfile.TemporaryDirectory(prefix="replay_") as synthesized:
+        fixtures = args.fixtures or synthesized
+        if not args.fixtures:
+            synthesize_fixtures(fixtures, [BENCH_SLUG], pages=args.pages, per_page=args.per_page, seed=args.seed)
+
+        with ReplayServer(fixtures, latency=args.latency, challenge_rate=args.challenge_rate, seed=args.seed) as server:
+            slug = args.slug or (server.store.slugs() or [BENCH_SLUG])[0]
+            if not server.store.listing(slug, 1):
+                print(f"[FAIL] No {slug} pages in {fixtures}")
+                sys.exit(1)
+            pages = min(args.pages, server.store.last_page(slug))
+            expected = sum(len(listing_items(server.store.listing(slug, page))) for page in range(1, pages + 1))
+
+            print("=" * 70)
+            print(f"SCRAPER BENCHMARK - {slug}: {pages} pages, {expected} complaints, details {'on' if args.details else 'off'}")
+            print(f"latency {args.latency}s, challenge rate {args.challenge_rate}, replayed from {server.url}")
+            print("=" * 70)
+
+            results, failures = {}, []
+            for backend in backends:
+                reason = unavailable_reason(backend)
+                if reason:
+                    print(f"[SKIP] {backend}: {reason}")
+                    continue
+                try:
+                    results[backend] = result = benchmark(server, slug, backend, args)
+                except Exception as e:
+                    print(f"[FAIL] {backend}: {e}")
+                    failures.append(f"{backend}: {e}")
+                    continue
+                print(f"[OK] {backend}: {result['complaints']} complaints in {result['seconds']}s")
+                if result["complaints"] < expected:
+                    message = f"{backend}: collected {result['complaints']} of {expected} complaints ({result['errors']} errors)"
+                    if args.challenge_rate:
+                        print(f"  [WARN] {message}")  # challenges may exhaust the session refreshes
+                    else:
+                        failures.append(message)
+
+    if results:
+        print()
+        print(f"{'backend':<13}{'pages/s':>9}{'compl/s':>10}{'cpu ms/pg':>11}{'rss MB':>9}{'child MB':>10}{'details':>9}{'chall':>7}")
+        for backend, result in results.items():
+            print(
+                f"{backend:<13}{result['pages_per_sec']:>9}{result['complaints_per_sec']:>10}"
+                f"{str(result['cpu_ms_per_page']):>11}{str(result['rss_mb']):>9}{str(result['child_rss_mb']):>10}"
+                f"{result['detail_pages']:>9}{result['challenges']:>7}"
+            )
+        print()
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"[OK] Results saved to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        for backend, result in results.items():
+            if backend in baseline:
+                failures.extend(regressions(backend, result, baseline[backend], args.max_regression))
+            else:
+                print(f"[SKIP] {backend}: not in the baseline")
+
+    if failures:
+        print(f"[FAIL] {len(failures)} problem(s):")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print(f"[SUCCESS] {len(results)} backend(s) benchmarked")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Change detection check for scraper ingestion
+
+Ingests scraped complaints into a fresh in-memory SQLite schema, scrapes
+them again and checks that bulk_upsert_complaints only reports changes
+that happened: no "updated" events or complaint_changes rows for a
+re-scrape of unchanged complaints. This covers the values that round-trip
+through the database in another form, like dealAgain (a bool) stored as
+text in customer_evaluation, and content hashes backfilled from stored
+rows (migrate_content_hash.py). Exits with status 1 on a failed check.
+
+Usage:
+    python check_change_detection.py
+"""
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.base import Base
+from app.db import crud
+from app.db.models import Complaint, ComplaintChange, ComplaintEvent
+from datetime import datetime
+import sys
+
+
+def listing_complaint(external_id: str, **values) -> dict:
+    """A complaint as the listing pages give it (no response, dealAgain as a bool)"""
+    return {
+        "external_id": external_id,
+        "title": f"Reclamação {external_id}",
+        "text": "Pedido não entregue",
+        "complaint_date": datetime(2026, 9, 1, 10, 30),
+        "status": "Respondida",
+        "company_response_text": None,
+        "company_response_date": None,
+        "customer_evaluation": True,
+        "evaluation_date": None,
+        **values,
+    }
+
+
+def backfill_hashes(db):
+    """Recompute every content_hash from the stored row, as migrate_content_hash.py does"""
+    table = Complaint.__table__
+    for row in db.execute(table.select().with_only_columns(table.c.id, *[table.c[f] for f in crud.CONTENT_HASH_FIELDS])).mappings():
+        db.execute(update(table).where(table.c.id == row["id"]).values(content_hash=crud.complaint_content_hash(row)))
+    db.commit()
+
+
+def main():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    def updated_events():
+        return db.query(ComplaintEvent).filter(ComplaintEvent.event_type == "updated").count()
+
+    failures = []
+
+    def check(name, counts, expected_updated, expected_changes, expected_events):
+        got = (counts["updated"], counts["changes"], updated_events())
+        expected = (expected_updated, expected_changes, expected_events)
+        if got == expected:
+            print(f"[OK] {name}")
+        else:
+            print(f"[FAIL] {name}: (updated, changes, updated events) {got}, expected {expected}")
+            failures.append(name)
+
+    print("=" * 70)
+    print("CHANGE DETECTION CHECK - re-scraped complaints against stored ones")
+    print("=" * 70)
+
+    scraped = [listing_complaint("a1"), listing_complaint("a2", customer_evaluation=False), listing_complaint("a3")]
+    crud.bulk_upsert_complaints(db, scraped)
+
+    check("Unchanged re-scrape (bools stored as text)", crud.bulk_upsert_complaints(db, scraped), 0, 0, 0)
+
+    backfill_hashes(db)
+    check("Unchanged re-scrape after the hash backfill", crud.bulk_upsert_complaints(db, scraped), 0, 0, 0)
+
+    moved = [listing_complaint("a1", status="Resolvido"), scraped[1], scraped[2]]
+    check("Status change logs only the status", crud.bulk_upsert_complaints(db, moved), 1, 1, 1)
+    logged = [(c.field, c.old_value, c.new_value) for c in db.query(ComplaintChange)]
+    if logged != [("status", "Respondida", "Resolvido")]:
+        print(f"[FAIL] Change log holds {logged}")
+        failures.append("change log")
+
+    flipped = [moved[0], listing_complaint("a2", customer_evaluation=True), scraped[2]]
+    check("dealAgain flip logs one change", crud.bulk_upsert_complaints(db, flipped), 1, 1, 2)
+
+    # Postgres stores the bools as 'true'/'false'
+    for value, stored in ((True, "true"), (False, "false"), (True, "1"), (False, "0")):
+        if crud.complaint_content_hash({"customer_evaluation": value}) != crud.complaint_content_hash({"customer_evaluation": stored}):
+            print(f"[FAIL] {value!r} and stored {stored!r} hash differently")
+            failures.append(f"hash {stored}")
+
+    db.close()
+    print()
+    if failures:
+        print(f"[FAIL] {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("[SUCCESS] Re-scraped complaints only report real changes")
+
+
+if __name__ == "__main__":
+    main()
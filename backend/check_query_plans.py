@@ -0,0 +1,246 @@
+"""
+Query plan audit for the analytics and CRUD queries
+
+Runs every analytics/CRUD endpoint and the queue queries (analysis work
+queue, complaint event outbox, job queue) against a fresh in-memory SQLite
+schema, captures the SQL they issue and runs EXPLAIN QUERY PLAN on each
+statement. Exits with status 1 when a statement reads one of our tables
+with a full scan (a bare "SCAN <table>", without an index).
+
+Ordered index walks ("SCAN complaints USING INDEX ...") are accepted: they
+are how an unfiltered ORDER BY ... LIMIT is served.
+
+Usage:
+    python check_query_plans.py        # report regressions only
+    python check_query_plans.py -v     # print every plan
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi.testclient import TestClient
+from app.core.database import get_db
+from app.db.base import Base
+from app.db import crud, outbox
+from app.db.models import Competitor, CompetitorComplaint
+from app.db.pagination import encode_cursor
+from app.services import job_queue
+from app.main import app
+from datetime import datetime, timedelta
+import argparse
+import re
+import sys
+
+# Routers whose GET endpoints must all be covered by ENDPOINT_CASES
+AUDITED_PREFIXES = ("/complaints", "/analytics", "/jobs", "/responses")
+
+# A cursor in the middle of the seeded rows
+CURSOR = encode_cursor("2030-01-01 00:00:00", 3)
+
+# (route, url, allowed full scans) - allowed scans need a reason
+ENDPOINT_CASES = [
+    ("GET", "/complaints", "/complaints", ()),
+    ("GET", "/complaints", "/complaints?sentiment=Negativo", ()),
+    ("GET", "/complaints", "/complaints?status=Respondida", ()),
+    ("GET", "/complaints", "/complaints?sentiment=Negativo&status=Respondida", ()),
+    ("GET", "/complaints", "/complaints?tag=atraso-entrega", ()),
+    ("GET", "/complaints", "/complaints?category=entrega", ()),
+    ("GET", "/complaints/page", "/complaints/page?include_total=true", ()),
+    ("GET", "/complaints/page", f"/complaints/page?cursor={CURSOR}", ()),
+    ("GET", "/complaints/page", f"/complaints/page?cursor={CURSOR}&status=Respondida&include_total=true", ()),
+    ("GET", "/complaints/page", f"/complaints/page?cursor={CURSOR}&sentiment=Negativo&tag=atraso-entrega"
+                                "&include_total=true", ()),
+    ("GET", "/complaints/tags", "/complaints/tags", ()),
+    ("GET", "/complaints/tags", "/complaints/tags?kind=category&limit=5", ()),
+    ("GET", "/complaints/stats", "/complaints/stats", ()),
+    ("GET", "/complaints/{complaint_id}", "/complaints/1", ()),
+    ("PATCH", "/complaints/{complaint_id}/analysis",
+     "/complaints/2/analysis?sentiment=Neutro&sentiment_score=5&urgency_score=3", ()),
+    ("PATCH", "/complaints/{complaint_id}/response", "/complaints/2/response?response_edited=ok", ()),
+    ("GET", "/analytics/stats/sentiment", "/analytics/stats/sentiment", ()),
+    ("GET", "/analytics/stats/categories", "/analytics/stats/categories", ()),
+    ("GET", "/analytics/stats/urgency", "/analytics/stats/urgency", ()),
+    ("GET", "/analytics/stats/overview", "/analytics/stats/overview", ()),
+    ("GET", "/analytics/stats/timeline", "/analytics/stats/timeline?days=30", ()),
+    ("GET", "/analytics/stats/locations", "/analytics/stats/locations", ()),
+    ("GET", "/analytics/stats/store-type", "/analytics/stats/store-type", ()),
+    ("GET", "/analytics/stats/tags", "/analytics/stats/tags", ()),
+    ("GET", "/analytics/stats/weekly-trends", "/analytics/stats/weekly-trends", ()),
+    ("GET", "/analytics/stats/response-metrics", "/analytics/stats/response-metrics", ()),
+    ("GET", "/analytics/ai/metrics", "/analytics/ai/metrics", ()),
+    ("GET", "/responses/{complaint_id}", "/responses/1", ()),
+    ("GET", "/benchmark/competitor/{competitor_id}/complaints", "/benchmark/competitor/1/complaints", ()),
+    ("GET", "/benchmark/competitor/{competitor_id}/complaints",
+     f"/benchmark/competitor/1/complaints?cursor={CURSOR}", ()),
+    ("GET", "/benchmark/competitor/{competitor_id}/complaints",
+     f"/benchmark/competitor/1/complaints?cursor={encode_cursor(None, 3)}", ()),
+    # Newest jobs first: a primary key walk stopped by the LIMIT
+    ("GET", "/jobs", "/jobs", ("jobs",)),
+    ("GET", "/jobs", "/jobs?status=queued", ()),
+    ("GET", "/jobs/{job_id}", "/jobs/1", ()),
+    ("GET", "/jobs/{job_id}/items", "/jobs/1/items", ()),
+    ("GET", "/jobs/{job_id}/items", "/jobs/1/items?status=failed", ()),
+]
+
+# Queries issued outside the API (workers and consumers)
+FUNCTION_CASES = [
+    ("crud.count_unanalyzed", lambda db: crud.count_unanalyzed(db), ()),
+    ("crud.count_unanalyzed(ids)", lambda db: crud.count_unanalyzed(db, [1, 2, 3]), ()),
+    ("crud.get_unanalyzed_batch", lambda db: crud.get_unanalyzed_batch(db, after_id=1, limit=50), ()),
+    ("crud.get_unanalyzed_batch(ids)",
+     lambda db: crud.get_unanalyzed_batch(db, after_id=1, limit=50, complaint_ids=[2, 3]), ()),
+    ("crud.get_complaint_by_external_id", lambda db: crud.get_complaint_by_external_id(db, "ext-1"), ()),
+    ("crud.get_complaints_by_sentiment", lambda db: crud.get_complaints_by_sentiment(db, "Negativo"), ()),
+    ("crud.bulk_upsert_complaints", lambda db: crud.bulk_upsert_complaints(db, [
+        {"external_id": "ext-1", "text": "Pedido não entregue", "status": "Resolvido"},
+        {"external_id": "ext-new", "text": "Produto com defeito"},
+    ]), ()),
+    ("outbox.fetch_pending_events", lambda db: outbox.fetch_pending_events(db, 50), ()),
+    ("outbox.count_pending_events", lambda db: outbox.count_pending_events(db), ()),
+    ("outbox.mark_events_processed", lambda db: outbox.mark_events_processed(db, [1]), ()),
+    ("job_queue.claim_next_job", lambda db: job_queue.claim_next_job(db, "audit", 60), ()),
+    ("job_queue.renew_lease", lambda db: job_queue.renew_lease(db, 1, "audit", 60), ()),
+]
+
+# Bare full scan; "SCAN TABLE x" on SQLite < 3.36
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+
+class StatementRecorder:
+    """Collects the statements executed on an engine while enabled"""
+
+    def __init__(self, engine):
+        self.enabled = False
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled and not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            self.statements.append((statement, parameters))
+
+    def take(self):
+        statements, self.statements = self.statements, []
+        return statements
+
+
+def seed(db):
+    """A few rows so every endpoint reaches its queries"""
+    now = datetime.now()
+    crud.bulk_create_complaints(db, [
+        {
+            "external_id": f"ext-{i}",
+            "title": f"Reclamação {i}",
+            "text": "Pedido não entregue",
+            "status": "Respondida" if i % 2 else "Não respondida",
+            "complaint_date": now - timedelta(days=i),
+            "location": "São Paulo - SP",
+        }
+        for i in range(1, 6)
+    ])
+    crud.update_complaint_analysis(
+        db, 1, sentiment="Negativo", sentiment_score=2.0, urgency_score=8.0,
+        tags=["atraso-entrega"], primary_tag="atraso-entrega", classification=["entrega"]
+    )
+    competitor = Competitor(name="Concorrente", slug="concorrente")
+    db.add(competitor)
+    db.flush()
+    db.add_all([
+        CompetitorComplaint(competitor_id=competitor.id, title=f"Concorrente {i}",
+                            complaint_date=(now - timedelta(days=i)) if i % 2 else None)
+        for i in range(1, 6)
+    ])
+    job = job_queue.enqueue_job(db, "analyze_batch", {"limit": 10})
+    crud.add_job_items(db, job, [{"complaint_id": 1, "status": "completed"}])
+    db.commit()
+
+
+def explain(engine, statement, parameters):
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+def full_scans(plan, tables):
+    scans = []
+    for detail in plan:
+        match = FULL_SCAN.match(detail)
+        if match and match.group(1) in tables:
+            scans.append(match.group(1))
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN audit for analytics and CRUD queries")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    tables = set(Base.metadata.tables)
+
+    db = Session()
+    seed(db)
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    recorder = StatementRecorder(engine)
+
+    def run_endpoint(method, url):
+        def call():
+            response = client.request(method, url)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+        return call
+
+    cases = [(f"{method} {url}", run_endpoint(method, url), allowed) for method, _, url, allowed in ENDPOINT_CASES]
+    cases += [(name, (lambda fn=fn: fn(db)), allowed) for name, fn, allowed in FUNCTION_CASES]
+
+    failures = []
+    for name, call, allowed in cases:
+        recorder.enabled = True
+        try:
+            call()
+        finally:
+            recorder.enabled = False
+        statements = recorder.take()
+
+        for statement, parameters in statements:
+            plan = explain(engine, statement, parameters)
+            scans = [table for table in full_scans(plan, tables) if table not in allowed]
+            if scans:
+                failures.append((name, statement, plan, scans))
+            if args.verbose or scans:
+                print(f"{'[FULL SCAN]' if scans else '[OK]'} {name}")
+                print("    " + " ".join(statement.split())[:300])
+                for detail in plan:
+                    print(f"      {detail}")
+
+        if not args.verbose and not any(failure[0] == name for failure in failures):
+            print(f"[OK] {name} ({len(statements)} statements)")
+
+    db.close()
+    app.dependency_overrides.pop(get_db, None)
+
+    # GET endpoints nobody audits yet
+    covered = {(method, route) for method, route, _, _ in ENDPOINT_CASES}
+    for route in app.routes:
+        methods = getattr(route, "methods", None) or set()
+        if "GET" in methods and route.path.startswith(AUDITED_PREFIXES) and ("GET", route.path) not in covered:
+            failures.append((f"GET {route.path}", "", [], ["not covered by ENDPOINT_CASES"]))
+            print(f"[NOT COVERED] GET {route.path}")
+
+    print()
+    if failures:
+        print(f"[FAIL] {len(failures)} statement(s) regressed to a full scan or are not covered")
+        sys.exit(1)
+    print(f"[SUCCESS] {len(cases)} cases, no full table scans")
+
+
+if __name__ == "__main__":
+    main()
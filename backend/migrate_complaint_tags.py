@@ -0,0 +1,68 @@
+"""
+Add complaints.primary_tag and backfill complaint_tags from the JSON columns
+"""
+from app.core.database import SessionLocal, engine
+from app.db.base import Base
+from app.db.json_agg import json_array_elements, json_is_array
+from app.db.models import Complaint, ComplaintTag
+from sqlalchemy import text, insert, select, literal, true, func
+
+print("="*70)
+print("DATABASE MIGRATION - Normalized complaint_tags table")
+print("="*70)
+print()
+
+# 1. New column on complaints
+with engine.connect() as conn:
+    sql = "ALTER TABLE complaints ADD COLUMN primary_tag VARCHAR(100)"
+    try:
+        print(f"1. Executing: {sql}")
+        conn.execute(text(sql))
+        conn.commit()
+        print(f"   [OK] Column added successfully")
+    except Exception as e:
+        if "duplicate column name" in str(e).lower() or "already exists" in str(e).lower():
+            print(f"   [SKIP] Column already exists")
+        else:
+            print(f"   [ERROR] {e}")
+            raise
+
+# 2. New table + indexes
+print("2. Creating complaint_tags table")
+Base.metadata.create_all(bind=engine, tables=[ComplaintTag.__table__])
+print("   [OK] Table ready")
+
+# 3. Backfill in SQL (json_each / jsonb_array_elements), replacing existing rows
+print("3. Backfilling complaint_tags from complaints.tags / complaints.classification")
+db = SessionLocal()
+try:
+    db.query(ComplaintTag).delete(synchronize_session=False)
+
+    for kind, column in (("tag", Complaint.tags), ("category", Complaint.classification)):
+        elements = json_array_elements(db, column)
+        is_primary = (elements.c.value == Complaint.primary_tag) if kind == "tag" else literal(False)
+        rows = (
+            select(
+                Complaint.id,
+                elements.c.value,
+                literal(kind),
+                func.coalesce(is_primary, False)
+            )
+            .select_from(Complaint)
+            .join(elements, true())
+            .where(json_is_array(db, column))
+            .distinct()
+        )
+        result = db.execute(
+            insert(ComplaintTag).from_select(["complaint_id", "tag", "kind", "is_primary"], rows)
+        )
+        print(f"   [OK] {result.rowcount} {kind} rows")
+
+    db.commit()
+finally:
+    db.close()
+
+print()
+print("="*70)
+print("[SUCCESS] Migration completed!")
+print("="*70)
@@ -0,0 +1,66 @@
+"""
+Add complaints.content_hash, create complaint_changes and backfill the hashes
+"""
+from app.core.database import SessionLocal, engine
+from app.db.base import Base
+from app.db.crud import CONTENT_HASH_FIELDS, complaint_content_hash
+from app.db.models import Complaint, ComplaintChange
+from sqlalchemy import text, update, bindparam
+
+CHUNK_SIZE = 1000
+
+print("="*70)
+print("DATABASE MIGRATION - Complaint content hash and change log")
+print("="*70)
+print()
+
+# 1. New column on complaints
+with engine.connect() as conn:
+    sql = "ALTER TABLE complaints ADD COLUMN content_hash VARCHAR(64)"
+    try:
+        print(f"1. Executing: {sql}")
+        conn.execute(text(sql))
+        conn.commit()
+        print(f"   [OK] Column added successfully")
+    except Exception as e:
+        if "duplicate column name" in str(e).lower() or "already exists" in str(e).lower():
+            print(f"   [SKIP] Column already exists")
+        else:
+            print(f"   [ERROR] {e}")
+            raise
+
+# 2. New table + indexes
+print("2. Creating complaint_changes table")
+Base.metadata.create_all(bind=engine, tables=[ComplaintChange.__table__])
+print("   [OK] Table ready")
+
+# 3. Backfill the hashes, chunk by chunk
+print("3. Backfilling complaints.content_hash")
+table = Complaint.__table__
+stmt = update(table).where(table.c.id == bindparam("b_id")).values(content_hash=bindparam("b_content_hash"))
+db = SessionLocal()
+try:
+    last_id = 0
+    backfilled = 0
+    while True:
+        rows = db.execute(
+            table.select()
+            .with_only_columns(table.c.id, *[table.c[field] for field in CONTENT_HASH_FIELDS])
+            .where(table.c.id > last_id, table.c.content_hash.is_(None))
+            .order_by(table.c.id)
+            .limit(CHUNK_SIZE)
+        ).mappings().all()
+        if not rows:
+            break
+        db.execute(stmt, [{"b_id": row["id"], "b_content_hash": complaint_content_hash(row)} for row in rows])
+        db.commit()
+        backfilled += len(rows)
+        last_id = rows[-1]["id"]
+    print(f"   [OK] {backfilled} complaints hashed")
+finally:
+    db.close()
+
+print()
+print("="*70)
+print("[SUCCESS] Migration completed!")
+print("="*70)
@@ -0,0 +1,49 @@
+"""
+Create the query indexes declared on the models (composite and partial)
+and drop the ones they replace
+"""
+from app.core.database import engine
+from app.db.base import Base
+from app.db import models  # noqa: F401 - registers the tables
+from sqlalchemy import inspect, text
+
+# Superseded by ix_complaint_events_pending / ix_analytics_rollups_dimension_value_day
+DROPPED_INDEXES = [
+    "ix_complaint_events_processed_at",
+    "ix_analytics_rollups_dimension_day",
+]
+
+print("="*70)
+print("DATABASE MIGRATION - Query indexes")
+print("="*70)
+print()
+
+existing_tables = set(inspect(engine).get_table_names())
+
+print("1. Creating indexes")
+for table in Base.metadata.sorted_tables:
+    if table.name not in existing_tables:
+        print(f"   [SKIP] Table {table.name} does not exist (created on startup)")
+        continue
+    for index in sorted(table.indexes, key=lambda i: i.name):
+        index.create(bind=engine, checkfirst=True)
+        print(f"   [OK] {index.name}")
+
+print("2. Dropping superseded indexes")
+with engine.connect() as conn:
+    for name in DROPPED_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        print(f"   [OK] {name}")
+    conn.commit()
+
+# Refresh planner statistics so the new indexes get picked up
+print("3. Updating planner statistics")
+with engine.connect() as conn:
+    conn.execute(text("ANALYZE"))
+    conn.commit()
+print("   [OK] ANALYZE done")
+
+print()
+print("="*70)
+print("[SUCCESS] Migration completed!")
+print("="*70)
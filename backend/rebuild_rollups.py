@@ -0,0 +1,63 @@
+"""
+Rebuild the analytics rollups from the complaints table
+
+The rollups are maintained incrementally on every write; run this to
+repair them after manual edits to complaints or a failed migration.
+Use --verify to only compare the tag/category rollups with a live SQL
+count.
+"""
+import argparse
+import sys
+import time
+
+# Add parent to path
+sys.path.insert(0, '.')
+
+from app.core.database import SessionLocal, engine
+from app.db.base import Base
+from app.db import rollups
+from app.db.json_agg import count_json_elements
+
+
+def verify(db) -> bool:
+    """Compare array-dimension rollups with json_each/jsonb_array_elements counts"""
+    ok = True
+    for dimension, column in rollups.ARRAY_DIMENSIONS:
+        live = dict(count_json_elements(db, column))
+        rolled = {r.value: r.count for r in rollups.totals_by_value(db, dimension)}
+        mismatches = {
+            value: (rolled.get(value, 0), live.get(value, 0))
+            for value in set(live) | set(rolled)
+            if rolled.get(value, 0) != live.get(value, 0)
+        }
+        if mismatches:
+            ok = False
+            print(f"[MISMATCH] {dimension}: {len(mismatches)} values differ (rollup, live)")
+            for value, counts in list(mismatches.items())[:10]:
+                print(f"   {value}: {counts}")
+        else:
+            print(f"[OK] {dimension}: {len(live)} values match")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verify", action="store_true", help="Only check the rollups, do not rebuild")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ANALYTICS ROLLUPS")
+    print("=" * 60)
+
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        if args.verify:
+            sys.exit(0 if verify(db) else 1)
+
+        start = time.time()
+        counted = rollups.rebuild_rollups(db)
+        print(f"[OK] Rollups rebuilt from {counted} complaints in {time.time() - start:.1f}s")
+    finally:
+        db.close()
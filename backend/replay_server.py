@@ -0,0 +1,101 @@
+"""
+Fixture replay server for the scrapers
+
+Serves recorded Reclame Aqui pages on localhost (app/scraper/replay.py) so
+the scrapers can be run, debugged and benchmarked without the real site.
+Fixtures are either synthesized or recorded from the site once with the
+HTTP backend (needs Chrome to clear the challenge).
+
+Point a scraper at the server with its company URL, or the scheduled job
+with RECLAME_AQUI_COMPANY_URL=http://127.0.0.1:8765/empresa/<slug> and
+SCRAPER_BASE_URL=http://127.0.0.1:8765.
+
+Usage:
+    python replay_server.py synthesize fixtures/ --slugs drogaria-venancio-site-e-televendas --pages 20
+    python replay_server.py record fixtures/ --pages 5 --details      # from RECLAME_AQUI_COMPANY_URL
+    python replay_server.py serve fixtures/ --port 8765 --latency 0.2 --challenge-rate 0.05
+"""
+from app.core.config import settings
+from app.scraper.http_scraper import HttpReclameAquiScraper
+from app.scraper.replay import ReplayServer, record_fixtures, synthesize_fixtures
+import argparse
+import logging
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Replay a fixtures directory")
+    serve.add_argument("fixtures", help="Fixtures directory")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    serve.add_argument("--challenge-rate", type=float, default=0.0, help="Share of responses that are challenges (0-1)")
+    serve.add_argument("--seed", type=int, default=None, help="Seed of the challenge draws")
+
+    synthesize = commands.add_parser("synthesize", help="Write made-up pages in the site's shape")
+    synthesize.add_argument("fixtures", help="Fixtures directory")
+    synthesize.add_argument("--slugs", nargs="+", default=[settings.RECLAME_AQUI_COMPANY_URL.rstrip('/').split('/')[-1]])
+    synthesize.add_argument("--pages", type=int, default=10, help="Listing pages per slug")
+    synthesize.add_argument("--per-page", type=int, default=10, help="Complaints per listing page")
+    synthesize.add_argument("--no-details", action="store_true", help="Skip the complaint pages")
+    synthesize.add_argument("--seed", type=int, default=0)
+
+    record = commands.add_parser("record", help="Record a company's pages from the site")
+    record.add_argument("fixtures", help="Fixtures directory")
+    record.add_argument("--company-url", default=settings.RECLAME_AQUI_COMPANY_URL)
+    record.add_argument("--pages", type=int, default=5, help="Listing pages to record")
+    record.add_argument("--details", action="store_true", help="Also record every complaint page")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == "serve":
+        server = ReplayServer(
+            args.fixtures, host=args.host, port=args.port,
+            latency=args.latency, challenge_rate=args.challenge_rate, seed=args.seed
+        )
+        slugs = server.store.slugs()
+        if not slugs:
+            print(f"[FAIL] No fixtures in {args.fixtures} (run synthesize or record first)")
+            sys.exit(1)
+        print("=" * 70)
+        print(f"REPLAY SERVER - {server.url}")
+        print("=" * 70)
+        for slug in slugs:
+            print(f"  {server.company_url(slug)}  ({server.store.last_page(slug)} pages)")
+        print()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print(f"\nServed: {server.stats}")
+
+    elif args.command == "synthesize":
+        store = synthesize_fixtures(
+            args.fixtures, args.slugs, pages=args.pages, per_page=args.per_page,
+            with_details=not args.no_details, seed=args.seed
+        )
+        print(f"[OK] {len(args.slugs)} companies x {args.pages} pages x {args.per_page} complaints in {store.directory}")
+
+    elif args.command == "record":
+        scraper = HttpReclameAquiScraper(
+            args.company_url,
+            max_pages=args.pages,
+            delay_min=settings.SCRAPER_DELAY_MIN,
+            delay_max=settings.SCRAPER_DELAY_MAX,
+            requests_per_minute=settings.SCRAPER_REQUESTS_PER_MINUTE
+        )
+        try:
+            store = record_fixtures(scraper, args.fixtures, args.pages, with_details=args.details)
+        except Exception as e:
+            print(f"[FAIL] Recording {args.company_url}: {e}")
+            sys.exit(1)
+        print(f"[OK] Recorded {store.last_page(scraper.company_slug)} pages of {scraper.company_slug} in {store.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Standalone job worker - runs queued jobs outside the API process
+
+Set JOB_WORKER_ENABLED=false in the API when using this script, or run
+both: workers coordinate through leases on the jobs table.
+"""
+import argparse
+import logging
+import sys
+
+# Add parent to path
+sys.path.insert(0, '.')
+
+from app.core.database import engine
+from app.db.base import Base
+from app.services.job_worker import JobWorker
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--worker-id", default=None, help="Worker name (default: host-pid)")
+    parser.add_argument("--poll", type=float, default=None, help="Seconds between queue polls")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    worker = JobWorker(worker_id=args.worker_id, poll_interval=args.poll)
+    print("=" * 60)
+    print(f"JOB WORKER {worker.worker_id} - Ctrl+C to stop")
+    print("=" * 60)
+
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        print("\nStopping job worker...")
@@ -8,6 +8,7 @@ from app.core.database import SessionLocal, init_db
 from app.core.config import settings
 from app.scraper.reclame_aqui_scraper import ReclameAquiScraper
 from app.db.models import Complaint
+from app.db import crud
 import logging
 
 # Initialize database tables on startup
@@ -22,54 +23,40 @@ logger = logging.getLogger(__name__)
 
 
 def import_complaints_to_db(complaints_data: list, db):
-    """Import scraped complaints to database"""
-    imported = 0
-    skipped = 0
-
-    for complaint_data in complaints_data:
-        try:
-            # Check if complaint already exists (by external_id)
-            external_id = complaint_data.get('external_id')
-            if external_id:
-                existing = db.query(Complaint).filter(
-                    Complaint.external_id == external_id
-                ).first()
-                if existing:
-                    logger.debug(f"Complaint {external_id} already exists, skipping")
-                    skipped += 1
-                    continue
-
-            # Create new complaint
-            complaint = Complaint(
-                title=complaint_data.get('title', 'Sem título'),
-                text=complaint_data.get('text', ''),
-                user_name=complaint_data.get('user_name', 'Anônimo'),
-                complaint_date=complaint_data.get('complaint_date', datetime.now()),
-                status=complaint_data.get('status', 'Não respondida'),
-                category=complaint_data.get('category'),  # ✅ FIXED: Now using correct category field
-                location=complaint_data.get('location'),  # ✅ ADDED: Location field
-                external_id=complaint_data.get('external_id'),
-                # Company response from Reclame Aqui
-                company_response_text=complaint_data.get('company_response_text'),
-                company_response_date=complaint_data.get('company_response_date'),
-                customer_evaluation=complaint_data.get('customer_evaluation'),
-                evaluation_date=complaint_data.get('evaluation_date'),
-                scraped_at=complaint_data.get('scraped_at', datetime.now())
-            )
-
-            db.add(complaint)
-            db.commit()  # Commit each complaint individually to handle duplicates
-            imported += 1
-            logger.debug(f"Imported: {complaint.title[:50]}")
-
-        except Exception as e:
-            db.rollback()  # Rollback failed insert
-            logger.error(f"Error importing complaint: {e}")
-            skipped += 1
-            continue
-
-    logger.info(f"Successfully imported {imported} complaints, skipped {skipped} duplicates/errors")
-    return imported, skipped
+    """Import scraped complaints to database (known ones are refreshed, not duplicated)"""
+    rows = [
+        {
+            'title': complaint_data.get('title', 'Sem título'),
+            'text': complaint_data.get('text', ''),
+            'user_name': complaint_data.get('user_name', 'Anônimo'),
+            'complaint_date': complaint_data.get('complaint_date', datetime.now()),
+            'status': complaint_data.get('status', 'Não respondida'),
+            'category': complaint_data.get('category'),
+            'location': complaint_data.get('location'),
+            'external_id': complaint_data.get('external_id'),
+            # Company response from Reclame Aqui
+            'company_response_text': complaint_data.get('company_response_text'),
+            'company_response_date': complaint_data.get('company_response_date'),
+            'customer_evaluation': complaint_data.get('customer_evaluation'),
+            'evaluation_date': complaint_data.get('evaluation_date'),
+            'scraped_at': complaint_data.get('scraped_at', datetime.now())
+        }
+        for complaint_data in complaints_data
+    ]
+
+    try:
+        result = crud.bulk_upsert_complaints(db, rows)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error importing complaints: {e}")
+        return 0, len(rows)
+
+    skipped = len(rows) - result['created']
+    logger.info(
+        f"Successfully imported {result['created']} complaints, refreshed {result['updated']}, "
+        f"skipped {result['unchanged']} duplicates"
+    )
+    return result['created'], skipped
 
 
 def main():
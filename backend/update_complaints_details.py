@@ -10,18 +10,22 @@ import json
 import logging
 from datetime import datetime
 import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 from app.core.database import SessionLocal
 from app.db.models import Complaint
+from app.db import crud
 import re
 import unicodedata
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Fields refreshed from the complaint page
+DETAIL_FIELDS = (
+    "status", "company_response_text", "company_response_date",
+    "customer_evaluation", "evaluation_date", "location",
+)
+
 def slugify(text):
     """Convert text to URL slug"""
     # Normalize unicode characters
@@ -181,29 +185,23 @@ def update_complaints():
         completed = 0
         lock = threading.Lock()
 
+        external_ids = {c.id: c.external_id for c in complaints}
+
         def update_db(complaint_id, details):
             nonlocal updated, errors, completed
             db_local = SessionLocal()
             try:
-                complaint = db_local.query(Complaint).filter(Complaint.id == complaint_id).first()
-                if complaint and details:
-                    if details['status']:
-                        complaint.status = details['status']
-                    if details['company_response_text']:
-                        complaint.company_response_text = details['company_response_text']
-                    if details['company_response_date']:
-                        complaint.company_response_date = details['company_response_date']
-                    if details['customer_evaluation']:
-                        complaint.customer_evaluation = details['customer_evaluation']
-                    if details['evaluation_date']:
-                        complaint.evaluation_date = details['evaluation_date']
-                    if details['location']:
-                        complaint.location = details['location']
-                    db_local.commit()
+                if details:
+                    # Same path as the scraper: only moved fields are written, logged and counted in the rollups
+                    result = crud.bulk_upsert_complaints(
+                        db_local,
+                        [{"external_id": external_ids[complaint_id], **details}],
+                        update_fields=DETAIL_FIELDS
+                    )
                     with lock:
-                        updated += 1
+                        updated += result["updated"]
                         completed += 1
-                        logger.info(f"[{completed}/{total}] {complaint.external_id}: {details['status']}")
+                        logger.info(f"[{completed}/{total}] {external_ids[complaint_id]}: {details['status']}")
                 else:
                     with lock:
                         errors += 1